@@ -0,0 +1 @@
+"""Performance benchmarks for SSH Connect (run with ``python -m benchmarks.<name>``)."""
@@ -0,0 +1,69 @@
+"""Wall-clock latency of one host completion (a TAB press), interpreter start-up included.
+
+Runs the completion helper the way the shell scripts do
+(``python -S -E completion.py hosts PREFIX -f CONFIG``) and compares it with a
+naive completer that starts Python and calls ``parse_ssh_hosts``.
+
+Usage: python -m benchmarks.completion [HOSTS ...]
+"""
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import write_config
+from src.ssh_connect.services import completion
+from src.ssh_connect.services.config_cache import load_cached_config_index
+
+PREFIXES = ("", "host-0", "host-0123", "host-01234", "zzz")
+REPEAT = 15
+NAIVE_COMPLETER = (
+    "import sys; from src.ssh_connect.services.config_service import parse_ssh_hosts; "
+    "hosts, _ = parse_ssh_hosts(sys.argv[1]); print('\\n'.join(h for h in hosts if h.startswith(sys.argv[2])))"
+)
+
+
+def _wall_ms(argv: list[str], repeat: int, cwd: str | None = None) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(argv, stdout=subprocess.DEVNULL, check=True, cwd=cwd)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run(host_count: int) -> dict[str, float | int]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.environ["SSH_CONNECT_CACHE_DIR"] = os.path.join(temp_dir, "cache")
+        config_path = write_config(os.path.join(temp_dir, "config"), host_count)
+        load_cached_config_index(config_path)
+
+        helper = [sys.executable, "-S", "-E", completion.__file__, "hosts"]
+        per_prefix = {prefix: _wall_ms([*helper, prefix, "-f", config_path], REPEAT) for prefix in PREFIXES}
+        bare = _wall_ms([sys.executable, "-S", "-E", "-c", "pass"], REPEAT)
+        naive = _wall_ms([sys.executable, "-c", NAIVE_COMPLETER, config_path, "host-0123"], 2, cwd=root)
+
+    all_timings = [value for timings in per_prefix.values() for value in timings]
+    return {
+        "hosts": host_count,
+        "interpreter_start_ms": round(min(bare), 2),
+        "completion_median_ms": round(statistics.median(all_timings), 2),
+        "completion_max_ms": round(max(all_timings), 2),
+        **{f"prefix_{prefix or 'empty'}_median_ms": round(statistics.median(timings), 2) for prefix, timings in per_prefix.items()},
+        "naive_parse_completer_ms": round(min(naive), 2),
+    }
+
+
+def main(argv: list[str]) -> None:
+    sizes = [int(value) for value in argv] or [1000, 50000]
+    print(json.dumps([run(size) for size in sizes], indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
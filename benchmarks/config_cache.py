@@ -0,0 +1,64 @@
+"""Compare a full config parse with loading the persistent index cache.
+
+Usage: python -m benchmarks.config_cache [HOSTS ...]
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import write_config
+from src.ssh_connect.services import config_index
+from src.ssh_connect.services.config_cache import load_cached_config_index, read_cached_hosts, read_index_cache
+
+
+def _reset_memory_caches() -> None:
+    config_index._INDEX_CACHE.clear()
+    config_index._FRAGMENT_CACHE.clear()
+
+
+def run(host_count: int, repeat: int = 3) -> dict[str, float | int]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.environ["SSH_CONNECT_CACHE_DIR"] = os.path.join(temp_dir, "cache")
+        config_path = write_config(os.path.join(temp_dir, "config"), host_count)
+
+        parse_times = []
+        for _ in range(repeat):
+            _reset_memory_caches()
+            start = time.perf_counter()
+            config_index.load_config_index(config_path)
+            parse_times.append(time.perf_counter() - start)
+
+        _reset_memory_caches()
+        load_cached_config_index(config_path)
+
+        index_times = []
+        hosts_times = []
+        for _ in range(repeat):
+            _reset_memory_caches()
+            start = time.perf_counter()
+            assert read_index_cache(config_path) is not None
+            index_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            assert read_cached_hosts(config_path) is not None
+            hosts_times.append(time.perf_counter() - start)
+
+    return {
+        "hosts": host_count,
+        "full_parse_ms": round(min(parse_times) * 1000, 2),
+        "cached_index_ms": round(min(index_times) * 1000, 2),
+        "cached_hosts_ms": round(min(hosts_times) * 1000, 2),
+    }
+
+
+def main(argv: list[str]) -> None:
+    sizes = [int(value) for value in argv] or [1000, 10000, 50000]
+    print(json.dumps([run(size) for size in sizes], indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
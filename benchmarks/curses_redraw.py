@@ -0,0 +1,145 @@
+"""Bytes written to the terminal per keystroke by the curses host menu.
+
+Runs the menu inside a pseudo-terminal, presses Down a number of times (and
+types a filter), and counts the bytes curses emits for each key. The
+pre-redraw-engine loop (``stdscr.clear()`` plus fresh subwindows on every key)
+is measured alongside for comparison.
+
+Usage: python -m benchmarks.curses_redraw [HOSTS]
+"""
+from __future__ import annotations
+
+import curses
+import fcntl
+import json
+import os
+import pty
+import select
+import struct
+import sys
+import tempfile
+import termios
+
+from benchmarks.synthetic import write_config
+from src.ssh_connect.services.config_index import ConfigIndex
+
+ROWS, COLS = 40, 140
+KEY_DOWN = b"\x1bOB"
+NAVIGATION_KEYS = 30
+
+
+def _menu_legado(stdscr, hosts, host_details):
+    """Copy of the original redraw loop (navigation only)."""
+    cursor = 0
+    offset = 0
+    altura, largura = stdscr.getmaxyx()
+    max_hosts_visiveis = max(1, altura - 10)
+    box_altura = max_hosts_visiveis + 2
+    box_largura = min(50, max(20, largura // 2 - 4))
+    box_y = max(0, (altura - box_altura) // 2)
+    box_x = 2
+    detalhes_x = box_x + box_largura + 2
+    detalhes_largura = max(20, largura - detalhes_x - 2)
+
+    while True:
+        stdscr.clear()
+        stdscr.addstr(1, 2, "Selecione um host para conectar", curses.A_BOLD)
+        box_win = stdscr.subwin(box_altura, box_largura, box_y, box_x)
+        box_win.box()
+        detalhes_win = stdscr.subwin(box_altura, detalhes_largura, box_y, detalhes_x)
+        detalhes_win.box()
+        detalhes_win.addstr(1, 2, "Detalhes do Host:", curses.A_BOLD)
+        if cursor >= offset + max_hosts_visiveis:
+            offset = cursor - max_hosts_visiveis + 1
+        for i in range(max_hosts_visiveis):
+            index = offset + i
+            if index >= len(hosts):
+                break
+            attr = curses.A_REVERSE if index == cursor else curses.A_NORMAL
+            stdscr.addstr(box_y + 1 + i, box_x + 2, f"{'>' if index == cursor else ' '} {hosts[index]}", attr)
+        for linha, (chave, valor) in enumerate(host_details.get(hosts[cursor], {}).items(), start=2):
+            detalhes_win.addstr(linha, 2, f"{chave}: {valor}")
+        stdscr.addstr(altura - 2, 0, "[↑/↓] Navegar"[:largura].ljust(largura), curses.A_REVERSE)
+        stdscr.refresh()
+        key = stdscr.getch()
+        if key == curses.KEY_DOWN:
+            cursor = min(len(hosts) - 1, cursor + 1)
+        elif key == ord("q"):
+            return None
+
+
+def _run_child(mode: str, config_path: str) -> None:
+    fcntl.ioctl(0, termios.TIOCSWINSZ, struct.pack("HHHH", ROWS, COLS, 0, 0))
+    os.environ["TERM"] = "xterm"
+    index = ConfigIndex.from_file(config_path)
+    hosts, details = list(index.hosts), index.host_details()
+
+    if mode == "legacy":
+        curses.wrapper(_menu_legado, hosts, details)
+    else:
+        from src.ssh_connect.legacy.curses_ui import menu_lateral
+
+        curses.wrapper(menu_lateral, hosts, details, None, config_path, index)
+
+
+def _read_until_idle(fd: int, idle: float) -> int:
+    total = 0
+    while select.select([fd], [], [], idle)[0]:
+        try:
+            chunk = os.read(fd, 65536)
+        except OSError:
+            break
+        if not chunk:
+            break
+        total += len(chunk)
+    return total
+
+
+def measure(mode: str, config_path: str) -> dict[str, float | int]:
+    pid, fd = pty.fork()
+    if pid == 0:
+        try:
+            _run_child(mode, config_path)
+        finally:
+            os._exit(0)
+
+    initial = _read_until_idle(fd, 1.0)
+    navigation = []
+    for _ in range(NAVIGATION_KEYS):
+        os.write(fd, KEY_DOWN)
+        navigation.append(_read_until_idle(fd, 0.1))
+
+    typing = []
+    if mode != "legacy":
+        for char in b"host-00":
+            os.write(fd, bytes([char]))
+            typing.append(_read_until_idle(fd, 0.1))
+        os.write(fd, b"\x1b")
+        _read_until_idle(fd, 0.2)
+
+    os.write(fd, b"q")
+    _read_until_idle(fd, 0.2)
+    os.waitpid(pid, 0)
+    os.close(fd)
+
+    result = {
+        "mode": mode,
+        "initial_bytes": initial,
+        "navigation_bytes_mean": round(sum(navigation) / len(navigation), 1),
+        "navigation_bytes_max": max(navigation),
+    }
+    if typing:
+        result["filter_keystroke_bytes_mean"] = round(sum(typing) / len(typing), 1)
+    return result
+
+
+def main(argv: list[str]) -> None:
+    host_count = int(argv[0]) if argv else 5000
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_path = write_config(os.path.join(temp_dir, "config"), host_count)
+        results = [measure(mode, config_path) for mode in ("legacy", "incremental")]
+    print(json.dumps({"hosts": host_count, "terminal": f"{COLS}x{ROWS}", "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,85 @@
+"""Cost of frecency ranking with a large connection history.
+
+Fills a history store with ``VISITS`` connections spread over the last year
+(skewed towards a small working set, like real use), then measures recording
+one more connection, loading the scores, ranking every host and building the
+search index that the Hosts tab and the curses menu use.
+
+Usage: python -m benchmarks.history_rank [HOSTS ...] [--visits N]
+"""
+from __future__ import annotations
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from src.ssh_connect.services.history_service import Connection, HistoryStore, rank_hosts
+from src.ssh_connect.services.search_service import HostSearchIndex
+
+DEFAULT_VISITS = 500_000
+YEAR = 365 * 86400
+
+
+def _history(hosts: list[str], visits: int, now: float) -> list[Connection]:
+    rng = random.Random(42)
+    working_set = rng.sample(hosts, min(30, len(hosts)))
+    connections = []
+    for _ in range(visits):
+        host = rng.choice(working_set) if rng.random() < 0.8 else rng.choice(hosts)
+        connections.append(Connection(host, now - rng.random() * YEAR, 0, rng.random() * 600))
+    return connections
+
+
+def _timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, round((time.perf_counter() - start) * 1000, 2)
+
+
+def run(host_count: int, visits: int) -> dict[str, float | int]:
+    hosts = [f"host-{index:06d}" for index in range(host_count)]
+    now = time.time()
+    connections = _history(hosts, visits, now)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = HistoryStore(os.path.join(temp_dir, "history.sqlite3"))
+        _, fill_ms = _timed(lambda: store.record_many(connections))
+        _, record_ms = _timed(lambda: store.record(hosts[0], 0))
+        scores, scores_ms = _timed(lambda: store.scores(now))
+        ranked, rank_ms = _timed(lambda: rank_hosts(hosts, scores))
+        index, index_ms = _timed(lambda: HostSearchIndex(hosts, {}, scores))
+        _, search_ms = _timed(lambda: index.search("host-01"))
+        _, recent_ms = _timed(lambda: store.recent(ranked[0], limit=20))
+        db_bytes = os.path.getsize(store.path)
+        store.close()
+
+    return {
+        "hosts": host_count,
+        "visits": visits,
+        "hosts_with_history": len(scores),
+        "db_kib": db_bytes // 1024,
+        "fill_ms": fill_ms,
+        "record_one_ms": record_ms,
+        "load_scores_ms": scores_ms,
+        "rank_all_ms": rank_ms,
+        "index_build_ms": index_ms,
+        "ranked_search_ms": search_ms,
+        "recent_for_host_ms": recent_ms,
+    }
+
+
+def main(argv: list[str]) -> None:
+    visits = DEFAULT_VISITS
+    if "--visits" in argv:
+        position = argv.index("--visits")
+        visits = int(argv[position + 1])
+        argv = argv[:position] + argv[position + 2 :]
+    sizes = [int(value) for value in argv] or [10_000, 100_000]
+    print(json.dumps([run(size, visits) for size in sizes], indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
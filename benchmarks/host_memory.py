@@ -0,0 +1,102 @@
+"""Memory held by the parsed host inventory.
+
+Builds a generated fleet (see ``synthetic.write_fleet``; 135k hosts are about
+200k aliases) and measures, with ``tracemalloc``, what stays allocated after
+parsing: the original ``parse_ssh_hosts`` layout (one options dict per alias),
+the ``ConfigIndex`` with its shared ``HostBlock`` records, ``host_details`` as
+the per-alias dicts it used to build and as the current view, and the Hosts
+filter index. ``tui_mib`` is what the TUI keeps for the inventory: index,
+``host_details`` and filter index.
+
+Usage: python -m benchmarks.host_memory [HOSTS ...]
+"""
+from __future__ import annotations
+
+import gc
+import json
+import shlex
+import sys
+import tempfile
+import tracemalloc
+from collections import defaultdict
+from collections.abc import Callable
+
+from benchmarks.synthetic import write_fleet
+from src.ssh_connect.services.config_index import COMMENT_KEY, ConfigIndex
+from src.ssh_connect.services.search_service import HostSearchIndex
+
+MIB = 1024 * 1024
+
+
+def legacy_parse(config_path: str) -> tuple[list[str], dict[str, dict[str, str]]]:
+    """The previous ``parse_ssh_hosts``: every alias of a ``Host`` line gets its own copy of the options."""
+    config_data: dict[str, dict[str, str]] = defaultdict(dict)
+    hosts: list[str] = []
+    seen: set[str] = set()
+    current_comment = None
+    current_hosts: list[str] = []
+
+    with open(config_path, "r", encoding="utf-8") as config_file:
+        for line in config_file:
+            stripped_line = line.strip()
+            if stripped_line.startswith("##"):
+                current_comment = stripped_line[2:].strip()
+            elif stripped_line.lower().startswith("host "):
+                current_hosts = [token for token in shlex.split(stripped_line)[1:] if not any(marker in token for marker in "*?!")]
+                for host_name in current_hosts:
+                    if host_name not in seen:
+                        seen.add(host_name)
+                        hosts.append(host_name)
+                    config_data[host_name] = {COMMENT_KEY: current_comment} if current_comment else {}
+                current_comment = None
+            elif current_hosts and " " in stripped_line:
+                key, value = stripped_line.split(maxsplit=1)
+                for host_name in current_hosts:
+                    config_data[host_name][key] = value
+    return hosts, dict(config_data)
+
+
+def _retained_mib(build: Callable[[], object]) -> tuple[object, float]:
+    """Call ``build`` and return its result plus the memory still allocated once it returns."""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    return result, (tracemalloc.get_traced_memory()[0] - before) / MIB
+
+
+def run(host_count: int) -> dict[str, float | int]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # No includes: the legacy parser does not follow them, and both sides must see the same hosts.
+        fleet = write_fleet(temp_dir, host_count, key_count=8, fragment_count=0)
+        tracemalloc.start()
+        try:
+            legacy, legacy_mib = _retained_mib(lambda: legacy_parse(fleet.config_path))
+            del legacy
+            index, index_mib = _retained_mib(lambda: ConfigIndex.from_file(fleet.config_path))
+            dicts, dicts_mib = _retained_mib(lambda: {alias: index.details(alias) for alias in index.hosts})
+            del dicts
+            details, details_mib = _retained_mib(index.host_details)
+            _, search_mib = _retained_mib(lambda: HostSearchIndex(list(index.hosts), details))
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "hosts": host_count,
+        "aliases": len(index.hosts),
+        "legacy_parse_mib": round(legacy_mib, 1),
+        "config_index_mib": round(index_mib, 1),
+        "host_details_dicts_mib": round(dicts_mib, 1),
+        "host_details_view_mib": round(details_mib, 3),
+        "hosts_filter_index_mib": round(search_mib, 1),
+        "tui_mib": round(index_mib + details_mib + search_mib, 1),
+    }
+
+
+def main(argv: list[str]) -> None:
+    sizes = [int(value) for value in argv] or [10_000, 135_000]
+    print(json.dumps([run(size) for size in sizes], indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,69 @@
+"""Per-keystroke latency of the Hosts filter.
+
+Types a query one character at a time (as the Input widget does) and reports
+the worst and mean latency of the ranked search index against the previous
+``str(details).lower()`` scan.
+
+Usage: python -m benchmarks.hosts_filter [HOSTS ...]
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import write_config
+from src.ssh_connect.services.config_index import ConfigIndex
+from src.ssh_connect.services.search_service import HostSearchIndex
+
+QUERIES = ("host-01234", "10.0.4", "rack 7", "hst0123")
+
+
+def legacy_filter(hosts: list[str], host_details: dict, query: str) -> list[str]:
+    value = query.lower().strip()
+    return [host for host in hosts if not value or value in host.lower() or value in str(host_details.get(host, {})).lower()]
+
+
+def _type(query: str, search) -> list[float]:
+    latencies = []
+    for length in range(1, len(query) + 1):
+        start = time.perf_counter()
+        search(query[:length])
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(host_count: int) -> dict[str, float | int]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index = ConfigIndex.from_file(write_config(os.path.join(temp_dir, "config"), host_count))
+    hosts, details = index.hosts, index.host_details()
+
+    start = time.perf_counter()
+    search_index = HostSearchIndex(hosts, details)
+    build_s = time.perf_counter() - start
+
+    indexed, legacy = [], []
+    for query in QUERIES:
+        search_index.search("")
+        indexed += _type(query, search_index.search)
+        legacy += _type(query, lambda text: legacy_filter(hosts, details, text))
+
+    return {
+        "hosts": host_count,
+        "index_build_ms": round(build_s * 1000, 2),
+        "indexed_keystroke_max_ms": round(max(indexed) * 1000, 2),
+        "indexed_keystroke_mean_ms": round(sum(indexed) / len(indexed) * 1000, 2),
+        "legacy_keystroke_max_ms": round(max(legacy) * 1000, 2),
+        "legacy_keystroke_mean_ms": round(sum(legacy) / len(legacy) * 1000, 2),
+    }
+
+
+def main(argv: list[str]) -> None:
+    sizes = [int(value) for value in argv] or [1000, 10000, 30000]
+    print(json.dumps([run(size) for size in sizes], indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
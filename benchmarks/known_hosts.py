@@ -0,0 +1,85 @@
+"""Host key lookups against a large hashed ``known_hosts``.
+
+Writes a ``known_hosts`` with one hashed entry per generated host (a random
+salt each, as ``HashKnownHosts yes`` does) and times, for a sample of host
+names: the naive check (``hmac.new`` for every entry and every name), the
+indexed first lookup, and the memoized repeat. ``parse_ms`` is the one-time
+cost of reading the file into the index.
+
+Usage: python -m benchmarks.known_hosts [ENTRIES ...] [--names N]
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hmac
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import write_known_hosts
+from src.ssh_connect.services import known_hosts_service
+from src.ssh_connect.services.known_hosts_service import load_known_hosts
+
+
+def naive_lookup(path: str, name: str) -> list[str]:
+    """Re-read the file and HMAC ``name`` with every entry's salt."""
+    found = []
+    encoded = name.encode()
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            names, key_type, key = line.split()[:3]
+            _, _, salt, digest = names.split("|")
+            if hmac.new(base64.b64decode(salt), encoded, "sha1").digest() == base64.b64decode(digest):
+                found.append(f"{key_type} {key}")
+    return found
+
+
+def run(entry_count: int, name_count: int) -> dict[str, float | int]:
+    names = [f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}" for index in range(entry_count)]
+    sample = names[:: max(1, entry_count // name_count)][:name_count]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = write_known_hosts(os.path.join(temp_dir, "known_hosts"), names)
+
+        start = time.perf_counter()
+        for name in sample[:3]:
+            naive_lookup(path, name)
+        naive_ms = (time.perf_counter() - start) * 1000 / 3
+
+        known_hosts_service._FILE_CACHE.clear()
+        start = time.perf_counter()
+        known = load_known_hosts(path)
+        parse_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        found = [known.lookup(name) for name in sample]
+        first_ms = (time.perf_counter() - start) * 1000 / len(sample)
+        assert all(len(keys) == 1 for keys in found)
+
+        start = time.perf_counter()
+        for name in sample:
+            load_known_hosts(path).lookup(name)
+        memo_ms = (time.perf_counter() - start) * 1000 / len(sample)
+
+    return {
+        "entries": entry_count,
+        "names": len(sample),
+        "parse_ms": round(parse_ms, 1),
+        "naive_lookup_ms": round(naive_ms, 2),
+        "indexed_lookup_ms": round(first_ms, 2),
+        "memoized_lookup_ms": round(memo_ms, 4),
+    }
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.known_hosts")
+    parser.add_argument("entries", nargs="*", type=int, default=[1000, 10_000, 50_000])
+    parser.add_argument("--names", type=int, default=50, help="nomes consultados por tamanho")
+    args = parser.parse_args(argv)
+    print(json.dumps([run(size, args.names) for size in args.entries], indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,217 @@
+"""Benchmark suite over generated fleets, with JSON results and a baseline comparison.
+
+For every size a fleet is generated with ``synthetic.write_fleet`` (multi-alias
+``Host`` lines, ``##`` comments, wildcards, includes and key files) and the
+config and key services, the effective-option resolution of every alias,
+an in-place host edit and the Hosts filter are timed. Timings are the best of ``--repeat`` runs (per
+keystroke for the filter), so one noisy run does not fail the comparison.
+
+Usage:
+    python -m benchmarks.suite [--sizes 1000,10000,100000,1000000] [--keys M]
+        [--output results.json] [--baseline benchmarks/baseline.json]
+        [--save-baseline] [--tolerance 0.5]
+
+With ``--baseline`` every timing is compared with the stored value for the
+same size; a metric more than ``tolerance`` slower (and slower by more than
+``MIN_DELTA_MS``) is a regression and the exit status is 1.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+
+from benchmarks.synthetic import write_fleet
+from src.ssh_connect.services import config_index, key_service
+from src.ssh_connect.services.config_editor import ConfigEditor
+from src.ssh_connect.services.config_resolver import HostResolver
+from src.ssh_connect.services.config_service import (
+    create_temp_config_with_keys,
+    get_host_user,
+    host_has_identity_file,
+    parse_ssh_hosts,
+)
+from src.ssh_connect.services.key_service import list_local_private_keys
+from src.ssh_connect.services.search_service import HostSearchIndex
+
+DEFAULT_SIZES = (1000, 10_000, 100_000)
+DEFAULT_KEYS = 64
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.5
+MIN_DELTA_MS = 1.0
+LOOKUPS = 1000
+QUERIES = ("host-01234", "10.0.4", "rack 7", "hst0123", "prod")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def _reset_memory_caches() -> None:
+    config_index._INDEX_CACHE.clear()
+    config_index._FRAGMENT_CACHE.clear()
+
+
+def _best_ms(function: Callable[[], object], repeat: int, setup: Callable[[], object] | None = None) -> float:
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return round(min(timings) * 1000, 3)
+
+
+def _resolve_all(index: config_index.ConfigIndex) -> None:
+    resolver = HostResolver(index)
+    for alias in index.hosts:
+        resolver.options(alias)
+
+
+def _queue_edit(config_path: str, alias: str, pending: list[ConfigEditor]) -> None:
+    """Queue a one-option edit of ``alias``; ``Port`` alternates so every commit really writes."""
+    editor = ConfigEditor(config_path)
+    editor.set_options(alias, {"Port": str(2200 + len(pending) % 2)})
+    pending.append(editor)
+
+
+def _type_queries(search_index: HostSearchIndex) -> list[float]:
+    latencies = []
+    for query in QUERIES:
+        search_index.search("")
+        for length in range(1, len(query) + 1):
+            start = time.perf_counter()
+            search_index.search(query[:length])
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run(host_count: int, key_count: int = DEFAULT_KEYS, repeat: int = DEFAULT_REPEAT) -> dict[str, float | int]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.environ["SSH_CONNECT_CACHE_DIR"] = os.path.join(temp_dir, "cache")
+        fleet = write_fleet(temp_dir, host_count, key_count)
+        config_path = fleet.config_path
+        sample = random.Random(7).choices(fleet.primary_aliases, k=LOOKUPS)
+
+        parse_ms = _best_ms(lambda: parse_ssh_hosts(config_path), repeat, _reset_memory_caches)
+        hosts, details = parse_ssh_hosts(config_path)
+        user_ms = _best_ms(lambda: [get_host_user(host, config_path) for host in sample], repeat)
+        identity_ms = _best_ms(lambda: [host_has_identity_file(host, config_path) for host in sample], repeat)
+        index = config_index.load_config_index(config_path)
+        resolve_ms = _best_ms(lambda: _resolve_all(index), repeat)
+        editors: list[ConfigEditor] = []
+        edit_ms = _best_ms(lambda: editors[-1].commit(), repeat, lambda: _queue_edit(config_path, sample[0], editors))
+
+        temp_paths: list[str] = []
+        temp_config_ms = _best_ms(lambda: temp_paths.append(create_temp_config_with_keys(config_path, fleet.keys_dir)), repeat)
+        for path in temp_paths:
+            os.remove(path)
+
+        keys_cold_ms = _best_ms(lambda: list_local_private_keys(fleet.keys_dir), repeat, key_service._SCAN_CACHE.clear)
+        keys_warm_ms = _best_ms(lambda: list_local_private_keys(fleet.keys_dir), repeat)
+
+        start = time.perf_counter()
+        search_index = HostSearchIndex(hosts, details)
+        index_build_ms = round((time.perf_counter() - start) * 1000, 3)
+        runs = [_type_queries(search_index) for _ in range(repeat)]
+        keystrokes = [min(timings) for timings in zip(*runs)]
+        _reset_memory_caches()
+
+    return {
+        "hosts": host_count,
+        "aliases": len(hosts),
+        "keys": key_count,
+        "parse_ssh_hosts_ms": parse_ms,
+        "get_host_user_per_1k_ms": user_ms,
+        "host_has_identity_file_per_1k_ms": identity_ms,
+        "resolve_all_hosts_ms": resolve_ms,
+        "config_edit_commit_ms": edit_ms,
+        "create_temp_config_with_keys_ms": temp_config_ms,
+        "list_local_private_keys_cold_ms": keys_cold_ms,
+        "list_local_private_keys_warm_ms": keys_warm_ms,
+        "hosts_filter_index_build_ms": index_build_ms,
+        "hosts_filter_keystroke_max_ms": round(max(keystrokes), 3),
+        "hosts_filter_keystroke_mean_ms": round(sum(keystrokes) / len(keystrokes), 3),
+    }
+
+
+def compare(
+    results: dict[str, dict[str, float | int]],
+    baseline: dict[str, dict[str, float | int]],
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_delta_ms: float = MIN_DELTA_MS,
+) -> list[str]:
+    """Describe every ``*_ms`` metric slower than the baseline for the same size; empty when none is."""
+    regressions = []
+    for size, metrics in results.items():
+        previous = baseline.get(size, {})
+        for name, value in metrics.items():
+            reference = previous.get(name)
+            if not name.endswith("_ms") or not isinstance(reference, (int, float)):
+                continue
+            if value > reference * (1 + tolerance) and value - reference > min_delta_ms:
+                regressions.append(f"{size} hosts: {name} {reference} -> {value} ms (+{(value / reference - 1) * 100:.0f}%)")
+    return regressions
+
+
+def _document(results: dict[str, dict[str, float | int]]) -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="Benchmarks dos serviços de config, chaves e filtro.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES), help="quantidades de hosts, separadas por vírgula")
+    parser.add_argument("--keys", type=int, default=DEFAULT_KEYS, help="quantidade de arquivos de chave")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="execuções por medida (vale a melhor)")
+    parser.add_argument("-o", "--output", help="grava o resultado JSON neste arquivo (padrão: stdout)")
+    parser.add_argument("--baseline", help="compara com este resultado salvo (ex.: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="grava o resultado como novo baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="regressão tolerada (0.5 = 50%%)")
+    return parser
+
+
+def main(argv: list[str]) -> int:
+    args = build_parser().parse_args(argv)
+    sizes = [int(value) for value in args.sizes.split(",") if value]
+    results = {}
+    for size in sizes:
+        results[str(size)] = run(size, args.keys, args.repeat)
+        print(f"[bench] {size} hosts: ok", file=sys.stderr)
+
+    document = json.dumps(_document(results), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(document + "\n")
+    else:
+        print(document)
+
+    baseline_path = args.baseline or DEFAULT_BASELINE
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as handle:
+            handle.write(document + "\n")
+        print(f"[bench] baseline gravado em {baseline_path}", file=sys.stderr)
+        return 0
+    if not args.baseline:
+        return 0
+
+    with open(baseline_path, "r", encoding="utf-8") as handle:
+        baseline = json.load(handle)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"[bench] regressão: {line}", file=sys.stderr)
+    if not regressions:
+        print("[bench] nenhuma regressão em relação ao baseline", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
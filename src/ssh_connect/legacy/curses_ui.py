@@ -3,9 +3,12 @@ from __future__ import annotations
 import curses
 import os
 
-from src.ssh_connect.services.config_service import host_has_identity_file, parse_ssh_hosts
+from src.ssh_connect.services.config_cache import load_cached_config_index
+from src.ssh_connect.services.history_service import load_scores
+from src.ssh_connect.services.search_service import HostSearchIndex
 from src.ssh_connect.services.ssh_service import connect_ssh as run_ssh_connection
 from src.ssh_connect.services.ssh_service import copy_ssh_key as run_copy_ssh_key
+from src.ssh_connect.services.timing_service import STAGE_VIEW_REFRESH, span
 from utils import listar_chaves_locais
 
 
@@ -37,102 +40,231 @@ def copiar_chave_ssh(stdscr, host, keys_dir, config_path):
     stdscr.refresh()
 
 
-def menu_lateral(stdscr, hosts, host_details, keys_dir, config_path):
-    """Cria um menu interativo com comentários."""
-    stdscr.clear()
-    altura, largura = stdscr.getmaxyx()
-    titulo = "Selecione um host para conectar"
-    x_titulo = max(0, (largura - len(titulo)) // 2)
-
-    cursor = 0
-    offset = 0
-    max_hosts_visiveis = max(1, altura - 10)
-
-    box_altura = max_hosts_visiveis + 2
-    box_largura = min(50, max(20, largura // 2 - 4))
-    box_y = max(0, (altura - box_altura) // 2)
-    box_x = 2
-
-    detalhes_x = box_x + box_largura + 2
-    detalhes_largura = max(20, largura - detalhes_x - 2)
-    detalhes_altura = box_altura
-
-    while True:
-        stdscr.clear()
-        stdscr.addstr(1, x_titulo, titulo, curses.A_BOLD)
-
-        box_win = stdscr.subwin(box_altura, box_largura, box_y, box_x)
-        box_win.box()
-
-        detalhes_win = stdscr.subwin(detalhes_altura, detalhes_largura, box_y, detalhes_x)
-        detalhes_win.box()
-        detalhes_win.addstr(1, 2, "Detalhes do Host:", curses.A_BOLD)
-
-        if cursor < offset:
-            offset = cursor
-        elif cursor >= offset + max_hosts_visiveis:
-            offset = cursor - max_hosts_visiveis + 1
-
-        y = box_y + 1
-
-        for i in range(max_hosts_visiveis):
-            index = offset + i
-            if index >= len(hosts):
-                break
-
-            host = hosts[index]
-            x = box_x + 2
-            if index == cursor:
-                stdscr.addstr(y, x, f"> {host}", curses.A_REVERSE)
-            else:
-                stdscr.addstr(y, x, f"  {host}")
-
-            y += 1
+def _escrever(win, y, x, texto, attr=0):
+    """Escreve ``texto`` truncado à largura da janela, ignorando a última célula da tela."""
+    altura, largura = win.getmaxyx()
+    if y < 0 or y >= altura or x >= largura:
+        return
+    try:
+        win.addnstr(y, x, texto, largura - x, attr)
+    except curses.error:
+        pass
+
+
+class MenuHosts:
+    """Estado do menu de hosts com redesenho incremental.
+
+    As janelas da lista e dos detalhes são criadas uma única vez (e recriadas
+    apenas em ``KEY_RESIZE``). Ao navegar, só as linhas do cursor antigo e novo
+    e o painel de detalhes são repintados; a tela inteira só é redesenhada ao
+    rolar a página, filtrar ou redimensionar. Tudo é enviado com um único
+    ``doupdate``.
+    """
+
+    TITULO = "Selecione um host para conectar"
+
+    def __init__(self, stdscr, hosts, host_details, indice_busca):
+        self.stdscr = stdscr
+        self.hosts = hosts
+        self.host_details = host_details
+        self.indice_busca = indice_busca
+        self.filtro = ""
+        self.visiveis = indice_busca.search("")
+        self.cursor = 0
+        self.offset = 0
+        self.lista_win = None
+        self.detalhes_win = None
+        self._criar_janelas()
+
+    def _criar_janelas(self):
+        altura, largura = self.stdscr.getmaxyx()
+        self.altura, self.largura = altura, largura
+        self.max_visiveis = max(1, altura - 10)
+
+        box_altura = self.max_visiveis + 2
+        box_largura = max(4, min(50, max(20, largura // 2 - 4), largura - 2))
+        box_y = max(0, (altura - box_altura) // 2)
+        box_x = min(2, max(0, largura - box_largura))
+
+        detalhes_x = box_x + box_largura + 2
+        detalhes_largura = min(max(20, largura - detalhes_x - 2), largura - detalhes_x)
+
+        self.lista_win = curses.newwin(box_altura, box_largura, box_y, box_x)
+        self.detalhes_win = None
+        if detalhes_largura >= 4:
+            self.detalhes_win = curses.newwin(box_altura, detalhes_largura, box_y, detalhes_x)
+        self._ajustar_offset()
+
+    @property
+    def host_atual(self):
+        return self.visiveis[self.cursor] if self.visiveis else None
+
+    def _ajustar_offset(self):
+        """Mantém o cursor visível; retorna True quando a página rolou."""
+        offset = self.offset
+        if self.cursor < offset:
+            offset = self.cursor
+        elif self.cursor >= offset + self.max_visiveis:
+            offset = self.cursor - self.max_visiveis + 1
+        mudou = offset != self.offset
+        self.offset = offset
+        return mudou
+
+    def _desenhar_cabecalho(self):
+        stdscr = self.stdscr
+        stdscr.erase()
+        _escrever(stdscr, 1, max(0, (self.largura - len(self.TITULO)) // 2), self.TITULO, curses.A_BOLD)
+        self._desenhar_rodape()
+
+    def _desenhar_rodape(self):
+        stdscr = self.stdscr
+        filtro = f"Filtro: {self.filtro}" if self.filtro else "Digite para filtrar"
+        stdscr.move(self.altura - 3, 0)
+        stdscr.clrtoeol()
+        _escrever(stdscr, self.altura - 3, 2, filtro)
 
-        host_info = host_details.get(hosts[cursor], {})
+        status_text = (
+            f"[↑/↓] Navegar  [Enter]  Conectar [F5] Copiar chave "
+            f"[PgUp/PgDn] Rolar  [Home/End] Início/Fim  [Esc] Limpar filtro/Sair "
+            f"| Hosts: {len(self.visiveis)}/{len(self.hosts)}"
+        )
+        _escrever(stdscr, self.altura - 2, 0, status_text[: self.largura].ljust(self.largura), curses.A_REVERSE)
+        stdscr.noutrefresh()
+
+    def _desenhar_linha(self, index):
+        linha = index - self.offset
+        if linha < 0 or linha >= self.max_visiveis:
+            return
+        largura_texto = self.lista_win.getmaxyx()[1] - 4
+        if index < len(self.visiveis):
+            marcador = "> " if index == self.cursor else "  "
+            texto = f"{marcador}{self.visiveis[index]}"
+        else:
+            texto = ""
+        attr = curses.A_REVERSE if index == self.cursor and index < len(self.visiveis) else curses.A_NORMAL
+        _escrever(self.lista_win, linha + 1, 2, texto[:largura_texto].ljust(largura_texto), attr)
+
+    def _desenhar_lista(self):
+        self.lista_win.erase()
+        self.lista_win.box()
+        for index in range(self.offset, self.offset + self.max_visiveis):
+            self._desenhar_linha(index)
+        self.lista_win.noutrefresh()
+
+    def _desenhar_detalhes(self):
+        win = self.detalhes_win
+        if win is None:
+            return
+        detalhes_altura = win.getmaxyx()[0]
+        win.erase()
+        win.box()
+        _escrever(win, 1, 2, "Detalhes do Host:", curses.A_BOLD)
+
+        host_info = self.host_details.get(self.host_atual, {}) if self.host_atual else {}
         linha_atual = 2
-
         if not host_info:
-            detalhes_win.addstr(linha_atual, 2, "Nenhuma informação disponível")
+            _escrever(win, linha_atual, 2, "Nenhuma informação disponível")
         else:
             for chave, valor in host_info.items():
                 if chave != "Comentário" and linha_atual < detalhes_altura - 1:
-                    detalhes_win.addstr(linha_atual, 2, f"{chave}: {valor}")
+                    _escrever(win, linha_atual, 2, f"{chave}: {valor}")
                     linha_atual += 1
 
-            if "Comentário" in host_info and linha_atual < detalhes_altura - 1:
-                detalhes_win.addstr(linha_atual + 1, 2, f"Comentário: {host_info['Comentário']}")
+            if "Comentário" in host_info and linha_atual < detalhes_altura - 2:
+                _escrever(win, linha_atual + 1, 2, f"Comentário: {host_info['Comentário']}")
+        win.noutrefresh()
+
+    def desenhar_tudo(self, limpar=False):
+        with span(STAGE_VIEW_REFRESH, "curses.desenhar_tudo"):
+            if limpar:
+                self.stdscr.clearok(True)
+            self._desenhar_cabecalho()
+            self._desenhar_lista()
+            self._desenhar_detalhes()
+            curses.doupdate()
+
+    def mover(self, novo_cursor):
+        if not self.visiveis:
+            return
+        novo_cursor = max(0, min(len(self.visiveis) - 1, novo_cursor))
+        if novo_cursor == self.cursor:
+            return
+
+        antigo, self.cursor = self.cursor, novo_cursor
+        if self._ajustar_offset():
+            self._desenhar_lista()
+        else:
+            self._desenhar_linha(antigo)
+            self._desenhar_linha(novo_cursor)
+            self.lista_win.noutrefresh()
+        self._desenhar_detalhes()
+        curses.doupdate()
+
+    def filtrar(self, filtro):
+        self.filtro = filtro
+        self.visiveis = self.indice_busca.search(filtro)
+        self.cursor = 0
+        self.offset = 0
+        self._desenhar_rodape()
+        self._desenhar_lista()
+        self._desenhar_detalhes()
+        curses.doupdate()
+
+    def redimensionar(self):
+        curses.update_lines_cols()
+        self._criar_janelas()
+        self.desenhar_tudo(limpar=True)
+
+
+def menu_lateral(stdscr, hosts, host_details, keys_dir, config_path, indice=None, indice_busca=None):
+    """Cria um menu interativo com comentários e filtro por digitação."""
+    if indice is None:
+        indice = load_cached_config_index(config_path)
+    if indice_busca is None:
+        indice_busca = HostSearchIndex(hosts, host_details)
+
+    if hasattr(curses, "set_escdelay"):
+        curses.set_escdelay(25)
+    curses.curs_set(0)
+    stdscr.keypad(True)
 
-        status_text = (
-            f"[↑/↓] Navegar  [Enter]  Conectar [F5] Copiar chave "
-            f"[PgUp/PgDn] Rolar  [Home/End] Início/Fim  [Q/Esc] Sair | Hosts: {len(hosts)}"
-        )
-        stdscr.attron(curses.A_REVERSE)
-        stdscr.addstr(altura - 2, 0, status_text[:largura].ljust(largura))
-        stdscr.attroff(curses.A_REVERSE)
+    menu = MenuHosts(stdscr, hosts, host_details, indice_busca)
+    menu.desenhar_tudo(limpar=True)
 
-        stdscr.refresh()
+    while True:
         key = stdscr.getch()
 
-        if key == curses.KEY_UP and cursor > 0:
-            cursor -= 1
-        elif key == curses.KEY_DOWN and cursor < len(hosts) - 1:
-            cursor += 1
+        if key == curses.KEY_UP:
+            menu.mover(menu.cursor - 1)
+        elif key == curses.KEY_DOWN:
+            menu.mover(menu.cursor + 1)
         elif key == curses.KEY_PPAGE:
-            cursor = max(0, cursor - max_hosts_visiveis)
+            menu.mover(menu.cursor - menu.max_visiveis)
         elif key == curses.KEY_NPAGE:
-            cursor = min(len(hosts) - 1, cursor + max_hosts_visiveis)
+            menu.mover(menu.cursor + menu.max_visiveis)
         elif key == curses.KEY_HOME:
-            cursor = 0
+            menu.mover(0)
         elif key == curses.KEY_END:
-            cursor = len(hosts) - 1
-        elif key == 10:
-            return hosts[cursor]
-        elif key in [27, ord("q")]:
-            return None
+            menu.mover(len(menu.visiveis) - 1)
+        elif key == curses.KEY_RESIZE:
+            menu.redimensionar()
+        elif key in (10, 13, curses.KEY_ENTER):
+            if menu.host_atual:
+                return menu.host_atual
+        elif 32 <= key < 127:
+            # Toda tecla imprimível filtra ("q" inclusive); só o Esc sai do menu.
+            menu.filtrar(menu.filtro + chr(key))
+        elif key == 27:
+            if not menu.filtro:
+                return None
+            menu.filtrar("")
+        elif key in (curses.KEY_BACKSPACE, 127, 8):
+            if menu.filtro:
+                menu.filtrar(menu.filtro[:-1])
         elif key == curses.KEY_F5:
-            if not host_has_identity_file(hosts[cursor], config_path):
-                copiar_chave_ssh(stdscr, hosts[cursor], keys_dir, config_path)
+            if menu.host_atual and not indice.has_identity_file(menu.host_atual):
+                copiar_chave_ssh(stdscr, menu.host_atual, keys_dir, config_path)
+                menu.desenhar_tudo(limpar=True)
 
 
 def menu_selecionar_chave(stdscr, chaves):
@@ -204,14 +336,17 @@ def conectar_ssh(host, config_path, keys_dir):
 
 def run(config_path: str, keys_dir: str | None) -> None:
     """Run the legacy curses UI."""
-    hosts, host_details = parse_ssh_hosts(config_path)
+    indice = load_cached_config_index(config_path)
+    hosts, host_details = list(indice.hosts), indice.host_details()
 
     if not hosts:
         print("Nenhum host encontrado.")
         return
 
+    indice_busca = HostSearchIndex(hosts, host_details, load_scores())
     while True:
-        host_escolhido = curses.wrapper(menu_lateral, hosts, host_details, keys_dir, config_path)
+        host_escolhido = curses.wrapper(menu_lateral, hosts, host_details, keys_dir, config_path, indice, indice_busca)
         if not host_escolhido:
             break
         conectar_ssh(host_escolhido, config_path, keys_dir)
+        indice_busca.set_frecency(load_scores())
@@ -0,0 +1,282 @@
+"""SSH user certificates issued by a Vault-style CA, cached on disk until shortly before they expire.
+
+The CA is Vault's SSH secrets engine (``POST /v1/<mount>/sign/<role>``) or
+anything that speaks the same HTTP API. Certificates are written under the
+cache directory, one per (CA, mount, role, principals, public key), and
+their validity window is read from the certificate itself. A valid cached
+certificate is used without contacting the CA. Once ``RENEW_FRACTION`` of
+its lifetime has passed, a replacement is signed in a background thread
+while the current one stays in use. Concurrent requests for the same key and
+role share one signing call.
+
+Configuration comes from the environment: ``VAULT_ADDR``, ``VAULT_TOKEN``
+(or ``~/.vault-token``), ``VAULT_NAMESPACE``, ``SSH_CONNECT_VAULT_ROLE``
+(required), ``SSH_CONNECT_VAULT_MOUNT``, ``SSH_CONNECT_VAULT_PRINCIPALS`` and
+``SSH_CONNECT_VAULT_TTL``.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from typing import NamedTuple
+
+from src.ssh_connect.services.key_service import CERT_FOREVER, CertInfo, read_certificate
+from src.ssh_connect.services.paths import cache_dir, ensure_private_dir
+
+DEFAULT_MOUNT = "ssh"
+RENEW_FRACTION = 0.8
+# A certificate this close to expiry (seconds) is not handed to ssh: the session could outlive it mid-handshake.
+MIN_REMAINING = 30
+REQUEST_TIMEOUT = 10.0
+TOKEN_FILE = "~/.vault-token"
+# Keys ``ssh`` tries when a host sets no IdentityFile, in OpenSSH's order.
+DEFAULT_IDENTITIES = ("id_rsa", "id_ecdsa", "id_ecdsa_sk", "id_ed25519", "id_ed25519_sk", "id_dsa")
+
+
+class VaultSettings(NamedTuple):
+    address: str
+    token: str
+    role: str
+    mount: str = DEFAULT_MOUNT
+    namespace: str | None = None
+    principals: str | None = None  # comma separated, as Vault's ``valid_principals``
+    ttl: str | None = None
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> VaultSettings | None:
+        """Settings from the environment, or None when no CA is configured (no address or no role)."""
+        address = environ.get("VAULT_ADDR")
+        role = environ.get("SSH_CONNECT_VAULT_ROLE")
+        if not address or not role:
+            return None
+        token = environ.get("VAULT_TOKEN")
+        if not token:
+            try:
+                with open(os.path.expanduser(TOKEN_FILE), "r", encoding="utf-8") as handle:
+                    token = handle.read().strip()
+            except OSError:
+                token = ""
+        return cls(
+            address=address.rstrip("/"),
+            token=token,
+            role=role,
+            mount=(environ.get("SSH_CONNECT_VAULT_MOUNT") or DEFAULT_MOUNT).strip("/"),
+            namespace=environ.get("VAULT_NAMESPACE") or None,
+            principals=environ.get("SSH_CONNECT_VAULT_PRINCIPALS") or None,
+            ttl=environ.get("SSH_CONNECT_VAULT_TTL") or None,
+        )
+
+    def sign_url(self) -> str:
+        return f"{self.address}/v1/{self.mount}/sign/{self.role}"
+
+
+def _read_public_key(key_path: str) -> str:
+    """The ``type base64`` part of ``key_path``'s ``.pub`` (what the CA signs)."""
+    pub_path = f"{key_path}.pub"
+    try:
+        with open(pub_path, "r", encoding="utf-8") as handle:
+            parts = handle.readline().split()
+        base64.b64decode(parts[1], validate=True)
+    except (OSError, IndexError, binascii.Error, ValueError) as exc:
+        raise ValueError(f"Chave pública não encontrada ou inválida: {pub_path}") from exc
+    return f"{parts[0]} {parts[1]}"
+
+
+def host_identity(host: str, config_path: str, keys_dir: str | None = None) -> str | None:
+    """The key ``ssh`` offers first for ``host`` that has a ``.pub``, or None.
+
+    That is the effective ``IdentityFile`` (remapped to ``keys_dir`` like the
+    keyed config), else the first of OpenSSH's default keys.
+    """
+    from src.ssh_connect.services.config_index import load_config_index
+
+    candidates = []
+    if os.path.exists(config_path):
+        options = load_config_index(config_path).resolver.options(host)
+        candidates = [value for key, value in options if key.lower() == "identityfile" and "%" not in value]
+    if not candidates:
+        candidates = [os.path.join(keys_dir or "~/.ssh", name) for name in DEFAULT_IDENTITIES]
+    for candidate in candidates:
+        path = os.path.join(keys_dir, os.path.basename(candidate)) if keys_dir else os.path.expanduser(candidate.strip('"'))
+        if os.path.exists(f"{path}.pub"):
+            return path
+    return None
+
+
+def _write_private(path: str, data: str) -> None:
+    fd, temp_path = tempfile.mkstemp(prefix=".cert-", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class CertificateManager:
+    """Signs keys through the CA and hands out cached certificates (thread-safe)."""
+
+    def __init__(self, settings: VaultSettings, cert_dir: str | None = None, clock: Callable[[], float] = time.time) -> None:
+        self.settings = settings
+        self.cert_dir = cert_dir or os.path.join(cache_dir(), "certs")
+        self.clock = clock
+        self.signings = 0
+        self.last_error: Exception | None = None
+        self._lock = threading.Lock()
+        self._inflight: dict[str, object] = {}  # cert path -> concurrent.futures.Future of the signing
+        self._certs: dict[str, tuple[tuple[int, int], CertInfo]] = {}
+
+    def cert_path(self, key_path: str) -> str:
+        """Where the certificate of ``key_path`` for the configured CA and role is cached."""
+        settings = self.settings
+        identity = "\0".join(
+            (settings.address, settings.mount, settings.role, settings.principals or "", _read_public_key(key_path))
+        )
+        digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cert_dir, f"{os.path.basename(key_path)}-{digest}-cert.pub")
+
+    def cached(self, key_path: str) -> CertInfo | None:
+        """The cached certificate of ``key_path`` if it is usable now; never contacts the CA."""
+        path = self.cert_path(key_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        entry = self._certs.get(path)
+        if entry is None or entry[0] != signature:
+            try:
+                entry = (signature, read_certificate(path))
+            except (OSError, ValueError):
+                return None
+            self._certs[path] = entry
+        info = entry[1]
+        now = self.clock()
+        return info if info.is_valid(now) and info.valid_before - now > MIN_REMAINING else None
+
+    def renewal_due(self, info: CertInfo) -> bool:
+        if info.valid_before == CERT_FOREVER:
+            return False
+        renew_at = info.valid_after + (info.valid_before - info.valid_after) * RENEW_FRACTION
+        return self.clock() >= renew_at
+
+    def certificate(self, key_path: str, wait: bool = True) -> CertInfo | None:
+        """Return a usable certificate for ``key_path``.
+
+        A valid cached one is returned at once (its renewal is started in the
+        background when due). Without one, a signing is started and, when
+        ``wait`` is true, awaited; otherwise None is returned.
+        """
+        info = self.cached(key_path)
+        if info is not None:
+            if self.renewal_due(info):
+                self.sign(key_path)
+            return info
+        future = self.sign(key_path)
+        return future.result(REQUEST_TIMEOUT * 2) if wait else None
+
+    def sign(self, key_path: str):
+        """Start signing ``key_path`` in a background thread, or join the signing already running; returns its future."""
+        # Imported lazily: concurrent.futures pulls in logging, which a direct connect without certificates never needs.
+        from concurrent.futures import Future
+
+        path = self.cert_path(key_path)
+        with self._lock:
+            future = self._inflight.get(path)
+            if future is not None:
+                return future
+            future = self._inflight[path] = Future()
+        threading.Thread(target=self._sign_into, args=(key_path, path, future), name="cert-sign", daemon=True).start()
+        return future
+
+    def renew_due(self, key_paths: Iterable[str]) -> int:
+        """Start background renewals for the cached certificates past their renewal point; returns how many."""
+        started = 0
+        for key_path in key_paths:
+            try:
+                info = self.cached(key_path)
+            except ValueError:
+                continue
+            if info is not None and self.renewal_due(info):
+                self.sign(key_path)
+                started += 1
+        return started
+
+    def ssh_options(self, key_path: str) -> list[str]:
+        """``ssh`` options presenting ``key_path`` with its certificate (signed first when none is cached)."""
+        info = self.certificate(key_path)
+        return ["-o", f"CertificateFile={info.path}", "-i", key_path] if info else []
+
+    def _sign_into(self, key_path: str, path: str, future) -> None:
+        try:
+            signed_key = self._request_signature(_read_public_key(key_path))
+            ensure_private_dir(self.cert_dir)
+            _write_private(path, signed_key + "\n")
+            info = read_certificate(path)
+            stat = os.stat(path)
+            self._certs[path] = ((stat.st_mtime_ns, stat.st_size), info)
+            self.signings += 1
+            future.set_result(info)
+        except Exception as exc:
+            self.last_error = exc
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                self._inflight.pop(path, None)
+
+    def _request_signature(self, public_key: str) -> str:
+        from urllib.error import HTTPError
+        from urllib.request import Request, urlopen
+
+        settings = self.settings
+        body = {"public_key": public_key, "cert_type": "user"}
+        if settings.principals:
+            body["valid_principals"] = settings.principals
+        if settings.ttl:
+            body["ttl"] = settings.ttl
+        headers = {"X-Vault-Token": settings.token, "Content-Type": "application/json"}
+        if settings.namespace:
+            headers["X-Vault-Namespace"] = settings.namespace
+
+        request = Request(settings.sign_url(), data=json.dumps(body).encode("utf-8"), headers=headers, method="POST")
+        try:
+            with urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                payload = json.load(response)
+        except HTTPError as exc:
+            try:
+                errors = json.load(exc).get("errors") or []
+            except (ValueError, AttributeError):
+                errors = []
+            detail = f": {'; '.join(str(error) for error in errors)}" if errors else ""
+            raise ValueError(f"O CA recusou a assinatura (HTTP {exc.code}){detail}") from exc
+        except ValueError as exc:
+            raise ValueError(f"Resposta inválida do CA: {exc}") from exc
+
+        signed_key = (payload.get("data") or {}).get("signed_key") if isinstance(payload, dict) else None
+        if not signed_key:
+            raise ValueError("Resposta do CA sem signed_key")
+        return signed_key.strip()
+
+
+_DEFAULT_MANAGER: CertificateManager | None = None
+
+
+def default_certificates() -> CertificateManager | None:
+    """Process-wide manager for the CA configured in the environment, or None when there is none."""
+    global _DEFAULT_MANAGER
+    settings = VaultSettings.from_env()
+    if settings is None:
+        return None
+    cert_dir = os.path.join(cache_dir(), "certs")
+    if _DEFAULT_MANAGER is None or _DEFAULT_MANAGER.settings != settings or _DEFAULT_MANAGER.cert_dir != cert_dir:
+        _DEFAULT_MANAGER = CertificateManager(settings, cert_dir)
+    return _DEFAULT_MANAGER
@@ -0,0 +1,176 @@
+"""Host name lookup for shell completion: a sorted alias list kept next to the config cache.
+
+The completion scripts (``completion_scripts``) run this file directly as
+``python -S -E completion.py hosts PREFIX`` on every TAB, so it imports only
+a handful of standard modules (not even ``typing``) and never parses the
+config. ``cache_dir``/``cache_key`` mirror ``paths.cache_dir`` and
+``config_cache.cache_key``; the tests keep them in sync.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import sys
+import time
+
+try:  # the builtin module avoids loading OpenSSL through hashlib on every TAB
+    from _sha1 import sha1
+except ImportError:  # pragma: no cover - interpreters without the builtin
+    from hashlib import sha1
+
+# subprocess and tempfile are imported where used: they are not needed on the
+# lookup path and would add several milliseconds to every TAB.
+
+# Minimum interval between background refreshes started from a TAB press.
+REFRESH_INTERVAL = 60.0
+
+ENTRY_POINT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "ssh-connect.py")
+
+
+def cache_dir() -> str:
+    override = os.environ.get("SSH_CONNECT_CACHE_DIR")
+    if override:
+        return override
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "ssh_connect")
+
+
+def cache_key(config_path: str) -> str:
+    return sha1(os.path.abspath(config_path).encode("utf-8")).hexdigest()[:16]
+
+
+def hosts_file_path(config_path: str) -> str:
+    """Sorted, newline separated alias list for ``config_path``."""
+    return os.path.join(cache_dir(), f"hosts-{cache_key(config_path)}.txt")
+
+
+def write_hosts_file(config_path: str, hosts: list[str] | tuple[str, ...]) -> str | None:
+    """Atomically write the sorted alias list (byte order, one per line); None on failure."""
+    import tempfile
+
+    target = hosts_file_path(config_path)
+    data = b"".join(name + b"\n" for name in sorted({host.encode("utf-8") for host in hosts if host}))
+    try:
+        os.makedirs(os.path.dirname(target), mode=0o700, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(target))
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(temp_path, target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    except OSError:
+        return None
+    return target
+
+
+def lower_bound(data: bytes | mmap.mmap, prefix: bytes) -> int:
+    """Offset of the first line ``>= prefix`` in sorted newline separated ``data`` (binary search over bytes)."""
+    low, high = 0, len(data)
+    while low < high:
+        middle = (low + high) // 2
+        start = data.rfind(b"\n", 0, middle) + 1
+        end = data.find(b"\n", start)
+        if end < 0:
+            end = len(data)
+        if data[start:end] < prefix:
+            low = end + 1
+        else:
+            high = start
+    return low
+
+
+def matching_range(data: bytes | mmap.mmap, prefix: bytes) -> tuple[int, int]:
+    """``(start, end)`` byte range of the lines starting with ``prefix``.
+
+    No UTF-8 text contains the byte 0xff, so ``prefix + b"\xff"`` sorts after
+    every line that starts with ``prefix`` and bounds the range.
+    """
+    start = lower_bound(data, prefix)
+    end = lower_bound(data, prefix + b"\xff") if prefix else len(data)
+    return start, max(start, end)
+
+
+def read_matches(path: str, prefix: str) -> bytes:
+    """Lines of the hosts file starting with ``prefix``, as stored; only that range is read, through ``mmap``."""
+    try:
+        with open(path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                return b""
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                start, end = matching_range(data, prefix.encode("utf-8"))
+                return data[start:end]
+    except OSError:
+        return b""
+
+
+def lookup(path: str, prefix: str) -> list[str]:
+    """Aliases in the hosts file starting with ``prefix``."""
+    return read_matches(path, prefix).decode("utf-8", errors="replace").splitlines()
+
+
+def _needs_refresh(config_path: str, hosts_path: str) -> bool:
+    try:
+        hosts_mtime = os.stat(hosts_path).st_mtime
+    except OSError:
+        return os.path.exists(config_path)
+    try:
+        return os.stat(config_path).st_mtime > hosts_mtime
+    except OSError:
+        return False
+
+
+def refresh_in_background(config_path: str, hosts_path: str) -> bool:
+    """Re-list the hosts with ``ssh-connect.py --list`` (which rewrites the file) without blocking the shell."""
+    import subprocess
+
+    marker = f"{hosts_path}.refresh"
+    try:
+        if time.time() - os.stat(marker).st_mtime < REFRESH_INTERVAL:
+            return False
+    except OSError:
+        pass
+    try:
+        os.makedirs(os.path.dirname(marker), mode=0o700, exist_ok=True)
+        with open(marker, "w", encoding="utf-8"):
+            pass
+        subprocess.Popen(
+            [sys.executable, os.path.normpath(ENTRY_POINT), "-f", config_path, "--list"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        return False
+    return True
+
+
+def complete_hosts(prefix: str, config_path: str | None = None) -> bytes:
+    """Newline terminated hosts for ``prefix``; a missing or outdated list is rebuilt in the background for the next TAB."""
+    config_path = os.path.expanduser(config_path or "~/.ssh/config")
+    hosts_path = hosts_file_path(config_path)
+    if _needs_refresh(config_path, hosts_path):
+        refresh_in_background(config_path, hosts_path)
+    return read_matches(hosts_path, prefix)
+
+
+def main(argv: list[str]) -> int:
+    """``hosts PREFIX [-f CONFIG]``: print matching aliases, one per line."""
+    if not argv or argv[0] != "hosts":
+        print("uso: completion.py hosts PREFIXO [-f CONFIG]", file=sys.stderr)
+        return 2
+    args = argv[1:]
+    config_path = None
+    if "-f" in args:
+        position = args.index("-f")
+        config_path = args[position + 1] if position + 1 < len(args) else None
+        args = args[:position] + args[position + 2 :]
+    sys.stdout.buffer.write(complete_hosts(args[0] if args else "", config_path))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
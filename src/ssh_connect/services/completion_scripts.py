@@ -0,0 +1,209 @@
+"""Bash, zsh and fish completion scripts for ``ssh-connect.py`` and its subcommands.
+
+Options are completed by the shell itself from the lists embedded here; host
+names come from ``completion.py``, which the scripts run directly.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from shlex import quote
+from typing import NamedTuple
+
+from src.ssh_connect.services import completion
+
+SHELLS = ("bash", "zsh", "fish")
+COMMAND_NAMES = ("ssh-connect.py", "ssh-connect")
+
+VALUE_FILE = "file"
+VALUE_HOST = "host"
+VALUE_ANY = "any"
+
+
+class CompletionOption(NamedTuple):
+    command: str
+    flags: tuple[str, ...]
+    value: str | None = None
+    choices: tuple[str, ...] = ()
+    help: str = ""
+
+
+def _fish_quote(text: str) -> str:
+    return "'" + text.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def _helper_call(shell: str) -> str:
+    helper = os.path.abspath(completion.__file__)
+    if shell == "fish":
+        return f"{_fish_quote(sys.executable)} -S -E {_fish_quote(helper)} hosts (commandline -ct) $config 2>/dev/null"
+    python = f"{quote(sys.executable)} -S -E {quote(helper)}"
+    return f'if [[ -n "$2" ]]; then {python} hosts "$1" -f "$2"; else {python} hosts "$1"; fi 2>/dev/null'
+
+
+def _subcommands(options: list[CompletionOption]) -> list[str]:
+    return list(dict.fromkeys(option.command for option in options if option.command))
+
+
+def _value_cases(options: list[CompletionOption], actions: dict[str, str]) -> list[str]:
+    cases = []
+    for option in options:
+        if option.value is None:
+            continue
+        patterns = "|".join(f'"{option.command} {flag}"' for flag in option.flags)
+        if option.choices:
+            action = actions["choices"].format(words=" ".join(option.choices))
+        else:
+            action = actions[option.value]
+        cases.append(f"        {patterns}) {action} ;;")
+    return cases
+
+
+def _flag_cases(options: list[CompletionOption], action: str) -> list[str]:
+    by_command: dict[str, list[str]] = {}
+    for option in options:
+        by_command.setdefault(option.command, []).extend(option.flags)
+    cases = []
+    for command, flags in by_command.items():
+        pattern = command if command else "*"
+        cases.append((command == "", f"            {pattern}) {action.format(words=' '.join(flags))} ;;"))
+    return [line for _, line in sorted(cases, key=lambda item: item[0])]
+
+
+def _bash_script(options: list[CompletionOption]) -> str:
+    subcommands = " ".join(_subcommands(options))
+    values = _value_cases(
+        options,
+        {
+            VALUE_FILE: 'COMPREPLY=($(compgen -f -- "$cur")); return',
+            VALUE_HOST: 'COMPREPLY=($(_ssh_connect_hosts "$cur" "$config")); return',
+            VALUE_ANY: "return",
+            "choices": 'COMPREPLY=($(compgen -W "{words}" -- "$cur")); return',
+        },
+    )
+    flags = _flag_cases(options, 'COMPREPLY=($(compgen -W "{words}" -- "$cur"))')
+    lines = [
+        "# ssh-connect bash completion: eval \"$(ssh-connect.py --completion bash)\"",
+        "_ssh_connect_hosts() {",
+        f"    {_helper_call('bash')}",
+        "}",
+        "",
+        "_ssh_connect() {",
+        '    local cur="${COMP_WORDS[COMP_CWORD]}" prev="${COMP_WORDS[COMP_CWORD-1]}" command="" config="" i',
+        "    for ((i = 1; i < COMP_CWORD; i++)); do",
+        '        case "${COMP_WORDS[i]}" in -f|--file) config="${COMP_WORDS[i+1]}" ;; esac',
+        "    done",
+        f'    if ((COMP_CWORD > 1)) && [[ " {subcommands} " == *" ${{COMP_WORDS[1]}} "* ]]; then command="${{COMP_WORDS[1]}}"; fi',
+        '    case "$command $prev" in',
+        *values,
+        "    esac",
+        '    if [[ "$cur" == -* ]]; then',
+        '        case "$command" in',
+        *flags,
+        "        esac",
+        "        return",
+        "    fi",
+        '    [[ -n "$command" ]] && return',
+        f'    ((COMP_CWORD == 1)) && COMPREPLY=($(compgen -W "{subcommands}" -- "$cur"))',
+        '    COMPREPLY+=($(_ssh_connect_hosts "$cur" "$config"))',
+        "}",
+        f"complete -F _ssh_connect {' '.join(COMMAND_NAMES)}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _zsh_script(options: list[CompletionOption]) -> str:
+    subcommands = " ".join(_subcommands(options))
+    values = _value_cases(
+        options,
+        {
+            VALUE_FILE: "_files; return",
+            VALUE_HOST: 'hosts=(${(f)"$(_ssh_connect_hosts "$PREFIX" "$config")"}); compadd -a hosts; return',
+            VALUE_ANY: "return",
+            "choices": "compadd -- {words}; return",
+        },
+    )
+    flags = _flag_cases(options, "compadd -- {words}")
+    lines = [
+        "# ssh-connect zsh completion: eval \"$(ssh-connect.py --completion zsh)\" (after compinit)",
+        "_ssh_connect_hosts() {",
+        f"    {_helper_call('zsh')}",
+        "}",
+        "",
+        "_ssh_connect() {",
+        '    local prev="${words[CURRENT-1]}" command="" config="" i',
+        "    local -a hosts",
+        "    for ((i = 2; i < CURRENT; i++)); do",
+        '        [[ "${words[i]}" == (-f|--file) ]] && config="${words[i+1]}"',
+        "    done",
+        f'    if ((CURRENT > 2)) && [[ " {subcommands} " == *" ${{words[2]}} "* ]]; then command="${{words[2]}}"; fi',
+        '    case "$command $prev" in',
+        *values,
+        "    esac",
+        '    if [[ "$PREFIX" == -* ]]; then',
+        '        case "$command" in',
+        *flags,
+        "        esac",
+        "        return",
+        "    fi",
+        '    [[ -n "$command" ]] && return',
+        f"    ((CURRENT == 2)) && compadd -- {subcommands}",
+        '    hosts=(${(f)"$(_ssh_connect_hosts "$PREFIX" "$config")"})',
+        "    compadd -a hosts",
+        "}",
+        f"compdef _ssh_connect {' '.join(COMMAND_NAMES)}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _fish_script(options: list[CompletionOption]) -> str:
+    subcommands = " ".join(_subcommands(options))
+    commands = " ".join(f"-c {name}" for name in COMMAND_NAMES)
+    lines = [
+        "# ssh-connect fish completion: ssh-connect.py --completion fish | source",
+        "function __ssh_connect_hosts",
+        "    set -l tokens (commandline -opc)",
+        "    set -l config",
+        "    for i in (seq 2 (count $tokens))",
+        "        if contains -- $tokens[(math $i - 1)] -f --file",
+        "            set config -f $tokens[$i]",
+        "        end",
+        "    end",
+        f"    {_helper_call('fish')}",
+        "end",
+        "",
+        f"complete {commands} -f",
+        f"complete {commands} -n __fish_use_subcommand -a '{subcommands}'",
+        f"complete {commands} -n 'not __fish_seen_subcommand_from {subcommands}' -a '(__ssh_connect_hosts)'",
+    ]
+    for option in options:
+        condition = (
+            f"'__fish_seen_subcommand_from {option.command}'"
+            if option.command
+            else f"'not __fish_seen_subcommand_from {subcommands}'"
+        )
+        parts = [f"complete {commands} -n {condition}"]
+        for flag in option.flags:
+            parts.append(f"-l {flag[2:]}" if flag.startswith("--") else f"-s {flag[1:]}")
+        if option.choices:
+            parts.append(f"-x -a {_fish_quote(' '.join(option.choices))}")
+        elif option.value == VALUE_FILE:
+            parts.append("-r -F")
+        elif option.value == VALUE_HOST:
+            parts.append("-x -a '(__ssh_connect_hosts)'")
+        elif option.value == VALUE_ANY:
+            parts.append("-x")
+        if option.help:
+            parts.append(f"-d {_fish_quote(option.help)}")
+        lines.append(" ".join(parts))
+    return "\n".join(lines) + "\n"
+
+
+def completion_script(shell: str, options: list[CompletionOption]) -> str:
+    """Completion script for ``shell`` covering ``options`` (main options have ``command == ""``)."""
+    if shell == "bash":
+        return _bash_script(options)
+    if shell == "zsh":
+        return _zsh_script(options)
+    if shell == "fish":
+        return _fish_script(options)
+    raise ValueError(f"Shell não suportado: {shell}")
@@ -0,0 +1,193 @@
+"""Persistent on-disk cache of parsed SSH config indexes.
+
+Each config gets two files under the cache directory: a small header with the
+validation data and the alias list (enough for a direct connect), and a blocks
+file with the full parsed index. Both are ``marshal`` dumps tagged with the
+running Python version, since the format is interpreter specific. A sorted
+plain-text alias list is kept beside them for shell completion.
+
+Sources are validated by stat signature. A file changed less than
+``RACY_WINDOW_NS`` before the cache was written could be rewritten within
+the same timestamp tick without a new signature, so the content hash of such
+files is stored as well and checked on every load.
+"""
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import time
+
+from src.ssh_connect.services.completion import hosts_file_path, write_hosts_file
+from src.ssh_connect.services.config_index import (
+    ConfigIndex,
+    HostBlock,
+    load_config_index,
+    peek_config_index,
+    remember_config_index,
+    sources_unchanged,
+)
+from src.ssh_connect.services.paths import cache_dir, ensure_private_dir
+from src.ssh_connect.services.timing_service import STAGE_CONFIG_PARSE, span
+
+CACHE_FORMAT_VERSION = 3
+RACY_WINDOW_NS = 2_000_000_000
+_FORMAT_TAG = (CACHE_FORMAT_VERSION, sys.version_info[:2])
+
+
+def cache_key(config_path: str) -> str:
+    """Stable short name for the cache entries that belong to ``config_path``."""
+    return hashlib.sha1(os.path.abspath(config_path).encode("utf-8")).hexdigest()[:16]
+
+
+def index_cache_paths(config_path: str) -> tuple[str, str]:
+    """Return the (header, blocks) cache file paths for ``config_path``."""
+    base = os.path.join(cache_dir(), f"index-{cache_key(config_path)}")
+    return f"{base}.hdr", f"{base}.blocks"
+
+
+def sources_digest(sources: dict[str, tuple[int, int, int, int]], include_dirs: dict[str, int | None]) -> str:
+    """Hash of every contributing file and include directory with its stat signature."""
+    digest = hashlib.sha1()
+    for path, signature in sorted(sources.items()):
+        fields = "\0".join(str(field) for field in (path, *signature))
+        digest.update(f"{fields}\n".encode("utf-8"))
+    for path, mtime in sorted(include_dirs.items()):
+        digest.update(f"{path}\0{mtime}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _content_hash(path: str) -> str | None:
+    try:
+        with open(path, "rb") as handle:
+            return hashlib.sha1(handle.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _racy_hashes(sources: dict[str, tuple[int, int, int, int]]) -> dict[str, str | None]:
+    """Content hashes of the sources changed within ``RACY_WINDOW_NS`` of now (by ctime)."""
+    cutoff = time.time_ns() - RACY_WINDOW_NS
+    return {path: _content_hash(path) for path, signature in sources.items() if signature[3] >= cutoff}
+
+
+def _write_atomic(target: str, data: bytes) -> None:
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(target))
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _read_marshal(path: str):
+    try:
+        with open(path, "rb") as handle:
+            return marshal.loads(handle.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def save_index_cache(index: ConfigIndex) -> str | None:
+    """Write ``index`` to the cache directory atomically; return the header path or None on failure."""
+    digest = sources_digest(index.sources, index.include_dirs)
+    header = {
+        "tag": _FORMAT_TAG,
+        "config_path": os.path.abspath(index.config_path),
+        "digest": digest,
+        "sources": index.sources,
+        "include_dirs": index.include_dirs,
+        "racy": _racy_hashes(index.sources),
+        "hosts": tuple(index.hosts),
+    }
+    blocks = (digest, tuple(index.global_options), tuple(block.state() for block in index.blocks))
+
+    header_path, blocks_path = index_cache_paths(index.config_path)
+    try:
+        ensure_private_dir(os.path.dirname(header_path))
+        _write_atomic(blocks_path, marshal.dumps(blocks))
+        _write_atomic(header_path, marshal.dumps(header))
+    except (OSError, ValueError):
+        return None
+    write_hosts_file(index.config_path, index.hosts)
+    return header_path
+
+
+def _read_valid_header(config_path: str) -> dict | None:
+    header = _read_marshal(index_cache_paths(config_path)[0])
+    if not isinstance(header, dict) or header.get("tag") != _FORMAT_TAG:
+        return None
+    if header.get("config_path") != os.path.abspath(config_path):
+        return None
+
+    sources, include_dirs = header["sources"], header["include_dirs"]
+    if sources_digest(sources, include_dirs) != header["digest"] or not sources_unchanged(sources, include_dirs):
+        return None
+    if any(_content_hash(path) != digest for path, digest in header["racy"].items()):
+        return None
+    if not os.path.exists(hosts_file_path(config_path)):
+        write_hosts_file(config_path, header["hosts"])
+    return header
+
+
+def read_cached_hosts(config_path: str) -> list[str] | None:
+    """Return the cached alias list without decoding the blocks, or None when the cache is stale."""
+    header = _read_valid_header(config_path)
+    return list(header["hosts"]) if header else None
+
+
+def read_index_cache(config_path: str) -> ConfigIndex | None:
+    """Load the cached index for ``config_path`` if it exists and every source is unchanged."""
+    header = _read_valid_header(config_path)
+    if header is None:
+        return None
+
+    payload = _read_marshal(index_cache_paths(config_path)[1])
+    if not isinstance(payload, tuple) or len(payload) != 3 or payload[0] != header["digest"]:
+        return None
+
+    _, global_options, block_states = payload
+    return ConfigIndex.restore(
+        config_path,
+        blocks=[HostBlock.from_state(state) for state in block_states],
+        global_options=list(global_options),
+        sources=header["sources"],
+        include_dirs=header["include_dirs"],
+    )
+
+
+def load_cached_config_index(config_path: str) -> ConfigIndex:
+    """Return the index for ``config_path`` from memory, then disk cache, then a full parse."""
+    index = peek_config_index(config_path)
+    if index is not None:
+        return index
+
+    with span(STAGE_CONFIG_PARSE, "disk-cache", path=config_path) as current:
+        index = read_index_cache(config_path)
+        current.note(hit=index is not None)
+    if index is not None:
+        remember_config_index(index)
+        return index
+
+    index = load_config_index(config_path)
+    save_index_cache(index)
+    return index
+
+
+def load_cached_hosts(config_path: str) -> list[str]:
+    """Return the alias list, reading only the cache header when it is valid."""
+    index = peek_config_index(config_path)
+    if index is not None:
+        return list(index.hosts)
+
+    with span(STAGE_CONFIG_PARSE, "header-cache", path=config_path) as current:
+        hosts = read_cached_hosts(config_path)
+        current.note(hit=hosts is not None)
+    if hosts is not None:
+        return hosts
+    return list(load_cached_config_index(config_path).hosts)
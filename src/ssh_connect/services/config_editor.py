@@ -0,0 +1,390 @@
+"""Add, rename, edit and delete ``Host`` entries in place.
+
+Edits are queued on a ``ConfigEditor`` and written by ``commit``. Each touched
+block is re-rendered from its own bytes, which are located by the offsets
+recorded at parse time. Everything else in the file (comments, ``##``
+annotations, spacing, other blocks) is copied byte for byte. Every file is
+replaced at most once per batch, through a private temp file and a rename.
+"""
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+from collections.abc import Iterable, Mapping
+
+from src.ssh_connect.services.config_index import (
+    ConfigIndex,
+    HostBlock,
+    is_wildcard,
+    load_config_index,
+    split_keyword,
+    stat_signature,
+)
+
+DEFAULT_INDENT = "    "
+RESERVED_KEYS = ("host", "match", "include")
+CONFIG_MODE = 0o600
+
+_KEYWORD_PREFIX = re.compile(r"^[ \t]*[^ \t=]+(?:[ \t]*=[ \t]*|[ \t]+)")
+_HOST_PREFIX = re.compile(r"^[ \t]*host(?:[ \t]*=[ \t]*|[ \t]+)", re.IGNORECASE)
+_UNCHANGED = object()
+
+
+class _BlockEdit:
+    """Queued changes to one block; ``block`` is None for a host added in this batch."""
+
+    __slots__ = ("block", "patterns", "options", "comment")
+
+    def __init__(self, block: HostBlock | None, patterns: list[str]) -> None:
+        self.block = block
+        self.patterns = patterns
+        # lowered keyword -> (keyword as given, value or None to remove it)
+        self.options: dict[str, tuple[str, str | None]] = {}
+        self.comment: object = _UNCHANGED
+
+    def removed(self) -> bool:
+        return not any(not pattern.startswith("!") for pattern in self.patterns)
+
+
+def _check_alias(alias: str) -> str:
+    if not alias or alias.startswith("#") or is_wildcard(alias) or any(char.isspace() or char in "\"'=" for char in alias):
+        raise ValueError(f"Nome de host inválido: {alias!r}")
+    return alias
+
+
+def _check_text(value: str, what: str) -> str:
+    if "\n" in value or "\r" in value:
+        raise ValueError(f"{what} não pode ter quebra de linha: {value!r}")
+    return value.strip()
+
+
+def _quote(token: str) -> str:
+    return f'"{token}"' if any(char.isspace() for char in token) else token
+
+
+def _line_end(text: str) -> str:
+    return text[len(text.rstrip("\r\n")):]
+
+
+class ConfigEditor:
+    """Batch of host edits against ``config_path`` (and the files it includes).
+
+    Lookups see the queued edits, so a host can be added and then given more
+    options, or renamed twice, before a single ``commit``. ``commit`` refuses
+    to write when a file changed after it was read.
+    """
+
+    def __init__(self, config_path: str, index: ConfigIndex | None = None) -> None:
+        self.config_path = config_path
+        self.index = index if index is not None else load_config_index(config_path)
+        self._edits: dict[tuple[str, int], _BlockEdit] = {}
+        self._added: list[_BlockEdit] = []
+        # alias -> edits of the blocks that now list it ([] once deleted); aliases not here are looked up in the index.
+        self._owners: dict[str, list[_BlockEdit]] = {}
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._edits or self._added)
+
+    def exists(self, alias: str) -> bool:
+        if alias in self._owners:
+            return bool(self._owners[alias])
+        return alias in self.index
+
+    def _edit(self, block: HostBlock) -> _BlockEdit:
+        key = (block.source, block.start_offset)
+        edit = self._edits.get(key)
+        if edit is None:
+            edit = self._edits[key] = _BlockEdit(block, list(block.patterns))
+        return edit
+
+    def _owned_by(self, alias: str) -> list[_BlockEdit]:
+        """Edits for every block listing ``alias``, in file order (the first one is what ``ssh`` reads)."""
+        if alias in self._owners:
+            edits = self._owners[alias]
+        else:
+            edits = [self._edit(block) for block in self.index.blocks_for(alias)]
+        if not edits:
+            raise ValueError(f"Host '{alias}' não encontrado em {self.config_path}")
+        return edits
+
+    def add_host(self, aliases: Iterable[str], options: Mapping[str, str | None] | None = None, comment: str | None = None) -> None:
+        """Queue a new ``Host`` block, placed after the last concrete host of the root config."""
+        aliases = [_check_alias(alias) for alias in aliases]
+        if not aliases:
+            raise ValueError("Informe ao menos um nome de host")
+        if len(set(aliases)) != len(aliases):
+            raise ValueError(f"Nome de host repetido: {' '.join(aliases)}")
+        for alias in aliases:
+            if self.exists(alias):
+                raise ValueError(f"Host '{alias}' já existe em {self.config_path}")
+
+        edit = _BlockEdit(None, aliases)
+        self._update(edit, options or {}, comment)
+        self._added.append(edit)
+        for alias in aliases:
+            self._owners[alias] = [edit]
+
+    def rename_host(self, alias: str, new_alias: str) -> None:
+        """Replace ``alias`` by ``new_alias`` on every ``Host`` line that lists it."""
+        _check_alias(new_alias)
+        if new_alias == alias:
+            return
+        if self.exists(new_alias):
+            raise ValueError(f"Host '{new_alias}' já existe em {self.config_path}")
+        edits = self._owned_by(alias)
+        for edit in edits:
+            edit.patterns = [new_alias if pattern == alias else pattern for pattern in edit.patterns]
+        self._owners[new_alias] = edits
+        self._owners[alias] = []
+
+    def delete_host(self, alias: str) -> None:
+        """Remove ``alias``; a block left without any other host is removed with its ``##`` comment."""
+        for edit in self._owned_by(alias):
+            edit.patterns = [pattern for pattern in edit.patterns if pattern != alias]
+        self._owners[alias] = []
+
+    def set_options(self, alias: str, options: Mapping[str, str | None], comment: str | None | object = _UNCHANGED) -> None:
+        """Set (or, with ``None``/empty, remove) options in the first block naming ``alias``.
+
+        The block is shared by every alias on its ``Host`` line. ``comment``
+        replaces the ``##`` line above it (``None`` removes it).
+        """
+        self._update(self._owned_by(alias)[0], options, comment)
+
+    def _update(self, edit: _BlockEdit, options: Mapping[str, str | None], comment: str | None | object) -> None:
+        for key, value in options.items():
+            key = key.strip()
+            if not key or key.lower() in RESERVED_KEYS or any(char.isspace() or char == "=" for char in key):
+                raise ValueError(f"Opção inválida: {key!r}")
+            value = _check_text(value, key) if value is not None else None
+            edit.options[key.lower()] = (key, value or None)
+        if comment is not _UNCHANGED:
+            edit.comment = (_check_text(comment, "Comentário") or None) if comment is not None else None
+
+    def commit(self) -> list[str]:
+        """Write every queued edit, one atomic replace per changed file; return the paths written."""
+        by_source: dict[str, list[tuple[int, int, bytes]]] = {}
+        contents: dict[str, bytes] = {}
+
+        def read(path: str) -> bytes:
+            if path not in contents:
+                stat = os.stat(path)
+                if stat_signature(stat) != self.index.sources.get(path):
+                    raise ValueError(f"O arquivo '{path}' mudou desde a leitura; recarregue e tente de novo")
+                with open(path, "rb") as handle:
+                    contents[path] = handle.read()
+            return contents[path]
+
+        for edit in self._edits.values():
+            block = edit.block
+            replacement = _render_edit(edit, read(block.source))
+            if replacement is not None:
+                by_source.setdefault(block.source, []).append(replacement)
+
+        if self._added:
+            root = self.index.config_path
+            data = read(root)
+            position = self._insert_offset(data)
+            indent = self._indent_hint(data)
+            by_source.setdefault(root, []).extend(_render_new(edit, data, position, indent) for edit in self._added)
+
+        written = []
+        for path, replacements in by_source.items():
+            original = contents[path]
+            updated = _splice(original, replacements)
+            if updated != original:
+                write_config_atomic(path, updated, self.index.sources[path])
+                written.append(path)
+        self._edits.clear()
+        self._added.clear()
+        self._owners.clear()
+        return written
+
+    def _root_blocks(self) -> list[HostBlock]:
+        return [block for block in self.index.blocks if block.source == self.index.config_path]
+
+    def _insert_offset(self, data: bytes) -> int:
+        """After the last root-config block with a concrete alias, else before the first one, else at EOF.
+
+        New hosts thus stay ahead of the trailing ``Host *``/``Match`` blocks,
+        whose values apply only where a host does not set its own.
+        """
+        blocks = self._root_blocks()
+        concrete = [block for block in blocks if block.kind == "host" and block.aliases]
+        if concrete:
+            return concrete[-1].end_offset
+        if blocks:
+            return blocks[0].header_offset
+        return len(data)
+
+    def _indent_hint(self, data: bytes) -> str:
+        """Indentation of the first option line in the root config, so new blocks look like their neighbours."""
+        for block in self._root_blocks():
+            for raw_line in data[block.start_offset:block.end_offset].splitlines()[1:]:
+                text = raw_line.decode("utf-8", errors="replace")
+                stripped = text.strip()
+                if stripped and not stripped.startswith("#"):
+                    return text[: len(text) - len(text.lstrip(" \t"))]
+        return DEFAULT_INDENT
+
+
+def _option_lines(options: dict[str, tuple[str, str | None]], indent: str, skip: set[str] = frozenset()) -> list[bytes]:
+    return [
+        f"{indent}{key} {value}\n".encode("utf-8")
+        for lowered, (key, value) in options.items()
+        if value is not None and lowered not in skip
+    ]
+
+
+def _render_new(edit: _BlockEdit, data: bytes, position: int, indent: str) -> tuple[int, int, bytes]:
+    lines = []
+    if isinstance(edit.comment, str):
+        lines.append(f"## {edit.comment}\n".encode("utf-8"))
+    lines.append(f"Host {' '.join(edit.patterns)}\n".encode("utf-8"))
+    lines.extend(_option_lines(edit.options, indent))
+
+    before = data[:position]
+    prefix = b""
+    if before and not before.endswith(b"\n"):
+        prefix = b"\n"
+    if before and not (prefix + before).endswith(b"\n\n"):
+        prefix += b"\n"
+    suffix = b"\n" if position < len(data) else b""
+    return position, position, prefix + b"".join(lines) + suffix
+
+
+def _render_edit(edit: _BlockEdit, data: bytes) -> tuple[int, int, bytes] | None:
+    """Replacement (start, end, bytes) for a queued block edit, or None when nothing changes."""
+    block = edit.block
+    head: list[bytes] = []
+    host_line = b""
+    body: list[bytes] = []
+    position = block.header_offset
+    for raw_line in data[block.header_offset:block.end_offset].splitlines(keepends=True):
+        if position < block.start_offset:
+            head.append(raw_line)
+        elif not host_line:
+            host_line = raw_line
+        else:
+            body.append(raw_line)
+        position += len(raw_line)
+
+    if edit.removed():
+        # Keep the comment lines that trail the options: they usually introduce what follows.
+        last_option = max((i for i, raw_line in enumerate(body) if _is_option(raw_line)), default=-1)
+        tail = body[last_option + 1:]
+        first_comment = next((i for i, raw_line in enumerate(tail) if raw_line.strip()), len(tail))
+        return block.header_offset, block.end_offset, b"".join(tail[first_comment:])
+
+    text = host_line.decode("utf-8", errors="replace")
+    indent = text[: len(text) - len(text.lstrip(" \t"))]
+    if edit.patterns != list(block.patterns):
+        prefix = _HOST_PREFIX.match(text)
+        tokens = " ".join(_quote(token) for token in edit.patterns)
+        host_line = (prefix.group(0) if prefix else "Host ") + tokens + (_line_end(text) or "\n")
+        host_line = host_line.encode("utf-8")
+
+    if edit.comment is not _UNCHANGED:
+        head = _with_comment(head, edit.comment, indent)
+
+    body = _with_options(body, edit.options, host_line)
+    if host_line and not host_line.endswith(b"\n") and body:
+        host_line += b"\n"
+
+    rendered = b"".join(head) + host_line + b"".join(body)
+    if rendered == data[block.header_offset:block.end_offset]:
+        return None
+    return block.header_offset, block.end_offset, rendered
+
+
+def _is_option(raw_line: bytes) -> bool:
+    stripped = raw_line.strip()
+    return bool(stripped) and not stripped.startswith(b"#")
+
+
+def _with_comment(head: list[bytes], comment: str | None, indent: str) -> list[bytes]:
+    annotated = next((i for i, raw_line in enumerate(head) if raw_line.lstrip().startswith(b"##")), None)
+    if annotated is None:
+        return head + [f"{indent}## {comment}\n".encode("utf-8")] if comment else head
+    if comment is None:
+        return head[:annotated] + head[annotated + 1:]
+    text = head[annotated].decode("utf-8", errors="replace")
+    line_indent = text[: len(text) - len(text.lstrip(" \t"))]
+    line = f"{line_indent}## {comment}" + (_line_end(text) or "\n")
+    return head[:annotated] + [line.encode("utf-8")] + head[annotated + 1:]
+
+
+def _with_options(body: list[bytes], options: dict[str, tuple[str, str | None]], host_line: bytes) -> list[bytes]:
+    """Replace the first line of each edited keyword in place, drop its repeats, append the keywords not found."""
+    if not options:
+        return body
+    lines: list[bytes] = []
+    seen: set[str] = set()
+    indent = None
+    last_option = -1
+    for raw_line in body:
+        if not _is_option(raw_line):
+            lines.append(raw_line)
+            continue
+        text = raw_line.decode("utf-8", errors="replace")
+        if indent is None:
+            indent = text[: len(text) - len(text.lstrip(" \t"))]
+        lowered = split_keyword(text.strip())[0].lower()
+        change = options.get(lowered)
+        if change is not None:
+            repeated = lowered in seen
+            seen.add(lowered)
+            if repeated or change[1] is None:
+                continue
+            prefix = _KEYWORD_PREFIX.match(text)
+            keyword = prefix.group(0) if prefix else text.rstrip("\r\n") + " "
+            raw_line = f"{keyword}{change[1]}{_line_end(text)}".encode("utf-8")
+        lines.append(raw_line)
+        last_option = len(lines) - 1
+
+    added = _option_lines(options, DEFAULT_INDENT if indent is None else indent, seen)
+    if added:
+        if last_option >= 0 and not lines[last_option].endswith(b"\n"):
+            lines[last_option] += b"\n"
+        lines[last_option + 1:last_option + 1] = added
+    return lines
+
+
+def _splice(data: bytes, replacements: list[tuple[int, int, bytes]]) -> bytes:
+    """Apply non-overlapping (start, end, bytes) replacements; insertions at one offset keep their order."""
+    chunks = []
+    position = 0
+    for start, end, content in sorted(replacements, key=lambda item: (item[0], item[1])):
+        chunks.append(data[position:start])
+        chunks.append(content)
+        position = end
+    chunks.append(data[position:])
+    return b"".join(chunks)
+
+
+def write_config_atomic(path: str, data: bytes, previous: tuple[int, ...] | None = None) -> None:
+    """Replace ``path`` with ``data`` via a temp file in the same directory, mode 0600 like ``ensure_ssh_config``.
+
+    A symlinked config is written through to its target. When the new file
+    would keep the (mtime, size) signature of ``previous`` (same size, same
+    clock tick), its mtime is nudged so the caches keyed on it see the change.
+    """
+    target = os.path.realpath(path)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target)}-", dir=os.path.dirname(target))
+    try:
+        os.fchmod(fd, CONFIG_MODE)
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    stat = os.stat(target)
+    if previous is not None and (stat.st_mtime_ns, stat.st_size) == tuple(previous[:2]):
+        os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
@@ -0,0 +1,606 @@
+"""Single-pass, indexed model of an SSH config file."""
+from __future__ import annotations
+
+import copy
+import glob
+import os
+import re
+import shlex
+import sys
+from collections.abc import Iterator, Mapping
+from typing import TYPE_CHECKING
+
+from src.ssh_connect.services.timing_service import STAGE_CONFIG_PARSE, span
+
+if TYPE_CHECKING:
+    from src.ssh_connect.services.config_resolver import HostResolver
+
+COMMENT_KEY = "Comentário"
+WILDCARD_MARKERS = ("*", "?", "!")
+_PLAIN_TOKEN = re.compile(r"[^ \t\r\n]+")
+
+
+def split_keyword(stripped_line: str) -> tuple[str, str]:
+    """Split a config line into keyword and raw value (``Key Value`` or ``Key=Value``)."""
+    for index, char in enumerate(stripped_line):
+        if char in " \t=":
+            key = stripped_line[:index]
+            value = stripped_line[index:].lstrip(" \t")
+            if value.startswith("="):
+                value = value[1:].lstrip(" \t")
+            return key, value
+    return stripped_line, ""
+
+
+def split_tokens(value: str) -> list[str]:
+    if not any(char in value for char in "\"'\\"):
+        # Nothing for shlex to unquote: split on its whitespace without the tokenizer.
+        return _PLAIN_TOKEN.findall(value)
+    try:
+        return shlex.split(value)
+    except ValueError:
+        return value.split()
+
+
+def is_wildcard(token: str) -> bool:
+    return any(marker in token for marker in WILDCARD_MARKERS)
+
+
+class HostBlock:
+    """One ``Host``/``Match`` block with its options and location in the source file.
+
+    A block is shared by every alias on its ``Host`` line, so its options are
+    stored once however many aliases point at it.
+    """
+
+    __slots__ = (
+        "kind",
+        "patterns",
+        "aliases",
+        "criteria",
+        "comment",
+        "source",
+        "header_line",
+        "header_offset",
+        "start_line",
+        "start_offset",
+        "end_line",
+        "end_offset",
+        "options",
+    )
+
+    def __init__(
+        self,
+        kind: str,
+        patterns: tuple[str, ...],
+        comment: str | None,
+        source: str,
+        header_line: int,
+        header_offset: int,
+        start_line: int,
+        start_offset: int,
+        criteria: str = "",
+    ) -> None:
+        self.kind = kind
+        self.patterns = patterns
+        aliases = tuple(token for token in patterns if not is_wildcard(token))
+        # Most Host lines have no wildcard: reuse the patterns tuple instead of an equal copy.
+        self.aliases = patterns if len(aliases) == len(patterns) else aliases
+        self.criteria = criteria
+        self.comment = comment
+        self.options: list[tuple[str, str]] = []
+        self.source = source
+        self.header_line = header_line
+        self.header_offset = header_offset
+        self.start_line = start_line
+        self.start_offset = start_offset
+        self.end_line = start_line + 1
+        self.end_offset = start_offset
+
+    STATE_FIELDS = __slots__
+
+    def state(self) -> tuple:
+        """Return the block as a plain tuple (see ``STATE_FIELDS``) for serialization."""
+        return tuple(getattr(self, name) for name in self.STATE_FIELDS[:-1]) + (tuple(self.options),)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> HostBlock:
+        block = cls.__new__(cls)
+        for name, value in zip(cls.STATE_FIELDS, state):
+            setattr(block, name, value)
+        block.options = list(block.options)
+        return block
+
+    def get(self, key: str, default: str | None = None) -> str | None:
+        """Return the first value for an option (keyword match is case-insensitive)."""
+        lowered = key.lower()
+        for option_key, value in self.options:
+            if option_key.lower() == lowered:
+                return value
+        return default
+
+    def has(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def with_options(self, extra_options: list[tuple[str, str]]) -> HostBlock:
+        """Return a copy of this block with ``extra_options`` appended (e.g. from an included file)."""
+        block = copy.copy(self)
+        block.options = self.options + extra_options
+        return block
+
+    def details(self) -> dict[str, str]:
+        """Return the legacy ``host_details`` dict for this block."""
+        data: dict[str, str] = {}
+        if self.comment:
+            data[COMMENT_KEY] = self.comment
+        for key, value in self.options:
+            data[key] = value
+        return data
+
+    def __repr__(self) -> str:
+        return f"HostBlock({self.kind} {' '.join(self.patterns) or self.criteria!r}, lines {self.start_line}-{self.end_line})"
+
+
+class IncludeDirective:
+    """An ``Include`` line and the block it appeared in (``None`` at top level)."""
+
+    def __init__(self, patterns: tuple[str, ...], line: int, block: HostBlock | None) -> None:
+        self.patterns = patterns
+        self.line = line
+        self.block = block
+
+
+class ConfigFragment:
+    """Parsed content of a single config file (the root config or an included one)."""
+
+    def __init__(self, path: str, signature: tuple[int, int, int, int]) -> None:
+        self.path = path
+        self.signature = signature
+        self.preamble: list[tuple[str, str]] = []
+        self.items: list[HostBlock | IncludeDirective] = []
+
+    @classmethod
+    def parse(cls, path: str) -> ConfigFragment:
+        fragment = cls(path, stat_signature(os.stat(path)))
+        with open(path, "rb") as config_file:
+            fragment._parse_lines(config_file)
+        return fragment
+
+    def _parse_lines(self, lines) -> None:
+        offset = 0
+        line_number = -1
+        current: HostBlock | None = None
+        comment: str | None = None
+        comment_line = comment_offset = None
+        # One string per distinct value: User, Port, IdentityFile... repeat across thousands of blocks.
+        values: dict[str, str] = {}
+
+        for line_number, raw_line in enumerate(lines):
+            line_offset = offset
+            offset += len(raw_line)
+            stripped_line = raw_line.decode("utf-8", errors="replace").strip()
+
+            if not stripped_line:
+                continue
+            if stripped_line.startswith("##"):
+                comment = stripped_line[2:].strip()
+                comment_line, comment_offset = line_number, line_offset
+                continue
+            if stripped_line.startswith("#"):
+                continue
+
+            key, value = split_keyword(stripped_line)
+            # Interned: the same few keywords repeat in every block of a large config.
+            key = sys.intern(key)
+            keyword = sys.intern(key.lower())
+
+            if keyword in ("host", "match"):
+                if current is not None:
+                    current.end_line = comment_line if comment_line is not None else line_number
+                    current.end_offset = comment_offset if comment_offset is not None else line_offset
+                current = HostBlock(
+                    kind=keyword,
+                    patterns=tuple(split_tokens(value)) if keyword == "host" else (),
+                    criteria=value if keyword == "match" else "",
+                    comment=comment,
+                    source=self.path,
+                    header_line=comment_line if comment_line is not None else line_number,
+                    header_offset=comment_offset if comment_offset is not None else line_offset,
+                    start_line=line_number,
+                    start_offset=line_offset,
+                )
+                self.items.append(current)
+                comment = None
+                comment_line = comment_offset = None
+            elif keyword == "include":
+                self.items.append(IncludeDirective(tuple(split_tokens(value)), line_number, current))
+            elif current is None:
+                self.preamble.append((key, value))
+            else:
+                current.options.append((key, values.setdefault(value, value)))
+
+        if current is not None:
+            current.end_line = line_number + 1
+            current.end_offset = offset
+
+
+MAX_INCLUDE_DEPTH = 16
+PARSE_WORKERS = 8
+
+_FRAGMENT_CACHE: dict[str, ConfigFragment] = {}
+
+
+def stat_signature(stat: os.stat_result) -> tuple[int, int, int, int]:
+    """(mtime, size, inode, ctime) of a config file.
+
+    The inode catches editors that save by replacing the file and the ctime
+    catches writes that restore the old mtime; neither shows in (mtime, size).
+    """
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino, stat.st_ctime_ns
+
+
+def _file_signature(path: str) -> tuple[int, int, int, int] | None:
+    try:
+        return stat_signature(os.stat(path))
+    except OSError:
+        return None
+
+
+def _dir_mtime(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def sources_unchanged(sources: dict[str, tuple[int, int, int, int]], include_dirs: dict[str, int | None]) -> bool:
+    """Return True when every file and include directory still has the recorded stat signature."""
+    return all(_file_signature(path) == signature for path, signature in sources.items()) and all(
+        _dir_mtime(path) == mtime for path, mtime in include_dirs.items()
+    )
+
+
+def _scanned_dirs(directory: str) -> list[str]:
+    """Every directory whose listing decides what a glob under ``directory`` matches.
+
+    That is ``directory`` itself when it has no glob magic; otherwise each
+    directory a magic component is matched in, plus every directory matched.
+    """
+    if not glob.has_magic(directory):
+        return [directory]
+    parts = directory.split(os.sep)
+    # Include patterns are absolute by now, so the first part is the root.
+    current = [parts[0] or os.sep]
+    scanned: list[str] = []
+    for component in parts[1:]:
+        if not component:
+            continue
+        if glob.has_magic(component):
+            scanned.extend(current)
+            current = [
+                match
+                for parent in current
+                for match in sorted(glob.glob(os.path.join(glob.escape(parent), component)))
+                if os.path.isdir(match)
+            ]
+        else:
+            current = [os.path.join(parent, component) for parent in current]
+    return scanned + current
+
+
+def include_base_dir(config_path: str) -> str:
+    """Directory that relative ``Include`` paths resolve against, as OpenSSH does."""
+    system_dir = "/etc/ssh"
+    if os.path.dirname(os.path.abspath(config_path)) == system_dir:
+        return system_dir
+    return os.path.expanduser("~/.ssh")
+
+
+def _load_fragments(paths: list[str]) -> dict[str, ConfigFragment]:
+    """Return fragments for ``paths``, re-parsing only those whose stat signature changed."""
+    fragments: dict[str, ConfigFragment] = {}
+    stale: list[str] = []
+
+    for path in paths:
+        cached = _FRAGMENT_CACHE.get(path)
+        if cached is not None and cached.signature == _file_signature(path):
+            fragments[path] = cached
+        else:
+            stale.append(path)
+
+    if len(stale) > 1:
+        # Imported lazily: concurrent.futures pulls in logging, which a cached direct connect never needs.
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(PARSE_WORKERS, len(stale))) as pool:
+            parsed = list(pool.map(_parse_fragment_or_none, stale))
+    else:
+        parsed = [_parse_fragment_or_none(path) for path in stale]
+
+    for path, fragment in zip(stale, parsed):
+        if fragment is None:
+            _FRAGMENT_CACHE.pop(path, None)
+            continue
+        _FRAGMENT_CACHE[path] = fragment
+        fragments[path] = fragment
+
+    return fragments
+
+
+def _parse_fragment_or_none(path: str) -> ConfigFragment | None:
+    try:
+        return ConfigFragment.parse(path)
+    except (FileNotFoundError, IsADirectoryError, PermissionError):
+        return None
+
+
+class ConfigIndex:
+    """Parsed SSH config with an alias index, built in a single pass over the file."""
+
+    def __init__(self, config_path: str) -> None:
+        self.config_path = config_path
+        self.include_base = include_base_dir(config_path)
+        self.blocks: list[HostBlock] = []
+        self.global_options: list[tuple[str, str]] = []
+        self.hosts: list[str] = []
+        self.sources: dict[str, tuple[int, int, int, int]] = {}
+        self.include_dirs: dict[str, int | None] = {}
+        self._alias_block: dict[str, HostBlock] = {}
+        # Tuples, not lists: nearly every token names a single block, and a 1-tuple is half the size.
+        self._token_blocks: dict[str, tuple[HostBlock, ...]] = {}
+        self._details = HostDetailsView(self)
+        self._resolver: HostResolver | None = None
+
+    @classmethod
+    def from_file(cls, config_path: str) -> ConfigIndex:
+        if not os.path.exists(config_path):
+            raise FileNotFoundError(f"O arquivo de configuração '{config_path}' não existe.")
+
+        index = cls(config_path)
+        fragments, expansions = index._collect_fragments()
+        index._assemble(fragments, expansions)
+        return index
+
+    @classmethod
+    def restore(
+        cls,
+        config_path: str,
+        blocks: list[HostBlock],
+        global_options: list[tuple[str, str]],
+        sources: dict[str, tuple[int, int, int, int]],
+        include_dirs: dict[str, int | None],
+    ) -> ConfigIndex:
+        """Rebuild an index from previously parsed blocks (e.g. loaded from the disk cache)."""
+        index = cls(config_path)
+        index.global_options = global_options
+        index.sources = sources
+        index.include_dirs = include_dirs
+        for block in blocks:
+            index._add_block(block)
+        return index
+
+    def is_current(self) -> bool:
+        """Return True while no contributing file or include directory has changed."""
+        return sources_unchanged(self.sources, self.include_dirs)
+
+    def _expand_include(self, pattern: str) -> list[str]:
+        pattern = os.path.expanduser(pattern)
+        if not os.path.isabs(pattern):
+            pattern = os.path.join(self.include_base, pattern)
+
+        for directory in _scanned_dirs(os.path.dirname(pattern)):
+            self.include_dirs[directory] = _dir_mtime(directory)
+        return sorted(glob.glob(pattern))
+
+    def _collect_fragments(self) -> tuple[dict[str, ConfigFragment], dict[int, list[str]]]:
+        """Breadth-first load of the root config and everything it includes."""
+        fragments: dict[str, ConfigFragment] = {}
+        expansions: dict[int, list[str]] = {}
+        pending = [self.config_path]
+
+        while pending:
+            loaded = _load_fragments(pending)
+            fragments.update(loaded)
+            pending = []
+
+            for fragment in loaded.values():
+                for item in fragment.items:
+                    if not isinstance(item, IncludeDirective):
+                        continue
+                    paths = [path for pattern in item.patterns for path in self._expand_include(pattern)]
+                    expansions[id(item)] = paths
+                    for path in paths:
+                        if path not in fragments and path not in pending:
+                            pending.append(path)
+
+        if self.config_path not in fragments:
+            raise FileNotFoundError(f"O arquivo de configuração '{self.config_path}' não existe.")
+        return fragments, expansions
+
+    def _assemble(self, fragments: dict[str, ConfigFragment], expansions: dict[int, list[str]]) -> None:
+        ordered: list[HostBlock] = []
+        extra_options: dict[int, list[tuple[str, str]]] = {}
+
+        def visit(fragment: ConfigFragment, chain: tuple[str, ...], enclosing: HostBlock | None) -> None:
+            self.sources[fragment.path] = fragment.signature
+            if enclosing is None:
+                self.global_options.extend(fragment.preamble)
+            elif fragment.preamble:
+                extra_options.setdefault(id(enclosing), []).extend(fragment.preamble)
+
+            for item in fragment.items:
+                if isinstance(item, HostBlock):
+                    ordered.append(item)
+                    continue
+                if len(chain) > MAX_INCLUDE_DEPTH:
+                    continue
+                for path in expansions.get(id(item), []):
+                    if path in chain or path not in fragments:
+                        continue
+                    visit(fragments[path], chain + (path,), item.block or enclosing)
+
+        visit(fragments[self.config_path], (self.config_path,), None)
+
+        for block in ordered:
+            extras = extra_options.get(id(block))
+            self._add_block(block.with_options(extras) if extras else block)
+
+    def _add_block(self, block: HostBlock) -> None:
+        self.blocks.append(block)
+        for token in block.patterns:
+            self._token_blocks[token] = self._token_blocks.get(token, ()) + (block,)
+        for alias in block.aliases:
+            if alias not in self._alias_block:
+                self.hosts.append(alias)
+            self._alias_block[alias] = block
+        self._resolver = None
+
+    def __contains__(self, alias: object) -> bool:
+        return alias in self._alias_block
+
+    def __len__(self) -> int:
+        return len(self.hosts)
+
+    def block_for(self, alias: str) -> HostBlock | None:
+        """Return the last block that declares ``alias`` (the one shown as host details)."""
+        return self._alias_block.get(alias)
+
+    def blocks_for(self, token: str) -> tuple[HostBlock, ...]:
+        """Return every ``Host`` block listing ``token`` verbatim, in file order."""
+        return self._token_blocks.get(token, ())
+
+    @property
+    def resolver(self) -> HostResolver:
+        """The compiled ``Host``/``Match`` resolver, built on first use."""
+        if self._resolver is None:
+            from src.ssh_connect.services.config_resolver import HostResolver
+
+            self._resolver = HostResolver(self)
+        return self._resolver
+
+    def get_option(self, alias: str, key: str) -> str | None:
+        """Return the effective value of ``key`` for ``alias``, as ``ssh -G`` would (wildcards and ``Match`` included)."""
+        return self.resolver.get(alias, key)
+
+    def has_identity_file(self, alias: str) -> bool:
+        """Return True when a block naming ``alias`` itself sets ``IdentityFile`` (inherited ones do not count)."""
+        return any(block.has("IdentityFile") for block in self.blocks_for(alias))
+
+    def hostname(self, alias: str) -> str | None:
+        value = self.get_option(alias, "HostName")
+        return value.split()[0] if value else None
+
+    def user(self, alias: str) -> str | None:
+        value = self.get_option(alias, "User")
+        return value.split()[0] if value else None
+
+    def details(self, alias: str) -> dict[str, str]:
+        """Return the comment and options written in ``alias``'s own block."""
+        block = self._alias_block.get(alias)
+        return block.details() if block else {}
+
+    def effective_details(self, alias: str) -> dict[str, str]:
+        """Return ``alias``'s comment and effective options, inherited ones included."""
+        return self.resolver.details(alias)
+
+    def host_details(self) -> HostDetailsView:
+        """Return the alias -> effective details mapping (a live view, see ``HostDetailsView``)."""
+        return self._details
+
+
+class HostDetailsView(Mapping):
+    """Read-only ``alias -> details`` mapping over an index, in host order.
+
+    Nothing is stored per alias: each lookup builds the dict from the
+    resolver's shared records, so callers may keep or modify what they get back.
+    """
+
+    __slots__ = ("_index",)
+
+    def __init__(self, index: ConfigIndex) -> None:
+        self._index = index
+
+    def __getitem__(self, alias: str) -> dict[str, str]:
+        if alias not in self._index:
+            raise KeyError(alias)
+        return self._index.effective_details(alias)
+
+    def __contains__(self, alias: object) -> bool:
+        return alias in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index.hosts)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f"HostDetailsView({len(self)} hosts)"
+
+
+# ``Host``/``Include`` lines with their raw value, matched in C so the scan skips option lines cheaply.
+_HOST_OR_INCLUDE_LINE = re.compile(rb"^[ \t]*(host|include)(?:[ \t]+=?|=)[ \t]*(.*?)[ \t\r]*$", re.IGNORECASE | re.MULTILINE)
+
+
+def scan_host_aliases(config_path: str) -> Iterator[str]:
+    """Yield the concrete aliases of ``config_path`` in index order, reading only ``Host`` and ``Include`` lines.
+
+    A cheap preview of ``ConfigIndex.hosts``: option lines are never split or
+    decoded, so hosts can be shown long before the full parse has finished.
+    """
+    index = ConfigIndex(config_path)
+    seen: set[str] = set()
+
+    def visit(path: str, chain: tuple[str, ...]) -> Iterator[str]:
+        try:
+            with open(path, "rb") as config_file:
+                data = config_file.read()
+        except OSError:
+            return
+        for match in _HOST_OR_INCLUDE_LINE.finditer(data):
+            value = match.group(2).decode("utf-8", errors="replace")
+            if match.group(1).lower() == b"host":
+                for token in split_tokens(value):
+                    if not is_wildcard(token) and token not in seen:
+                        seen.add(token)
+                        yield token
+            elif len(chain) <= MAX_INCLUDE_DEPTH:
+                for pattern in split_tokens(value):
+                    for included in index._expand_include(pattern):
+                        if included not in chain:
+                            yield from visit(included, chain + (included,))
+
+    yield from visit(config_path, (config_path,))
+
+
+_INDEX_CACHE: dict[str, ConfigIndex] = {}
+
+
+def load_config_index(config_path: str) -> ConfigIndex:
+    """Return the index for ``config_path``, re-parsing only the files that changed."""
+    if not os.path.exists(config_path):
+        _INDEX_CACHE.pop(config_path, None)
+        raise FileNotFoundError(f"O arquivo de configuração '{config_path}' não existe.")
+
+    cached = _INDEX_CACHE.get(config_path)
+    if cached is not None and cached.is_current():
+        return cached
+
+    with span(STAGE_CONFIG_PARSE, "parse", path=config_path) as current:
+        index = ConfigIndex.from_file(config_path)
+        current.note(hosts=len(index.hosts), files=len(index.sources))
+    _INDEX_CACHE[config_path] = index
+    return index
+
+
+def peek_config_index(config_path: str) -> ConfigIndex | None:
+    """Return the in-memory index for ``config_path`` if it is still current."""
+    cached = _INDEX_CACHE.get(config_path)
+    if cached is not None and cached.is_current():
+        return cached
+    return None
+
+
+def remember_config_index(index: ConfigIndex) -> None:
+    """Make ``index`` the in-memory index returned by :func:`load_config_index`."""
+    _INDEX_CACHE[index.config_path] = index
@@ -0,0 +1,298 @@
+"""Effective per-host options, resolved the way ``ssh -G`` does.
+
+OpenSSH reads the config top to bottom and keeps the first value obtained for
+each keyword, from every ``Host`` block whose patterns match the target and
+every ``Match`` block whose criteria hold. ``HostResolver`` compiles the
+patterns of an index once: verbatim names go in a dict, and all wildcard
+patterns (negated ones included) go in a single regex that reports, in one
+pass over the alias, which of them match.
+"""
+from __future__ import annotations
+
+import getpass
+import re
+from bisect import bisect_left
+from typing import TYPE_CHECKING
+
+from src.ssh_connect.services.config_index import COMMENT_KEY, split_tokens, is_wildcard
+
+if TYPE_CHECKING:
+    from src.ssh_connect.services.config_index import ConfigIndex, HostBlock
+
+# Keywords that accumulate instead of keeping the first value.
+MULTI_VALUE_KEYS = frozenset(
+    ("identityfile", "certificatefile", "localforward", "remoteforward", "dynamicforward", "sendenv", "setenv")
+)
+# ``ssh -G`` spelling for keywords written in another case, so ``details["HostName"]`` finds ``hostname ...``.
+CANONICAL_KEYS = {
+    key.lower(): key
+    for key in (
+        "AddKeysToAgent", "AddressFamily", "BatchMode", "BindAddress", "CertificateFile", "CheckHostIP",
+        "Ciphers", "ClearAllForwardings", "Compression", "ConnectTimeout", "ControlMaster", "ControlPath",
+        "ControlPersist", "DynamicForward", "ExitOnForwardFailure", "ForwardAgent", "ForwardX11",
+        "GlobalKnownHostsFile", "HashKnownHosts", "HostKeyAlgorithms", "HostKeyAlias", "HostName",
+        "IdentitiesOnly", "IdentityAgent", "IdentityFile", "KexAlgorithms", "LocalCommand", "LocalForward",
+        "LogLevel", "MACs", "PasswordAuthentication", "PermitLocalCommand", "Port", "PreferredAuthentications",
+        "ProxyCommand", "ProxyJump", "PubkeyAuthentication", "RemoteCommand", "RemoteForward", "RequestTTY",
+        "SendEnv", "ServerAliveCountMax", "ServerAliveInterval", "SetEnv", "StrictHostKeyChecking", "Tag",
+        "TCPKeepAlive", "UpdateHostKeys", "User", "UserKnownHostsFile", "VisualHostKey",
+    )
+}
+# Resolved option tuples kept per candidate list; the memo is dropped when it reaches this size.
+MEMO_SIZE = 8192
+# Stands for the options above the first ``Host``/``Match`` line in a run of blocks.
+GLOBAL_POSITION = -1
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate an ssh_config glob (``*`` and ``?`` only) to a regex body."""
+    return "".join(".*" if char == "*" else "." if char == "?" else re.escape(char) for char in pattern.lower())
+
+
+def match_pattern_list(value: str, patterns: str) -> bool:
+    """OpenSSH pattern-list semantics: some plain pattern matches and no ``!`` pattern does."""
+    value = value.lower()
+    matched = False
+    for pattern in patterns.split(","):
+        negated = pattern.startswith("!")
+        if negated:
+            pattern = pattern[1:]
+        if pattern and re.fullmatch(glob_to_regex(pattern), value):
+            if negated:
+                return False
+            matched = True
+    return matched
+
+
+def _normalize(options) -> list[tuple[str, tuple[str, str]]]:
+    """``(lowercase keyword, option)`` pairs, the option respelled per ``CANONICAL_KEYS``."""
+    normalized = []
+    for option in options:
+        lowered = option[0].lower()
+        canonical = CANONICAL_KEYS.get(lowered, option[0])
+        normalized.append((lowered, option if canonical == option[0] else (canonical, option[1])))
+    return normalized
+
+
+class MatchRule:
+    """A compiled ``Match`` line: ``(negated, criterion, argument)`` triples that must all hold.
+
+    ``exec``, ``localnetwork``, ``tagged`` and ``canonical`` need side effects
+    or state this side does not have (``exec`` runs a command), so a line using
+    them never matches.
+    """
+
+    def __init__(self, criteria: str) -> None:
+        self.terms: list[tuple[bool, str, str]] = []
+        tokens = split_tokens(criteria)
+        position = 0
+        while position < len(tokens):
+            name = tokens[position].lower()
+            negated = name.startswith("!")
+            name = name.lstrip("!")
+            position += 1
+            argument = ""
+            if name not in ("all", "canonical", "final") and position < len(tokens):
+                argument = tokens[position]
+                position += 1
+            self.terms.append((negated, name, argument))
+
+    def matches(self, alias: str, hostname: str, user: str) -> bool:
+        for negated, name, argument in self.terms:
+            if name in ("all", "final"):
+                result = True
+            elif name == "host":
+                result = match_pattern_list(hostname, argument)
+            elif name == "originalhost":
+                result = match_pattern_list(alias, argument)
+            elif name == "user":
+                result = match_pattern_list(user, argument)
+            elif name == "localuser":
+                result = match_pattern_list(getpass.getuser(), argument)
+            else:
+                return False
+            if result == negated:
+                return False
+        return True
+
+
+class HostResolver:
+    """First-match-wins effective options for any alias of a ``ConfigIndex``.
+
+    Built once per index (``ConfigIndex.resolver``); safe to share between the
+    loader thread and the UI. Verbatim names are looked up in the index's own
+    token map; compiling only does real work for the few blocks with
+    wildcards or negations.
+    """
+
+    def __init__(self, index: ConfigIndex) -> None:
+        self.index = index
+        self.blocks: list[HostBlock] = index.blocks
+        self.global_options = tuple(index.global_options)
+        self._positions = {id(block): position for position, block in enumerate(self.blocks)}
+        # Tokens spelled with capitals, by lowercase name: ssh compares host names case-insensitively.
+        self._folded: dict[str, list[str]] = {}
+        for token in index._token_blocks:
+            lowered = token.lower()
+            if lowered != token:
+                self._folded.setdefault(lowered, []).append(token)
+        # lowercase name -> positions of the blocks excluding it with ``!name``
+        self._rejected: dict[str, list[int]] = {}
+        # regex group -> (block position, negated) for wildcard patterns
+        self._wildcard_owners: list[list[tuple[int, bool]]] = []
+        self._match_rules: dict[int, MatchRule] = {}
+        self._memo: dict[tuple, tuple[tuple[str, str], ...]] = {}
+        # Positions of blocks that apply to many aliases, and the merged options of runs of them.
+        self._shared: set[int] = set()
+        self._runs: dict[tuple[int, ...], list[tuple[str, tuple[str, str]]]] = {}
+        self._signatures: dict[tuple, tuple[tuple[int, ...], frozenset[int]]] = {}
+
+        wildcard_groups: dict[str, int] = {}
+        for position, block in enumerate(self.blocks):
+            if block.kind == "match":
+                self._match_rules[position] = MatchRule(block.criteria)
+                continue
+            if block.aliases is block.patterns:
+                continue
+            self._shared.add(position)
+            for pattern in block.patterns:
+                negated = pattern.startswith("!")
+                if negated:
+                    pattern = pattern[1:]
+                if not is_wildcard(pattern):
+                    if negated:
+                        self._rejected.setdefault(pattern.lower(), []).append(position)
+                    continue
+                group = wildcard_groups.setdefault(pattern.lower(), len(wildcard_groups))
+                if group == len(self._wildcard_owners):
+                    self._wildcard_owners.append([])
+                self._wildcard_owners[group].append((position, negated))
+
+        # One optional lookahead per pattern: the empty group after it is set only when the pattern matches.
+        self._wildcards = re.compile("".join(f"(?:(?={glob_to_regex(pattern)}\\Z)()|)" for pattern in wildcard_groups))
+        self._match_positions = list(self._match_rules)
+
+    def candidates(self, alias: str) -> tuple[int, ...]:
+        """Positions of the ``Host`` blocks matching ``alias`` plus every ``Match`` block, in file order."""
+        positions = self._positions
+        lowered = alias.lower()
+        literal = [positions[id(block)] for block in self.index.blocks_for(alias)]
+        if self._folded:
+            for token in self._folded.get(lowered, ()):
+                if token != alias:
+                    literal += [positions[id(block)] for block in self.index.blocks_for(token)]
+        wildcard, excluded = self._wildcard_hits(lowered) if self._wildcard_owners else ((), ())
+        rejected = self._rejected.get(lowered) if self._rejected else None
+
+        if len(literal) == 1 and not excluded and not rejected and not self._match_positions:
+            # The usual shape: one block naming the alias, slotted among the wildcard blocks.
+            position = literal[0]
+            at = bisect_left(wildcard, position)
+            if at < len(wildcard) and wildcard[at] == position:
+                return wildcard
+            return wildcard[:at] + (position,) + wildcard[at:]
+
+        matched = set(literal)
+        matched.update(wildcard, self._match_positions)
+        matched.difference_update(excluded, rejected or ())
+        return tuple(sorted(matched))
+
+    def _wildcard_hits(self, lowered: str) -> tuple[tuple[int, ...], frozenset[int]]:
+        """Blocks selected and excluded by wildcard patterns, cached per combination of matching patterns."""
+        groups = self._wildcards.match(lowered).groups()
+        hits = self._signatures.get(groups)
+        if hits is None:
+            selected: set[int] = set()
+            excluded: set[int] = set()
+            for group, hit in enumerate(groups):
+                if hit is not None:
+                    for position, negated in self._wildcard_owners[group]:
+                        (excluded if negated else selected).add(position)
+            hits = (tuple(sorted(selected - excluded)), frozenset(excluded))
+            self._signatures[groups] = hits
+        return hits
+
+    def options(self, alias: str) -> tuple[tuple[str, str], ...]:
+        """Effective ``(keyword, value)`` pairs for ``alias``; multi-value keywords repeat."""
+        candidates = self.candidates(alias)
+        # ``Match`` criteria depend on the alias itself, so only plain ``Host`` results are shared.
+        key = (alias, candidates) if self._match_positions else candidates
+        resolved = self._memo.get(key)
+        if resolved is None:
+            resolved = self._merge(alias, candidates)
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[key] = resolved
+        return resolved
+
+    def _merge(self, alias: str, candidates: tuple[int, ...]) -> tuple[tuple[str, str], ...]:
+        # First match wins is associative, so consecutive shared blocks (global
+        # options, wildcards) are merged once per distinct run and reused.
+        seen: set[str] = set()
+        resolved: list[tuple[str, str]] = []
+        run = [GLOBAL_POSITION]
+        for position in candidates:
+            if position in self._shared:
+                run.append(position)
+                continue
+            self._take(self._merged_run(tuple(run)), seen, resolved)
+            run = []
+            rule = self._match_rules.get(position)
+            if rule is not None:
+                # Criteria see the options gathered so far (the blocks above the ``Match`` line).
+                current = dict(resolved)
+                hostname = current.get("HostName", alias).replace("%h", alias)
+                if not rule.matches(alias, hostname, current.get("User") or getpass.getuser()):
+                    continue
+            for option in self.blocks[position].options:
+                option_key = option[0]
+                lowered = option_key.lower()
+                if lowered not in seen or lowered in MULTI_VALUE_KEYS:
+                    seen.add(lowered)
+                    canonical = CANONICAL_KEYS.get(lowered, option_key)
+                    resolved.append(option if canonical == option_key else (canonical, option[1]))
+        self._take(self._merged_run(tuple(run)), seen, resolved)
+        return tuple(resolved)
+
+    def _merged_run(self, run: tuple[int, ...]) -> list[tuple[str, tuple[str, str]]]:
+        merged = self._runs.get(run)
+        if merged is None:
+            merged = []
+            seen: set[str] = set()
+            for position in run:
+                options = self.global_options if position == GLOBAL_POSITION else self.blocks[position].options
+                for lowered, option in _normalize(options):
+                    if lowered not in seen or lowered in MULTI_VALUE_KEYS:
+                        seen.add(lowered)
+                        merged.append((lowered, option))
+            self._runs[run] = merged
+        return merged
+
+    @staticmethod
+    def _take(normalized: list[tuple[str, tuple[str, str]]], seen: set[str], resolved: list[tuple[str, str]]) -> None:
+        for lowered, option in normalized:
+            if lowered not in seen or lowered in MULTI_VALUE_KEYS:
+                seen.add(lowered)
+                resolved.append(option)
+
+    def get(self, alias: str, key: str) -> str | None:
+        """First effective value of ``key`` for ``alias``, or None."""
+        lowered = key.lower()
+        for option_key, value in self.options(alias):
+            if option_key.lower() == lowered:
+                return value
+        return None
+
+    def details(self, alias: str) -> dict[str, str]:
+        """The ``host_details`` dict: the alias's ``##`` comment, then its effective options."""
+        options = self.options(alias)
+        block = self.index.block_for(alias)
+        comment = block.comment if block is not None else None
+        data = {COMMENT_KEY: comment} if comment else {}
+        data.update(options)
+        if len(data) < len(options) + bool(comment):
+            # A multi-value keyword repeats: list every value, in order.
+            data = {COMMENT_KEY: comment} if comment else {}
+            for key, value in options:
+                data[key] = f"{data[key]}, {value}" if key in data else value
+        return data
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import getpass
+import hashlib
 import os
 import shlex
 import tempfile
-from collections import defaultdict
+from collections.abc import Mapping
+
+from src.ssh_connect.services.config_index import load_config_index
+from src.ssh_connect.services.paths import cache_dir, ensure_private_dir
+from src.ssh_connect.services.timing_service import STAGE_TEMP_CONFIG, span
 
 
 def ensure_ssh_config(config_path: str) -> str:
@@ -29,49 +34,14 @@ def ensure_ssh_config(config_path: str) -> str:
     return config_path
 
 
-def parse_ssh_hosts(config_path: str) -> tuple[list[str], dict[str, dict[str, str]]]:
-    """Read SSH config hosts and collect host details plus leading comments."""
-    if not os.path.exists(config_path):
-        raise FileNotFoundError(f"O arquivo de configuração '{config_path}' não existe.")
-
-    config_data: dict[str, dict[str, str]] = defaultdict(dict)
-    hosts: list[str] = []
-    current_comment = None
-    current_hosts: list[str] = []
-
-    def register_host(host_name: str) -> None:
-        if host_name not in hosts:
-            hosts.append(host_name)
-        config_data[host_name] = {}
-        if current_comment:
-            config_data[host_name]["Comentário"] = current_comment
-
-    with open(config_path, "r", encoding="utf-8") as config_file:
-        for line in config_file:
-            stripped_line = line.strip()
-
-            if stripped_line.startswith("##"):
-                current_comment = stripped_line[2:].strip()
-            elif stripped_line.lower().startswith("host "):
-                host_tokens = [
-                    token
-                    for token in shlex.split(stripped_line)[1:]
-                    if not any(marker in token for marker in ("*", "?", "!"))
-                ]
-
-                current_hosts = host_tokens
-                for host_name in current_hosts:
-                    register_host(host_name)
-
-                if current_comment:
-                    current_comment = None
-            elif current_hosts and " " in stripped_line:
-                key, value = stripped_line.split(maxsplit=1)
-                if key != "#":
-                    for host_name in current_hosts:
-                        config_data[host_name][key] = value
-
-    return hosts, dict(config_data)
+def parse_ssh_hosts(config_path: str) -> tuple[list[str], Mapping[str, dict[str, str]]]:
+    """Read SSH config hosts and collect host details plus leading comments.
+
+    The details are a read-only view over the index: aliases of one ``Host``
+    line share a single record instead of one dict each.
+    """
+    index = load_config_index(config_path)
+    return list(index.hosts), index.host_details()
 
 
 def host_has_identity_file(host: str, config_path: str) -> bool:
@@ -79,18 +49,7 @@ def host_has_identity_file(host: str, config_path: str) -> bool:
     if not os.path.exists(config_path):
         return False
 
-    with open(config_path, "r", encoding="utf-8") as config_file:
-        inside_host = False
-
-        for line in config_file:
-            stripped_line = line.strip()
-            if stripped_line.lower().startswith("host "):
-                host_tokens = shlex.split(stripped_line)[1:]
-                inside_host = host in host_tokens
-            elif inside_host and stripped_line.lower().startswith("identityfile "):
-                return True
-
-    return False
+    return load_config_index(config_path).has_identity_file(host)
 
 
 def get_host_user(host: str, config_path: str | None = None) -> tuple[str, str]:
@@ -98,41 +57,17 @@ def get_host_user(host: str, config_path: str | None = None) -> tuple[str, str]:
     if config_path is None:
         config_path = os.path.expanduser("~/.ssh/config")
 
-    hostname = None
-    user = getpass.getuser()
-    capturing = False
-
     if not os.path.exists(config_path):
         print(f"Erro: O arquivo de configuração '{config_path}' não existe.")
-        return host, user
-
-    with open(config_path, "r", encoding="utf-8") as config_file:
-        for line in config_file:
-            stripped_line = line.strip()
-
-            if stripped_line.lower().startswith("host "):
-                capturing = host in shlex.split(stripped_line)[1:]
-                continue
-
-            if capturing:
-                if stripped_line.lower().startswith("hostname "):
-                    hostname = stripped_line.split()[1]
-                elif stripped_line.lower().startswith("user "):
-                    user = stripped_line.split()[1]
-
-            if hostname and user:
-                break
-
-    return hostname if hostname else host, user
+        return host, getpass.getuser()
 
+    index = load_config_index(config_path)
+    return index.hostname(host) or host, index.user(host) or getpass.getuser()
 
-def create_temp_config_with_keys(config_path: str, keys_dir: str | None) -> str:
-    """Create a temporary SSH config overriding IdentityFile paths to a target dir."""
-    temp_config = tempfile.NamedTemporaryFile(delete=False, mode="w", encoding="utf-8")
-    temp_path = temp_config.name
-    temp_config.close()
 
-    with open(config_path, "r", encoding="utf-8") as original, open(temp_path, "w", encoding="utf-8") as temp:
+def _write_config_with_keys(config_path: str, keys_dir: str | None, temp) -> None:
+    """Copy ``config_path`` into the open file ``temp``, remapping IdentityFile paths to ``keys_dir``."""
+    with open(config_path, "r", encoding="utf-8") as original:
         for line in original:
             line_without_break = line.rstrip("\n")
             stripped_line = line_without_break.strip()
@@ -159,4 +94,55 @@ def create_temp_config_with_keys(config_path: str, keys_dir: str | None) -> str:
             else:
                 temp.write(line)
 
+
+def create_temp_config_with_keys(config_path: str, keys_dir: str | None) -> str:
+    """Create a temporary SSH config overriding IdentityFile paths to a target dir."""
+    with span(STAGE_TEMP_CONFIG, "create_temp_config_with_keys", path=config_path):
+        temp_config = tempfile.NamedTemporaryFile(delete=False, mode="w", encoding="utf-8")
+        temp_path = temp_config.name
+        temp_config.close()
+
+        with open(temp_path, "w", encoding="utf-8") as temp:
+            _write_config_with_keys(config_path, keys_dir, temp)
+
     return temp_path
+
+
+def cached_config_with_keys(config_path: str, keys_dir: str) -> str:
+    """Return a reusable SSH config with IdentityFile paths remapped to ``keys_dir``.
+
+    The rewritten file lives under the cache directory and is named after the
+    config path, the keys dir and the config's (mtime, size), so it is only
+    regenerated when the source config changes. Older versions are removed.
+    """
+    config_path = os.path.abspath(config_path)
+    keys_dir = os.path.abspath(keys_dir)
+    stat = os.stat(config_path)
+
+    owner = hashlib.sha1(f"{config_path}\0{keys_dir}".encode("utf-8")).hexdigest()[:16]
+    version = hashlib.sha1(f"{stat.st_mtime_ns}\0{stat.st_size}\0{stat.st_ino}".encode("utf-8")).hexdigest()[:16]
+    directory = ensure_private_dir(os.path.join(cache_dir(), "configs"))
+    target = os.path.join(directory, f"{owner}-{version}.conf")
+
+    if os.path.exists(target):
+        return target
+
+    with span(STAGE_TEMP_CONFIG, "cached_config_with_keys", path=config_path):
+        fd, temp_path = tempfile.mkstemp(prefix=f".{owner}-", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as temp:
+                _write_config_with_keys(config_path, keys_dir, temp)
+            os.replace(temp_path, target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        for filename in os.listdir(directory):
+            if filename.startswith(f"{owner}-") and filename != os.path.basename(target):
+                try:
+                    os.remove(os.path.join(directory, filename))
+                except OSError:
+                    pass
+
+    return target
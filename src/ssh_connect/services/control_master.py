@@ -0,0 +1,263 @@
+"""Pool of persistent OpenSSH ``ControlMaster`` sockets shared by connect, key copy and remote commands."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import time
+from typing import NamedTuple
+
+from src.ssh_connect.services.config_index import load_config_index
+from src.ssh_connect.services.paths import cache_dir, ensure_private_dir
+
+DEFAULT_TTL = 600
+DEFAULT_MAX_SIZE = 16
+# Upper bound for ``ssh -O`` calls and for backgrounding a new master (-f returns after auth).
+CONTROL_TIMEOUT = 10
+OPEN_TIMEOUT = 30
+# Any of these in a host's effective config means the user runs multiplexing (or turned it off) themselves.
+MULTIPLEX_KEYS = ("ControlMaster", "ControlPath", "ControlPersist")
+
+
+class MasterInfo(NamedTuple):
+    host: str
+    config_path: str
+    socket_path: str
+    created: float
+    last_used: float
+
+
+class ControlMasterPool:
+    """ControlMaster sockets kept under ``<cache>/cm``, one per (config, host).
+
+    Each socket has a small JSON sidecar with the host and config it belongs
+    to; the sidecar's mtime is the last time the master was handed out, which
+    drives LRU eviction once ``max_size`` masters are open. A master is only
+    registered once its socket exists, so a failed connect leaves no sidecar
+    and evicts nothing. ``ssh`` itself closes a master after ``ttl`` idle
+    seconds (``ControlPersist``), and ``prune`` catches the ones that died or
+    outlived it. Hosts whose config
+    sets ``ControlMaster``, ``ControlPath`` or ``ControlPersist`` are left
+    alone, since command-line options would override those settings.
+    """
+
+    def __init__(self, socket_dir: str | None = None, ttl: int = DEFAULT_TTL, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.socket_dir = socket_dir or os.path.join(cache_dir(), "cm")
+        self.ttl = ttl
+        self.max_size = max(1, max_size)
+
+    def socket_path(self, host: str, config_path: str) -> str:
+        # Unix socket paths are limited to ~104 bytes, so the name is a short digest.
+        digest = hashlib.sha1(f"{os.path.abspath(config_path)}\0{host}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.socket_dir, digest)
+
+    def _meta_path(self, socket_path: str) -> str:
+        return f"{socket_path}.json"
+
+    def _control(self, master: MasterInfo, command: str) -> bool:
+        try:
+            result = subprocess.run(
+                ["ssh", "-F", master.config_path, "-o", f"ControlPath={master.socket_path}", "-O", command, master.host],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=CONTROL_TIMEOUT,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        return result.returncode == 0
+
+    def _forget(self, master: MasterInfo) -> None:
+        for path in (master.socket_path, self._meta_path(master.socket_path)):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def _read_meta(self, meta_path: str) -> MasterInfo | None:
+        try:
+            with open(meta_path, "r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+            last_used = os.stat(meta_path).st_mtime
+        except (OSError, ValueError):
+            return None
+        socket_path = meta_path[: -len(".json")]
+        return MasterInfo(meta["host"], meta["config_path"], socket_path, meta["created"], last_used)
+
+    def masters(self) -> list[MasterInfo]:
+        """Registered masters whose socket still exists, most recently used first."""
+        try:
+            names = os.listdir(self.socket_dir)
+        except FileNotFoundError:
+            return []
+
+        found = []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            master = self._read_meta(os.path.join(self.socket_dir, name))
+            if master is None:
+                continue
+            if not os.path.exists(master.socket_path):
+                self._forget(master)
+                continue
+            found.append(master)
+        found.sort(key=lambda master: master.last_used, reverse=True)
+        return found
+
+    def find(self, host: str, config_path: str) -> MasterInfo | None:
+        master = self._read_meta(self._meta_path(self.socket_path(host, config_path)))
+        if master is None or not os.path.exists(master.socket_path):
+            return None
+        return master
+
+    def check(self, master: MasterInfo) -> bool:
+        """Health check via ``ssh -O check``; dead masters are forgotten."""
+        if os.path.exists(master.socket_path) and self._control(master, "check"):
+            return True
+        self._forget(master)
+        return False
+
+    def close(self, master: MasterInfo) -> bool:
+        """Tear a master down with ``ssh -O exit``."""
+        closed = self._control(master, "exit")
+        self._forget(master)
+        return closed
+
+    def close_all(self) -> int:
+        masters = self.masters()
+        for master in masters:
+            self.close(master)
+        return len(masters)
+
+    def prune(self, quick: bool = False) -> list[MasterInfo]:
+        """Drop dead masters, close idle ones past the TTL and enforce ``max_size``; returns the removed ones.
+
+        A ``quick`` prune (run when the pool is loaded) spawns no ``ssh -O
+        check``: it only drops masters whose socket is gone and enforces
+        ``max_size``, leaving idle ones to ``ControlPersist``.
+        """
+        removed = []
+        now = time.time()
+        alive = []
+        for master in self.masters():
+            if quick:
+                alive.append(master)
+            elif now - master.last_used > self.ttl:
+                self.close(master)
+                removed.append(master)
+            elif not self.check(master):
+                removed.append(master)
+            else:
+                alive.append(master)
+        for master in alive[self.max_size:]:
+            self.close(master)
+            removed.append(master)
+        return removed
+
+    def register(self, host: str, config_path: str) -> bool:
+        """Record (or touch) the sidecar of the host's master, evicting least recently used ones beyond ``max_size``.
+
+        False, and nothing recorded, when no master socket exists for the host.
+        """
+        socket_path = self.socket_path(host, config_path)
+        if not os.path.exists(socket_path):
+            return False
+        meta_path = self._meta_path(socket_path)
+        if os.path.exists(meta_path):
+            os.utime(meta_path)
+            return True
+
+        for master in self.masters()[self.max_size - 1:]:
+            self.close(master)
+        with open(meta_path, "w", encoding="utf-8") as handle:
+            json.dump({"host": host, "config_path": os.path.abspath(config_path), "created": time.time()}, handle)
+        return True
+
+    def user_multiplexing(self, host: str, config_path: str) -> bool:
+        """True when the host's effective options set any of ``MULTIPLEX_KEYS`` (``Host *`` and ``Match`` included)."""
+        if not os.path.exists(config_path):
+            return False
+        index = load_config_index(config_path)
+        return any(index.get_option(host, key) is not None for key in MULTIPLEX_KEYS)
+
+    def master_options(self, host: str, config_path: str) -> list[str]:
+        """``ssh`` options that reuse the host's master or let this session become one (``ControlMaster=auto``).
+
+        Empty when the user configures multiplexing for the host. Nothing is
+        registered yet: call ``register`` once the session succeeded.
+        """
+        if self.user_multiplexing(host, config_path):
+            return []
+        socket_path = self.socket_path(host, config_path)
+        ensure_private_dir(self.socket_dir)
+        return [
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={socket_path}",
+            "-o", f"ControlPersist={self.ttl}",
+        ]
+
+    def live_socket(self, host: str, config_path: str) -> str | None:
+        """Socket of a healthy master for ``host`` (touching it), or None.
+
+        A master still in its first session has a socket but no sidecar yet;
+        it is registered here once ``ssh -O check`` answers.
+        """
+        if self.user_multiplexing(host, config_path):
+            return None
+        master = self.find(host, config_path)
+        if master is None:
+            socket_path = self.socket_path(host, config_path)
+            if not os.path.exists(socket_path):
+                return None
+            master = MasterInfo(host, config_path, socket_path, 0, 0)
+        if not self.check(master):
+            return None
+        self.register(host, config_path)
+        return master.socket_path
+
+    def open(self, host: str, config_path: str, ssh_config_path: str | None = None) -> str | None:
+        """Return a live master socket for ``host``, starting a background master (``-M -N -f``) when needed.
+
+        The new master runs non-interactively (BatchMode) with its output on
+        /dev/null, so callers that capture a command's output never block on a
+        pipe held open by the backgrounded master. ssh reads ``ssh_config_path``
+        (e.g. the copy with remapped keys); the socket stays keyed on ``config_path``.
+        None when the user configures multiplexing for the host.
+        """
+        if self.user_multiplexing(host, config_path):
+            return None
+        socket_path = self.live_socket(host, config_path)
+        if socket_path is not None:
+            return socket_path
+
+        options = self.master_options(host, config_path)
+        socket_path = self.socket_path(host, config_path)
+        try:
+            returncode = subprocess.run(
+                ["ssh", "-F", ssh_config_path or config_path, *options, "-o", "BatchMode=yes", "-M", "-N", "-f", host],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=OPEN_TIMEOUT,
+            ).returncode
+        except (OSError, subprocess.TimeoutExpired):
+            returncode = None
+        if returncode == 0 and self.register(host, config_path):
+            return socket_path
+        self._forget(MasterInfo(host, config_path, socket_path, 0, 0))
+        return None
+
+
+_DEFAULT_POOL: ControlMasterPool | None = None
+
+
+def default_pool() -> ControlMasterPool:
+    """Process-wide pool rooted in the current cache directory, quick-pruned when first loaded."""
+    global _DEFAULT_POOL
+    socket_dir = os.path.join(cache_dir(), "cm")
+    if _DEFAULT_POOL is None or _DEFAULT_POOL.socket_dir != socket_dir:
+        _DEFAULT_POOL = ControlMasterPool(socket_dir)
+        _DEFAULT_POOL.prune(quick=True)
+    return _DEFAULT_POOL
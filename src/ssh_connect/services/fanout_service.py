@@ -0,0 +1,189 @@
+"""Run one command on many hosts concurrently, streaming prefixed output as it arrives."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import signal
+import time
+from collections.abc import Callable, Iterable
+from fnmatch import fnmatchcase
+from typing import NamedTuple
+
+from src.ssh_connect.services.config_service import cached_config_with_keys
+from src.ssh_connect.services.control_master import ControlMasterPool, default_pool
+from src.ssh_connect.services.ssh_service import remote_command_argv
+
+DEFAULT_PARALLELISM = 32
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_TIMEOUT = "timeout"
+STATUS_CANCELLED = "cancelled"
+STATUS_ERROR = "error"
+
+STREAM_STDOUT = "stdout"
+STREAM_STDERR = "stderr"
+
+LineCallback = Callable[[str, str, str], None]
+
+
+class HostRunResult(NamedTuple):
+    host: str
+    status: str
+    returncode: int | None = None
+    duration: float = 0.0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+
+def select_hosts(hosts: Iterable[str], patterns: Iterable[str]) -> list[str]:
+    """Hosts matching any of the (comma separated) glob ``patterns``, in config order."""
+    globs = [glob.strip() for pattern in patterns for glob in pattern.split(",") if glob.strip()]
+    return [host for host in hosts if any(fnmatchcase(host, glob) for glob in globs)]
+
+
+def summarize(results: Iterable[HostRunResult]) -> list[tuple[str, list[str]]]:
+    """Group hosts by outcome (``exit 0``, ``exit 255``, ``timeout``...), most common first."""
+    groups: dict[str, list[str]] = {}
+    for result in results:
+        label = f"exit {result.returncode}" if result.returncode is not None else result.status
+        groups.setdefault(label, []).append(result.host)
+    return sorted(groups.items(), key=lambda item: (-len(item[1]), item[0]))
+
+
+def exit_code(results: Iterable[HostRunResult]) -> int:
+    """0 when every host succeeded, 1 otherwise."""
+    return 0 if all(result.ok for result in results) else 1
+
+
+class FanoutRunner:
+    """Bounded pool of ``ssh`` subprocesses, one per host.
+
+    Live ControlMaster sockets from the pool are reused; no new masters are
+    started, so a fleet-wide run never evicts the interactive ones. With
+    ``fail_fast`` the first failure kills the running commands and the hosts
+    not started yet are reported as cancelled.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        keys_dir: str | None = None,
+        parallelism: int = DEFAULT_PARALLELISM,
+        timeout: float | None = None,
+        fail_fast: bool = False,
+        pool: ControlMasterPool | None = None,
+    ) -> None:
+        self.config_path = config_path
+        self.keys_dir = keys_dir
+        self.parallelism = max(1, parallelism)
+        self.timeout = timeout
+        self.fail_fast = fail_fast
+        self.pool = pool or default_pool()
+        self._ssh_config_path = config_path
+
+    def _argv(self, host: str, command: str) -> list[str]:
+        master = self.pool.find(host, self.config_path)
+        socket_path = master.socket_path if master is not None else None
+        return remote_command_argv(host, command, self._ssh_config_path, None, socket_path, batch_mode=True)
+
+    @staticmethod
+    async def _pump(host: str, stream_name: str, stream: asyncio.StreamReader, on_line: LineCallback) -> None:
+        while True:
+            line = await stream.readline()
+            if not line:
+                return
+            on_line(host, stream_name, line.decode("utf-8", errors="replace").rstrip("\r\n"))
+
+    async def run_host(self, host: str, command: str, on_line: LineCallback) -> HostRunResult:
+        started = time.monotonic()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *self._argv(host, command),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+        except OSError as exc:
+            return HostRunResult(host, STATUS_ERROR, error=str(exc))
+
+        # The exit is awaited under the same deadline as the output: a command that
+        # closes its pipes but keeps running (a daemon, ``nohup … &``) still times out.
+        completion = asyncio.gather(
+            self._pump(host, STREAM_STDOUT, process.stdout, on_line),
+            self._pump(host, STREAM_STDERR, process.stderr, on_line),
+            process.wait(),
+        )
+        try:
+            *_, returncode = await asyncio.wait_for(asyncio.shield(completion), self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            # Kill the whole session: a ProxyCommand child would otherwise keep the pipes open.
+            with contextlib.suppress(ProcessLookupError):
+                os.killpg(process.pid, signal.SIGKILL)
+            completion.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await completion
+            await process.wait()
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            return HostRunResult(host, STATUS_TIMEOUT, duration=time.monotonic() - started, error="timeout")
+
+        status = STATUS_OK if returncode == 0 else STATUS_FAILED
+        return HostRunResult(host, status, returncode, time.monotonic() - started)
+
+    async def run(
+        self,
+        hosts: Iterable[str],
+        command: str,
+        on_line: LineCallback,
+        on_result: Callable[[HostRunResult], None] | None = None,
+    ) -> list[HostRunResult]:
+        """Run ``command`` on every host; results keep the order of ``hosts``."""
+        hosts = list(hosts)
+        if self.keys_dir:
+            self._ssh_config_path = cached_config_with_keys(self.config_path, self.keys_dir)
+        semaphore = asyncio.Semaphore(self.parallelism)
+        results: dict[str, HostRunResult] = {}
+        failed = asyncio.Event()
+
+        async def run_one(host: str) -> None:
+            async with semaphore:
+                if failed.is_set():
+                    return
+                result = await self.run_host(host, command, on_line)
+            results[host] = result
+            if on_result is not None:
+                on_result(result)
+            if self.fail_fast and not result.ok:
+                failed.set()
+
+        tasks = [asyncio.ensure_future(run_one(host)) for host in hosts]
+        try:
+            if self.fail_fast:
+                waiter = asyncio.ensure_future(failed.wait())
+                pending = set(tasks)
+                while pending and not failed.is_set():
+                    _, pending = await asyncio.wait(pending | {waiter}, return_when=asyncio.FIRST_COMPLETED)
+                    pending.discard(waiter)
+                waiter.cancel()
+                for task in pending:
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        ordered = []
+        for host in hosts:
+            result = results.get(host)
+            if result is None:
+                result = HostRunResult(host, STATUS_CANCELLED)
+                if on_result is not None:
+                    on_result(result)
+            ordered.append(result)
+        return ordered
@@ -0,0 +1,172 @@
+"""Connection history in SQLite with incrementally maintained frecency scores."""
+from __future__ import annotations
+
+import math
+import os
+import sqlite3
+import time
+from collections.abc import Iterable, Mapping
+from typing import NamedTuple
+
+from src.ssh_connect.services.paths import ensure_private_dir, state_dir
+
+HALF_LIFE = 7 * 24 * 3600.0
+DECAY = math.log(2) / HALF_LIFE
+# ssh exits 255 when the connection itself failed; such attempts still count, but less.
+FAILED_EXIT = 255
+FAILED_WEIGHT = 0.25
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS connections (
+    id INTEGER PRIMARY KEY,
+    host TEXT NOT NULL,
+    ts REAL NOT NULL,
+    exit_code INTEGER,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS connections_host_ts ON connections (host, ts);
+CREATE TABLE IF NOT EXISTS frecency (
+    host TEXT PRIMARY KEY,
+    log_score REAL NOT NULL,
+    visits INTEGER NOT NULL,
+    last_ts REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+UPSERT_FRECENCY = """
+INSERT INTO frecency (host, log_score, visits, last_ts) VALUES (?, ?, 1, ?)
+ON CONFLICT (host) DO UPDATE SET
+    log_score = logaddexp(log_score, excluded.log_score),
+    visits = visits + 1,
+    last_ts = max(last_ts, excluded.last_ts)
+"""
+
+
+class Connection(NamedTuple):
+    host: str
+    timestamp: float
+    exit_code: int | None = None
+    duration: float | None = None
+
+
+def default_history_path() -> str:
+    return os.path.join(state_dir(), "history.sqlite3")
+
+
+def logaddexp(a: float, b: float) -> float:
+    """``log(exp(a) + exp(b))`` without overflowing."""
+    if a < b:
+        a, b = b, a
+    return a + math.log1p(math.exp(b - a))
+
+
+def visit_log_weight(timestamp: float, exit_code: int | None = None) -> float:
+    """Log of one visit's weight, ``exp(DECAY * timestamp)`` scaled down for failed connections."""
+    weight = DECAY * timestamp
+    if exit_code == FAILED_EXIT:
+        weight += math.log(FAILED_WEIGHT)
+    return weight
+
+
+class HistoryStore:
+    """Append-only connection log plus a per-host frecency row.
+
+    The frecency of a host is ``sum(w_i * 2 ** -((now - t_i) / HALF_LIFE))``
+    over its visits. Stored as ``log(sum(w_i * exp(DECAY * t_i)))`` it never
+    needs to decay: recording a visit is a single ``logaddexp`` upsert, and
+    the stored value already orders hosts correctly at any ``now``.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or default_history_path()
+        self._connection: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            ensure_private_dir(os.path.dirname(self.path))
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            os.chmod(self.path, 0o600)
+            connection.create_function("logaddexp", 2, logaddexp, deterministic=True)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def record(
+        self,
+        host: str,
+        exit_code: int | None = None,
+        duration: float | None = None,
+        timestamp: float | None = None,
+    ) -> None:
+        self.record_many([Connection(host, time.time() if timestamp is None else timestamp, exit_code, duration)])
+
+    def record_many(self, connections: Iterable[Connection]) -> None:
+        """Record several connections in one transaction."""
+        connections = list(connections)
+        db = self._db()
+        with db:
+            db.executemany("INSERT INTO connections (host, ts, exit_code, duration) VALUES (?, ?, ?, ?)", connections)
+            db.executemany(
+                UPSERT_FRECENCY,
+                [(item.host, visit_log_weight(item.timestamp, item.exit_code), item.timestamp) for item in connections],
+            )
+
+    def log_scores(self) -> dict[str, float]:
+        """Stored ``log_score`` per host; ordering by it is ordering by frecency."""
+        return dict(self._db().execute("SELECT host, log_score FROM frecency"))
+
+    def scores(self, now: float | None = None) -> dict[str, float]:
+        """Frecency per host at ``now``, in decayed visits (1.0 = one visit right now)."""
+        offset = DECAY * (time.time() if now is None else now)
+        return {host: math.exp(min(log_score - offset, 700.0)) for host, log_score in self.log_scores().items()}
+
+    def recent(self, host: str | None = None, limit: int = 20) -> list[Connection]:
+        """Latest connections, newest first (uses the ``(host, ts)`` index when ``host`` is given)."""
+        if host is None:
+            query, params = "SELECT host, ts, exit_code, duration FROM connections ORDER BY ts DESC LIMIT ?", (limit,)
+        else:
+            query = "SELECT host, ts, exit_code, duration FROM connections WHERE host = ? ORDER BY ts DESC LIMIT ?"
+            params = (host, limit)
+        return [Connection(*row) for row in self._db().execute(query, params)]
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def rank_hosts(hosts: Iterable[str], scores: Mapping[str, float]) -> list[str]:
+    """``hosts`` by descending frecency; hosts without history keep their config order at the end."""
+    hosts = list(hosts)
+    ranked = sorted((host for host in hosts if host in scores), key=scores.__getitem__, reverse=True)
+    if not ranked:
+        return hosts
+    seen = set(ranked)
+    return ranked + [host for host in hosts if host not in seen]
+
+
+def load_scores(path: str | None = None) -> dict[str, float]:
+    """Frecency scores from the default store; empty when the history is missing or unreadable."""
+    store = HistoryStore(path)
+    if not os.path.exists(store.path):
+        return {}
+    try:
+        return store.scores()
+    except (sqlite3.Error, OSError):
+        return {}
+    finally:
+        store.close()
+
+
+def record_connection(host: str, exit_code: int | None = None, duration: float | None = None, path: str | None = None) -> bool:
+    """Best-effort history write used after each ``ssh`` session; returns False when it could not be saved."""
+    store = HistoryStore(path)
+    try:
+        store.record(host, exit_code, duration)
+        return True
+    except (sqlite3.Error, OSError):
+        return False
+    finally:
+        store.close()
@@ -0,0 +1,181 @@
+"""Push a public key to many hosts' ``authorized_keys`` concurrently, skipping hosts that already have it."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import random
+import signal
+from collections.abc import Callable, Iterable
+from typing import NamedTuple
+
+from src.ssh_connect.services.config_service import cached_config_with_keys
+from src.ssh_connect.services.control_master import ControlMasterPool, default_pool
+from src.ssh_connect.services.ssh_service import remote_command_argv
+
+DEFAULT_PARALLELISM = 32
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_ATTEMPTS = 3
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+STATUS_ADDED = "added"
+STATUS_PRESENT = "present"
+STATUS_FAILED = "failed"
+
+# ssh exits 255 on connection/transport errors; only those are retried, and
+# not when the server simply refused the credentials.
+SSH_ERROR_EXIT = 255
+AUTH_FAILURE_MARKERS = ("Permission denied", "Host key verification failed")
+
+# Reads the key line from stdin and appends it unless its base64 blob is already
+# listed. The blob (not the whole line) is compared so a different comment or
+# options prefix still counts as present.
+DEPLOY_SCRIPT = (
+    "umask 077; key=$(cat); blob=$(printf '%s' \"$key\" | cut -d' ' -f2); "
+    "[ -n \"$blob\" ] || exit 2; "
+    "mkdir -p ~/.ssh && touch ~/.ssh/authorized_keys || exit 3; "
+    "if grep -qF \"$blob\" ~/.ssh/authorized_keys; then echo present; exit 0; fi; "
+    "if [ -s ~/.ssh/authorized_keys ] && [ -n \"$(tail -c 1 ~/.ssh/authorized_keys)\" ]; then echo >> ~/.ssh/authorized_keys; fi; "
+    "printf '%s\\n' \"$key\" >> ~/.ssh/authorized_keys && echo added"
+)
+
+
+class DeployResult(NamedTuple):
+    host: str
+    status: str
+    attempts: int
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status != STATUS_FAILED
+
+
+def read_public_key(private_key_path: str) -> str:
+    """Return the single-line public key that sits next to ``private_key_path`` (``<key>.pub``)."""
+    with open(f"{private_key_path}.pub", "r", encoding="utf-8") as pub_file:
+        line = pub_file.readline().strip()
+    if len(line.split()) < 2:
+        raise ValueError(f"Chave pública inválida: {private_key_path}.pub")
+    return line
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE) -> float:
+    """Exponential backoff with full jitter for the ``attempt``-th retry (1-based)."""
+    return random.uniform(0, min(BACKOFF_MAX, base * 2 ** (attempt - 1)))
+
+
+def deploy_report(results: Iterable[DeployResult]) -> dict[str, list[str]]:
+    """Hosts grouped by final status, in the order added/present/failed."""
+    report: dict[str, list[str]] = {STATUS_ADDED: [], STATUS_PRESENT: [], STATUS_FAILED: []}
+    for result in results:
+        report[result.status].append(result.host)
+    return report
+
+
+class KeyDeployer:
+    """Bounded, retrying, non-interactive (BatchMode) key deployment over ssh.
+
+    Hosts that need a password cannot be handled here and are reported as
+    failed; ``copy_ssh_key`` (interactive ``ssh-copy-id``) remains for those.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        keys_dir: str | None = None,
+        parallelism: int = DEFAULT_PARALLELISM,
+        timeout: float = DEFAULT_TIMEOUT,
+        attempts: int = DEFAULT_ATTEMPTS,
+        backoff_base: float = BACKOFF_BASE,
+        pool: ControlMasterPool | None = None,
+    ) -> None:
+        self.config_path = config_path
+        self.keys_dir = keys_dir
+        self.parallelism = max(1, parallelism)
+        self.timeout = timeout
+        self.attempts = max(1, attempts)
+        self.backoff_base = backoff_base
+        self.pool = pool or default_pool()
+        self._ssh_config_path = config_path
+
+    async def _attempt(self, host: str, public_key: str) -> tuple[int | None, str, str]:
+        master = self.pool.find(host, self.config_path)
+        argv = remote_command_argv(
+            host,
+            DEPLOY_SCRIPT,
+            self._ssh_config_path,
+            None,
+            master.socket_path if master is not None else None,
+            batch_mode=True,
+        )
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *argv,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+        except OSError as exc:
+            return None, "", str(exc)
+
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(f"{public_key}\n".encode("utf-8")), self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            with contextlib.suppress(ProcessLookupError):
+                os.killpg(process.pid, signal.SIGKILL)
+            await process.wait()
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            return SSH_ERROR_EXIT, "", "timeout"
+        return process.returncode, stdout.decode("utf-8", errors="replace"), stderr.decode("utf-8", errors="replace")
+
+    async def deploy_host(
+        self,
+        host: str,
+        public_key: str,
+        on_retry: Callable[[str, int, float, str], None] | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> DeployResult:
+        """Deploy to one host; the semaphore is held per attempt, not while backing off."""
+        error = ""
+        for attempt in range(1, self.attempts + 1):
+            async with semaphore or contextlib.nullcontext():
+                returncode, stdout, stderr = await self._attempt(host, public_key)
+            outcome = stdout.strip().splitlines()[-1:] if stdout.strip() else []
+            if returncode == 0 and outcome in ([STATUS_ADDED], [STATUS_PRESENT]):
+                return DeployResult(host, outcome[0], attempt)
+
+            error = stderr.strip().splitlines()[-1] if stderr.strip() else f"exit {returncode}"
+            retryable = returncode in (None, SSH_ERROR_EXIT) and not any(marker in stderr for marker in AUTH_FAILURE_MARKERS)
+            if not retryable or attempt == self.attempts:
+                return DeployResult(host, STATUS_FAILED, attempt, error)
+
+            delay = backoff_delay(attempt, self.backoff_base)
+            if on_retry is not None:
+                on_retry(host, attempt, delay, error)
+            await asyncio.sleep(delay)
+        return DeployResult(host, STATUS_FAILED, self.attempts, error)
+
+    async def deploy(
+        self,
+        hosts: Iterable[str],
+        private_key_path: str,
+        on_result: Callable[[DeployResult], None] | None = None,
+        on_retry: Callable[[str, int, float, str], None] | None = None,
+    ) -> list[DeployResult]:
+        """Deploy ``<private_key_path>.pub`` to every host; results keep the order of ``hosts``."""
+        public_key = read_public_key(private_key_path)
+        if self.keys_dir:
+            self._ssh_config_path = cached_config_with_keys(self.config_path, self.keys_dir)
+        semaphore = asyncio.Semaphore(self.parallelism)
+
+        async def deploy_one(host: str) -> DeployResult:
+            result = await self.deploy_host(host, public_key, on_retry, semaphore)
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        return list(await asyncio.gather(*(deploy_one(host) for host in hosts)))
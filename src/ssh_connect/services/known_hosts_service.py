@@ -0,0 +1,247 @@
+"""Indexed ``known_hosts`` lookups, hashed (``HashKnownHosts yes``) entries included.
+
+A file is parsed once per (mtime, size). Plain names go to a dict and
+wildcard pattern lists to a short list. Hashed entries (``|1|salt|hmac``) are
+bucketed by salt, and the HMAC-SHA1 pad states of every salt are computed
+once. Checking a name then costs a dict probe plus two SHA-1 finishes per
+distinct salt (usually one per hashed entry), and the result is memoized
+per name, so aliases sharing a ``HostName`` are checked once.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import os
+from typing import NamedTuple
+
+from src.ssh_connect.services.config_index import ConfigIndex, split_tokens
+from src.ssh_connect.services.config_resolver import match_pattern_list
+from src.ssh_connect.services.key_service import fingerprint_sha256
+
+DEFAULT_PORT = 22
+DEFAULT_USER_FILES = "~/.ssh/known_hosts ~/.ssh/known_hosts2"
+DEFAULT_GLOBAL_FILES = "/etc/ssh/ssh_known_hosts /etc/ssh/ssh_known_hosts2"
+HASH_MAGIC = "|1|"
+MARKER_CA = "@cert-authority"
+MARKER_REVOKED = "@revoked"
+MEMO_SIZE = 16384
+
+KEY_KNOWN = "known"
+KEY_UNKNOWN = "unknown"
+KEY_MISMATCH = "mismatch"
+KEY_REVOKED = "revoked"
+
+_SHA1_BLOCK = 64
+_INNER_PAD = bytes(value ^ 0x36 for value in range(256))
+_OUTER_PAD = bytes(value ^ 0x5C for value in range(256))
+
+
+class KnownKey(NamedTuple):
+    key_type: str
+    key: str  # base64 public key blob, as written in the file
+    marker: str  # "", "@cert-authority" or "@revoked"
+    path: str
+    line: int
+
+    @property
+    def fingerprint(self) -> str:
+        try:
+            return fingerprint_sha256(base64.b64decode(self.key, validate=True))
+        except (binascii.Error, ValueError):
+            return "?"
+
+    def describe(self) -> str:
+        marker = f"{self.marker} " if self.marker else ""
+        return f"{marker}{self.key_type} {self.fingerprint}"
+
+
+class HostKeyStatus(NamedTuple):
+    host: str
+    name: str  # what ``ssh`` looks up: ``HostKeyAlias`` or ``HostName``, ``[name]:port`` off port 22
+    status: str
+    keys: tuple[KnownKey, ...]
+    mismatched: tuple[str, ...] = ()  # other names of the host whose keys differ for a shared key type
+
+
+def _hmac_pads(salt: bytes):
+    """Inner and outer SHA-1 states of HMAC(salt, ·); finishing one costs two block compressions."""
+    key = salt if len(salt) <= _SHA1_BLOCK else hashlib.sha1(salt).digest()
+    key = key.ljust(_SHA1_BLOCK, b"\0")
+    return hashlib.sha1(key.translate(_INNER_PAD)), hashlib.sha1(key.translate(_OUTER_PAD))
+
+
+class KnownHostsFile:
+    """One parsed ``known_hosts`` file."""
+
+    def __init__(self, path: str, signature: tuple[int, int]) -> None:
+        self.path = path
+        self.signature = signature
+        self.entries = 0
+        self._plain: dict[str, list[KnownKey]] = {}
+        self._patterns: list[tuple[str, KnownKey]] = []
+        self._hashed: dict[bytes, dict[bytes, list[KnownKey]]] = {}
+        self._salt_states: list[tuple[object, object, dict[bytes, list[KnownKey]]]] | None = None
+        self._memo: dict[str, tuple[KnownKey, ...]] = {}
+
+    @classmethod
+    def parse(cls, path: str) -> KnownHostsFile:
+        stat = os.stat(path)
+        known = cls(path, (stat.st_mtime_ns, stat.st_size))
+        with open(path, "rb") as handle:
+            for line_number, raw_line in enumerate(handle, 1):
+                known._add_line(raw_line.decode("utf-8", errors="replace"), line_number)
+        return known
+
+    def _add_line(self, line: str, line_number: int) -> None:
+        fields = line.split()
+        if not fields or fields[0].startswith("#"):
+            return
+        marker = fields.pop(0) if fields[0].startswith("@") else ""
+        if len(fields) < 3:
+            return
+        names, key_type, key = fields[:3]
+        entry = KnownKey(key_type, key, marker, self.path, line_number)
+        self.entries += 1
+
+        if names.startswith(HASH_MAGIC):
+            salt, _, digest = names[len(HASH_MAGIC):].partition("|")
+            try:
+                salt_bytes, digest_bytes = base64.b64decode(salt, validate=True), base64.b64decode(digest, validate=True)
+            except (binascii.Error, ValueError):
+                return
+            self._hashed.setdefault(salt_bytes, {}).setdefault(digest_bytes, []).append(entry)
+        elif any(marker_char in names for marker_char in "*?!"):
+            self._patterns.append((names, entry))
+        else:
+            for name in names.split(","):
+                self._plain.setdefault(name.lower(), []).append(entry)
+
+    def _states(self) -> list[tuple[object, object, dict[bytes, list[KnownKey]]]]:
+        if self._salt_states is None:
+            self._salt_states = [(*_hmac_pads(salt), digests) for salt, digests in self._hashed.items()]
+        return self._salt_states
+
+    def lookup(self, name: str) -> tuple[KnownKey, ...]:
+        """Every entry whose host field matches ``name`` (``host`` or ``[host]:port``), in file order."""
+        name = name.lower()
+        found = self._memo.get(name)
+        if found is not None:
+            return found
+
+        keys = list(self._plain.get(name, ()))
+        for patterns, entry in self._patterns:
+            if match_pattern_list(name, patterns):
+                keys.append(entry)
+        if self._hashed:
+            encoded = name.encode("utf-8")
+            for inner, outer, digests in self._states():
+                inner_hash = inner.copy()
+                inner_hash.update(encoded)
+                outer_hash = outer.copy()
+                outer_hash.update(inner_hash.digest())
+                matches = digests.get(outer_hash.digest())
+                if matches:
+                    keys.extend(matches)
+
+        found = tuple(sorted(keys, key=lambda entry: entry.line))
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        self._memo[name] = found
+        return found
+
+
+_FILE_CACHE: dict[str, KnownHostsFile] = {}
+
+
+def load_known_hosts(path: str) -> KnownHostsFile | None:
+    """Return the parsed file, re-parsing it only when its (mtime, size) changed; None when it cannot be read."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        _FILE_CACHE.pop(path, None)
+        return None
+    cached = _FILE_CACHE.get(path)
+    if cached is not None and cached.signature == (stat.st_mtime_ns, stat.st_size):
+        return cached
+    try:
+        known = KnownHostsFile.parse(path)
+    except OSError:
+        return None
+    _FILE_CACHE[path] = known
+    return known
+
+
+def known_host_name(host: str, port: int) -> str:
+    return host if port == DEFAULT_PORT else f"[{host}]:{port}"
+
+
+class KnownHostsChecker:
+    """Known host keys of the config's hosts, resolved like ``get_host_user`` resolves ``HostName``.
+
+    ``files`` overrides the ``UserKnownHostsFile``/``GlobalKnownHostsFile``
+    lists that are otherwise read from the config (with OpenSSH's defaults).
+    """
+
+    def __init__(self, index: ConfigIndex, files: list[str] | None = None) -> None:
+        self.index = index
+        self.files = files
+
+    def lookup_names(self, host: str) -> list[str]:
+        """The name ``ssh`` checks for ``host`` first, then the other names it is known by."""
+        hostname = (self.index.hostname(host) or host).replace("%h", host)
+        try:
+            port = int(self.index.get_option(host, "Port") or DEFAULT_PORT)
+        except ValueError:
+            port = DEFAULT_PORT
+        key_alias = self.index.get_option(host, "HostKeyAlias")
+        names = [key_alias.split()[0] if key_alias else hostname, hostname, host]
+        return list(dict.fromkeys(known_host_name(name, port) for name in names))
+
+    def _files_for(self, host: str) -> list[KnownHostsFile]:
+        if self.files is not None:
+            paths = self.files
+        else:
+            paths = split_tokens(self.index.get_option(host, "UserKnownHostsFile") or DEFAULT_USER_FILES)
+            paths += split_tokens(self.index.get_option(host, "GlobalKnownHostsFile") or DEFAULT_GLOBAL_FILES)
+        loaded = []
+        for path in paths:
+            if path.lower() == "none" or "%" in path:
+                continue
+            known = load_known_hosts(os.path.expanduser(path))
+            if known is not None:
+                loaded.append(known)
+        return loaded
+
+    def check(self, host: str) -> HostKeyStatus:
+        names = self.lookup_names(host)
+        files = self._files_for(host)
+
+        def keys_for(name: str) -> tuple[KnownKey, ...]:
+            return tuple(entry for known in files for entry in known.lookup(name))
+
+        found = keys_for(names[0])
+        host_keys = [entry for entry in found if entry.marker != MARKER_REVOKED]
+        revoked = {entry.key for entry in found if entry.marker == MARKER_REVOKED}
+
+        by_type: dict[str, set[str]] = {}
+        for entry in host_keys:
+            if not entry.marker:
+                by_type.setdefault(entry.key_type, set()).add(entry.key)
+        mismatched = []
+        for other in names[1:]:
+            for entry in keys_for(other):
+                expected = by_type.get(entry.key_type)
+                if not entry.marker and expected is not None and entry.key not in expected:
+                    mismatched.append(other)
+                    break
+
+        if any(entry.key in revoked for entry in host_keys):
+            status = KEY_REVOKED
+        elif mismatched:
+            status = KEY_MISMATCH
+        elif host_keys:
+            status = KEY_KNOWN
+        else:
+            status = KEY_UNKNOWN
+        return HostKeyStatus(host, names[0], status, tuple(host_keys), tuple(mismatched))
@@ -0,0 +1,267 @@
+"""Structured activity log: bounded in-memory ring for the UI, batched JSONL persistence with rotation, export."""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from fnmatch import fnmatchcase
+from typing import NamedTuple
+
+from src.ssh_connect.services.paths import ensure_private_dir, state_dir
+
+DEFAULT_CAPACITY = 5000
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+FLUSH_INTERVAL = 0.5
+BATCH_SIZE = 512
+# Records waiting for the writer thread; beyond this they are dropped (and counted) instead of growing memory.
+QUEUE_LIMIT = 20_000
+
+EXPORT_FIELDS = ("ts", "level", "action", "host", "duration", "exit_code", "message")
+
+
+class LogRecord(NamedTuple):
+    timestamp: float
+    message: str
+    host: str | None = None
+    action: str | None = None
+    duration: float | None = None
+    exit_code: int | None = None
+    level: str = "info"
+
+    def to_dict(self) -> dict:
+        return {
+            "ts": datetime.fromtimestamp(self.timestamp).astimezone().isoformat(timespec="milliseconds"),
+            "level": self.level,
+            "action": self.action,
+            "host": self.host,
+            "duration": round(self.duration, 3) if self.duration is not None else None,
+            "exit_code": self.exit_code,
+            "message": self.message,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> LogRecord:
+        return cls(
+            datetime.fromisoformat(data["ts"]).timestamp(),
+            data.get("message", ""),
+            data.get("host"),
+            data.get("action"),
+            data.get("duration"),
+            data.get("exit_code"),
+            data.get("level") or "info",
+        )
+
+    def format(self) -> str:
+        """One-line rendering used by the Logs tab."""
+        stamp = datetime.fromtimestamp(self.timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        extras = []
+        if self.duration is not None:
+            extras.append(f"{self.duration:.2f}s")
+        if self.exit_code is not None:
+            extras.append(f"exit {self.exit_code}")
+        suffix = f" ({', '.join(extras)})" if extras else ""
+        return f"[{stamp}] {self.message}{suffix}"
+
+
+def default_log_path() -> str:
+    return os.path.join(state_dir(), "activity.jsonl")
+
+
+def _parse_since(value: str | float | None) -> float | None:
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return datetime.fromisoformat(value).timestamp()
+
+
+def record_matches(
+    record: LogRecord,
+    host: str | None = None,
+    action: str | None = None,
+    since: str | float | None = None,
+    until: str | float | None = None,
+    text: str | None = None,
+) -> bool:
+    """Filter used by the UI and by exports: host glob, exact action, time range and substring."""
+    if host is not None and not (record.host and fnmatchcase(record.host, host)):
+        return False
+    if action is not None and record.action != action:
+        return False
+    start, end = _parse_since(since), _parse_since(until)
+    if start is not None and record.timestamp < start:
+        return False
+    if end is not None and record.timestamp > end:
+        return False
+    if text and text.lower() not in record.message.lower():
+        return False
+    return True
+
+
+class ActivityLog:
+    """Activity records kept in a fixed-size ring and appended to a rotating JSONL file.
+
+    ``record`` only appends to the ring and to a bounded queue, so it is safe
+    to call from the event loop for every line of a fan-out. A daemon thread
+    drains the queue in batches (one ``write`` per batch) and rotates the file
+    to ``.1 .. .N`` once it exceeds ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        capacity: int = DEFAULT_CAPACITY,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backups: int = DEFAULT_BACKUPS,
+        flush_interval: float = FLUSH_INTERVAL,
+    ) -> None:
+        self.path = path or default_log_path()
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.buffer: deque[LogRecord] = deque(maxlen=capacity)
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=QUEUE_LIMIT)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        message: str,
+        host: str | None = None,
+        action: str | None = None,
+        duration: float | None = None,
+        exit_code: int | None = None,
+        level: str = "info",
+    ) -> LogRecord:
+        entry = LogRecord(time.time(), message, host, action, duration, exit_code, level)
+        self.buffer.append(entry)
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+        return entry
+
+    def recent(self, **filters) -> list[LogRecord]:
+        """Records still in the ring buffer that match ``filters`` (see ``record_matches``)."""
+        return [entry for entry in list(self.buffer) if record_matches(entry, **filters)]
+
+    def _ensure_writer(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer_loop, name="activity-log-writer", daemon=True)
+                self._thread.start()
+
+    def _writer_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < BATCH_SIZE and isinstance(batch[-1], LogRecord):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            records = [entry for entry in batch if isinstance(entry, LogRecord)]
+            if records:
+                self._write(records)
+            for entry in batch:
+                if isinstance(entry, threading.Event):
+                    entry.set()
+                elif entry is None:
+                    return
+
+    def _write(self, records: list[LogRecord]) -> None:
+        payload = "".join(json.dumps(entry.to_dict(), ensure_ascii=False) + "\n" for entry in records).encode("utf-8")
+        try:
+            ensure_private_dir(os.path.dirname(self.path))
+            try:
+                size = os.path.getsize(self.path)
+            except FileNotFoundError:
+                size = 0
+            if size and size + len(payload) > self.max_bytes:
+                self._rotate()
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            with os.fdopen(fd, "ab") as handle:
+                handle.write(payload)
+        except OSError:
+            self.dropped += len(records)
+
+    def _rotate(self) -> None:
+        for index in range(self.backups, 0, -1):
+            source = self.path if index == 1 else f"{self.path}.{index - 1}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index}")
+        if self.backups < 1:
+            os.unlink(self.path)
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        """Block until everything recorded so far is on disk."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def log_files(self) -> list[str]:
+        """Rotated files oldest first, then the current one."""
+        files = [f"{self.path}.{index}" for index in range(self.backups, 0, -1)] + [self.path]
+        return [path for path in files if os.path.exists(path)]
+
+    def read_records(self, **filters) -> Iterator[LogRecord]:
+        """Persisted records (all rotated files, oldest first) matching ``filters``."""
+        for path in self.log_files():
+            with open(path, "r", encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        entry = LogRecord.from_dict(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if record_matches(entry, **filters):
+                        yield entry
+
+    def export(self, target: str, fmt: str | None = None, **filters) -> int:
+        """Write persisted records matching ``filters`` to ``target`` as ``json`` or ``csv``; returns the count."""
+        self.flush()
+        fmt = fmt or os.path.splitext(target)[1].lstrip(".").lower() or "json"
+        return export_records(self.read_records(**filters), target, fmt)
+
+
+def export_records(records: Iterable[LogRecord], target: str, fmt: str) -> int:
+    if fmt not in ("json", "csv"):
+        raise ValueError(f"Formato de exportação desconhecido: {fmt}")
+    count = 0
+    with open(target, "w", encoding="utf-8", newline="") as handle:
+        if fmt == "csv":
+            writer = csv.DictWriter(handle, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+            for entry in records:
+                writer.writerow(entry.to_dict())
+                count += 1
+        else:
+            handle.write("[")
+            for entry in records:
+                handle.write(("," if count else "") + "\n  " + json.dumps(entry.to_dict(), ensure_ascii=False))
+                count += 1
+            handle.write("\n]\n")
+    return count
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import os
+
+APP_NAME = "ssh_connect"
+
+
+def cache_dir() -> str:
+    """Return the per-user cache directory (``$SSH_CONNECT_CACHE_DIR`` or the XDG default)."""
+    override = os.environ.get("SSH_CONNECT_CACHE_DIR")
+    if override:
+        return override
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, APP_NAME)
+
+
+def ensure_private_dir(path: str) -> str:
+    """Create ``path`` (mode 0700) when missing and return it."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+
+def state_dir() -> str:
+    """Return the per-user state directory for history and logs (``$SSH_CONNECT_STATE_DIR`` or the XDG default)."""
+    override = os.environ.get("SSH_CONNECT_STATE_DIR")
+    if override:
+        return override
+
+    base = os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state")
+    return os.path.join(base, APP_NAME)
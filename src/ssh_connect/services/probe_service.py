@@ -0,0 +1,181 @@
+"""Concurrent TCP reachability / latency probe for the configured hosts."""
+from __future__ import annotations
+
+import asyncio
+import socket
+import time
+from collections.abc import Callable, Iterable
+from typing import NamedTuple
+
+from src.ssh_connect.services.config_index import ConfigIndex
+
+DEFAULT_PORT = 22
+DEFAULT_CONCURRENCY = 64
+DEFAULT_TIMEOUT = 3.0
+DNS_TTL = 300.0
+# Servers may send a few text lines before the identification string (RFC 4253 4.2).
+MAX_BANNER_LINES = 8
+
+STATUS_UP = "up"
+STATUS_DOWN = "down"
+STATUS_SKIPPED = "skip"
+
+
+class ProbeTarget(NamedTuple):
+    """Effective address of a host alias."""
+
+    host: str
+    address: str
+    port: int
+    proxied: bool = False
+
+
+class ProbeResult(NamedTuple):
+    host: str
+    address: str
+    port: int
+    status: str
+    rtt_ms: float | None = None
+    server_version: str | None = None
+    error: str | None = None
+
+    @property
+    def up(self) -> bool:
+        return self.status == STATUS_UP
+
+
+def probe_target(index: ConfigIndex, host: str) -> ProbeTarget:
+    """Resolve the effective ``HostName``/``Port`` of ``host`` from the parsed config."""
+    address = (index.hostname(host) or host).replace("%h", host)
+    try:
+        port = int(index.get_option(host, "Port") or DEFAULT_PORT)
+    except ValueError:
+        port = DEFAULT_PORT
+
+    proxied = False
+    for option in ("ProxyJump", "ProxyCommand"):
+        value = index.get_option(host, option)
+        if value and value.lower() != "none":
+            proxied = True
+    return ProbeTarget(host, address, port, proxied)
+
+
+class DNSCache:
+    """``getaddrinfo`` results cached per (address, port); concurrent lookups of one name share a future."""
+
+    def __init__(self, ttl: float = DNS_TTL) -> None:
+        self.ttl = ttl
+        self._entries: dict[tuple[str, int], tuple[float, asyncio.Future]] = {}
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def resolve(self, address: str, port: int) -> list[tuple]:
+        key = (address, port)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and now - entry[0] < self.ttl:
+            return await asyncio.shield(entry[1])
+
+        loop = asyncio.get_running_loop()
+        future = asyncio.ensure_future(loop.getaddrinfo(address, port, type=socket.SOCK_STREAM))
+        self._entries[key] = (now, future)
+        try:
+            return await asyncio.shield(future)
+        except OSError:
+            # Failures are not cached: the next probe run retries the lookup.
+            self._entries.pop(key, None)
+            raise
+
+
+class HostProber:
+    """Probe many targets at once, at most ``concurrency`` connections in flight."""
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        read_banner: bool = True,
+        dns_cache: DNSCache | None = None,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.read_banner = read_banner
+        self.dns_cache = dns_cache or DNSCache()
+
+    async def _read_version(self, reader: asyncio.StreamReader) -> str | None:
+        for _ in range(MAX_BANNER_LINES):
+            line = await reader.readline()
+            if not line:
+                return None
+            if line.startswith(b"SSH-"):
+                return line.decode("utf-8", errors="replace").strip()
+        return None
+
+    async def probe(self, target: ProbeTarget) -> ProbeResult:
+        """Connect to ``target`` once and return its status, connect RTT and SSH banner."""
+        host, address, port = target.host, target.address, target.port
+        if target.proxied:
+            return ProbeResult(host, address, port, STATUS_SKIPPED, error="proxy")
+
+        try:
+            addresses = await asyncio.wait_for(self.dns_cache.resolve(address, port), self.timeout)
+        except (OSError, asyncio.TimeoutError) as exc:
+            return ProbeResult(host, address, port, STATUS_DOWN, error=f"dns: {exc or 'timeout'}")
+
+        family, _, _, _, sockaddr = addresses[0]
+        started = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(sockaddr[0], sockaddr[1], family=family), self.timeout
+            )
+        except asyncio.TimeoutError:
+            return ProbeResult(host, address, port, STATUS_DOWN, error="timeout")
+        except OSError as exc:
+            return ProbeResult(host, address, port, STATUS_DOWN, error=exc.strerror or str(exc))
+        rtt_ms = (time.perf_counter() - started) * 1000
+
+        version = None
+        try:
+            if self.read_banner:
+                version = await asyncio.wait_for(self._read_version(reader), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+        return ProbeResult(host, address, port, STATUS_UP, round(rtt_ms, 2), version)
+
+    async def probe_all(
+        self,
+        targets: Iterable[ProbeTarget],
+        on_result: Callable[[ProbeResult], None] | None = None,
+    ) -> list[ProbeResult]:
+        """Probe every target; ``on_result`` is called as each one finishes. Results keep input order."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(target: ProbeTarget) -> ProbeResult:
+            async with semaphore:
+                result = await self.probe(target)
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        return list(await asyncio.gather(*(run(target) for target in targets)))
+
+
+def probe_hosts(
+    index: ConfigIndex,
+    hosts: Iterable[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    read_banner: bool = True,
+    on_result: Callable[[ProbeResult], None] | None = None,
+) -> list[ProbeResult]:
+    """Synchronous wrapper around ``HostProber.probe_all`` for the CLI."""
+    prober = HostProber(concurrency=concurrency, timeout=timeout, read_banner=read_banner)
+    targets = [probe_target(index, host) for host in hosts]
+    return asyncio.run(prober.probe_all(targets, on_result))
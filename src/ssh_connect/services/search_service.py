@@ -0,0 +1,199 @@
+"""Precomputed, ranked host search used by the Hosts filter."""
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from collections.abc import Mapping
+
+from src.ssh_connect.services.config_index import COMMENT_KEY
+from src.ssh_connect.services.history_service import rank_hosts
+
+BOUNDARY_CHARS = frozenset("-_./@: ")
+
+SCORE_ALIAS_EXACT = 10_000
+SCORE_ALIAS_PREFIX = 8_000
+SCORE_ALIAS_SUBSTRING = 6_000
+SCORE_FIELD_SUBSTRING = 4_000
+SCORE_FUZZY_MATCH = 16
+SCORE_FUZZY_BOUNDARY = 8
+# Frecency bonus per decayed visit, capped below the gap between match tiers so
+# history only reorders hosts that matched equally well.
+SCORE_HISTORY_PER_VISIT = 100
+SCORE_HISTORY_MAX = 1_500
+
+# Below 1/INCREMENTAL_RATIO of the inventory, re-checking the previous matches one by one beats a full scan.
+INCREMENTAL_RATIO = 8
+
+
+def fuzzy_pattern(query: str) -> re.Pattern[str]:
+    """Compile ``query`` into a lazy subsequence regex (``a.*?b.*?c``)."""
+    return re.compile(".*?".join(map(re.escape, query)))
+
+
+def fuzzy_score(query: str, text: str, pattern: re.Pattern[str] | None = None) -> int | None:
+    """Score ``query`` as a subsequence of ``text``, or None when it does not match.
+
+    The regex finds the leftmost, shortest window containing the query; tight
+    windows near the start of the text and on a word boundary score higher.
+    """
+    match = (pattern or fuzzy_pattern(query)).search(text)
+    if match is None:
+        return None
+
+    start, end = match.span()
+    score = SCORE_FUZZY_MATCH * len(query) - (end - start - len(query)) - start
+    if start == 0 or text[start - 1] in BOUNDARY_CHARS:
+        score += SCORE_FUZZY_BOUNDARY
+    return score
+
+
+def _join_lines(values: list[str]) -> tuple[str, list[int]]:
+    """Join ``values`` with newlines and return the blob plus each value's start offset."""
+    starts = []
+    offset = 0
+    for value in values:
+        starts.append(offset)
+        offset += len(value) + 1
+    return "\n".join(values), starts
+
+
+class HostSearchIndex:
+    """Precomputed lowercase haystacks: one per alias, plus the other fields joined in one blob.
+
+    ``search`` returns aliases ranked by match quality: exact, prefix and
+    substring alias hits first, then field hits, then fuzzy subsequence
+    matches on the alias; within a tier, frequently and recently used hosts
+    come first. When a query extends the previous one, only the previous
+    matches are re-checked.
+    """
+
+    def __init__(
+        self,
+        hosts: list[str],
+        host_details: Mapping[str, Mapping[str, str]],
+        frecency: Mapping[str, float] | None = None,
+    ) -> None:
+        self.hosts = list(hosts)
+        self._aliases: list[str] = []
+        fields = []
+        for host in self.hosts:
+            lowered = host.lower()
+            # Aliases are usually lowercase already: keep the host string, not an equal copy.
+            self._aliases.append(host if lowered == host else lowered)
+            details = host_details.get(host) or {}
+            hostname = details.get("HostName", "")
+            user = details.get("User", "")
+            comment = details.get(COMMENT_KEY, "")
+            others = [value for key, value in details.items() if key not in ("HostName", "User", COMMENT_KEY)]
+            fields.append("\0".join([hostname, user, comment, *others]).lower().replace("\n", " "))
+        # Only the blob is kept: a host's fields are the slice between two starts.
+        self._fields_blob, self._fields_starts = _join_lines(fields)
+        self._last_query = ""
+        self._last_matches: list[int] = list(range(len(self.hosts)))
+        self.set_frecency(frecency or {})
+
+    def set_frecency(self, frecency: Mapping[str, float]) -> None:
+        """Replace the frecency scores (``history_service`` decayed visits) used to order results."""
+        self._default_order = rank_hosts(self.hosts, frecency)
+        self._bonus = [
+            min(SCORE_HISTORY_MAX, round(SCORE_HISTORY_PER_VISIT * frecency[host])) if host in frecency else 0
+            for host in self.hosts
+        ]
+
+    def __len__(self) -> int:
+        return len(self.hosts)
+
+    def _scan_token(self, token: str) -> dict[int, int]:
+        """Score ``token`` against every host in one pass (C-level ``find``/regex per alias)."""
+        scores: dict[int, int] = {}
+        size = len(token)
+        unmatched: list[int] = []
+
+        for position, alias in enumerate(self._aliases):
+            found = alias.find(token)
+            if found < 0:
+                unmatched.append(position)
+            elif found == 0:
+                scores[position] = SCORE_ALIAS_EXACT if len(alias) == size else SCORE_ALIAS_PREFIX - len(alias)
+            else:
+                scores[position] = SCORE_ALIAS_SUBSTRING - found - len(alias)
+
+        fields_blob, fields_starts = self._fields_blob, self._fields_starts
+        offset = fields_blob.find(token)
+        while offset >= 0:
+            position = bisect_right(fields_starts, offset) - 1
+            if position not in scores:
+                scores[position] = SCORE_FIELD_SUBSTRING - len(self._aliases[position])
+            next_start = fields_starts[position + 1] if position + 1 < len(fields_starts) else len(fields_blob)
+            offset = fields_blob.find(token, next_start)
+
+        if size > 1:
+            pattern = fuzzy_pattern(token)
+            aliases = self._aliases
+            for position in unmatched:
+                if position not in scores:
+                    score = fuzzy_score(token, aliases[position], pattern)
+                    if score is not None:
+                        scores[position] = score
+        return scores
+
+    def _fields_span(self, position: int) -> tuple[int, int]:
+        """Start and end of host ``position``'s fields in the blob (the end is its newline)."""
+        starts = self._fields_starts
+        end = starts[position + 1] - 1 if position + 1 < len(starts) else len(self._fields_blob)
+        return starts[position], end
+
+    def _score_token(self, token: str, position: int, pattern: re.Pattern[str]) -> int | None:
+        alias = self._aliases[position]
+        if alias == token:
+            return SCORE_ALIAS_EXACT
+        if alias.startswith(token):
+            return SCORE_ALIAS_PREFIX - len(alias)
+        found = alias.find(token)
+        if found >= 0:
+            return SCORE_ALIAS_SUBSTRING - found - len(alias)
+        if self._fields_blob.find(token, *self._fields_span(position)) >= 0:
+            return SCORE_FIELD_SUBSTRING - len(alias)
+        return fuzzy_score(token, alias, pattern)
+
+    def search(self, query: str) -> list[str]:
+        """Return matching aliases, best first (by frecency, then config order, when ``query`` is empty)."""
+        normalized = query.lower().strip()
+        tokens = sorted(set(normalized.split()), key=len, reverse=True)
+        if not tokens:
+            self._last_query = ""
+            self._last_matches = list(range(len(self.hosts)))
+            return list(self._default_order)
+
+        pool: list[int] | None = None
+        if self._last_query and normalized.startswith(self._last_query):
+            pool = self._last_matches
+
+        totals: dict[int, int] | None = None
+        for token in tokens:
+            candidates = pool if totals is None else list(totals)
+            if candidates is not None and len(candidates) * INCREMENTAL_RATIO < len(self.hosts):
+                scores = {}
+                pattern = fuzzy_pattern(token)
+                for position in candidates:
+                    score = self._score_token(token, position, pattern)
+                    if score is not None:
+                        scores[position] = score
+            else:
+                scores = self._scan_token(token)
+                if candidates is not None:
+                    allowed = set(candidates)
+                    scores = {position: score for position, score in scores.items() if position in allowed}
+
+            if totals is None:
+                totals = scores
+            else:
+                totals = {position: total + scores[position] for position, total in totals.items() if position in scores}
+            if not totals:
+                break
+
+        bonus = self._bonus
+        ranked = sorted([(-score - bonus[position], position) for position, score in totals.items()])
+        self._last_query = normalized
+        self._last_matches = sorted(totals)
+        return [self.hosts[position] for _, position in ranked]
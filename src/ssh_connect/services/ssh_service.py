@@ -1,27 +1,104 @@
 from __future__ import annotations
 
-import os
 import subprocess
+import time
 
-from src.ssh_connect.services.config_service import create_temp_config_with_keys
+from src.ssh_connect.services.config_service import cached_config_with_keys
+from src.ssh_connect.services.control_master import ControlMasterPool, default_pool
+from src.ssh_connect.services.history_service import record_connection
+from src.ssh_connect.services.timing_service import STAGE_SUBPROCESS, span
 
 
-def copy_ssh_key(host: str, selected_key: str, config_path: str) -> None:
-    """Copy a selected key to the target host using ssh-copy-id."""
-    subprocess.run(["ssh-copy-id", "-F", config_path, "-i", selected_key, host], check=True)
+def _final_config(config_path: str, keys_dir: str | None) -> str:
+    return cached_config_with_keys(config_path, keys_dir) if keys_dir else config_path
 
 
-def connect_ssh(host: str, config_path: str, keys_dir: str | None) -> None:
-    """Connect to an SSH host, optionally using a temporary config with remapped keys."""
-    temp_config_path = None
-    final_config_path = config_path
+def copy_ssh_key(host: str, selected_key: str, config_path: str, pool: ControlMasterPool | None = None) -> None:
+    """Copy a selected key to the target host using ssh-copy-id (through a live master when there is one)."""
+    socket_path = (pool or default_pool()).live_socket(host, config_path)
+    master_options = ["-o", f"ControlPath={socket_path}"] if socket_path else []
+    with span(STAGE_SUBPROCESS, "ssh-copy-id", host=host):
+        subprocess.run(["ssh-copy-id", "-F", config_path, *master_options, "-i", selected_key, host], check=True)
 
-    if keys_dir:
-        temp_config_path = create_temp_config_with_keys(config_path, keys_dir)
-        final_config_path = temp_config_path
 
+def _certificate_options(host: str, config_path: str, keys_dir: str | None, certificate_key: str | None, certificates) -> list[str]:
+    if certificates is None:
+        # Imported lazily: the direct connection only needs it when a CA is configured.
+        from src.ssh_connect.services.cert_service import default_certificates
+
+        certificates = default_certificates()
+        if certificates is None:
+            return []
+    if not certificate_key:
+        from src.ssh_connect.services.cert_service import host_identity
+
+        certificate_key = host_identity(host, config_path, keys_dir)
+        if certificate_key is None:
+            return []
     try:
-        subprocess.run(["ssh", "-F", final_config_path, host])
-    finally:
-        if temp_config_path and os.path.exists(temp_config_path):
-            os.remove(temp_config_path)
+        return certificates.ssh_options(certificate_key)
+    except (OSError, ValueError) as exc:
+        print(f"Aviso: conectando sem certificado ({exc})")
+        return []
+
+
+def connect_ssh(
+    host: str,
+    config_path: str,
+    keys_dir: str | None,
+    pool: ControlMasterPool | None = None,
+    certificate_key: str | None = None,
+    certificates=None,
+) -> int:
+    """Connect to an SSH host, optionally using a cached config with remapped keys; returns ssh's exit code.
+
+    When a CA is configured (``certificates`` or the Vault environment), the
+    key is presented with its certificate (``CertificateFile``), the cached
+    one when still valid: ``certificate_key`` when given, else the host's own
+    identity. Every session is added to the connection history that ranks
+    hosts by frecency.
+    """
+    final_config_path = _final_config(config_path, keys_dir)
+    pool = pool or default_pool()
+    master_options = pool.master_options(host, config_path)
+    cert_options = _certificate_options(host, config_path, keys_dir, certificate_key, certificates)
+    started = time.monotonic()
+    with span(STAGE_SUBPROCESS, "ssh", host=host) as current:
+        returncode = subprocess.run(["ssh", "-F", final_config_path, *master_options, *cert_options, host]).returncode
+        current.note(exit_code=returncode)
+    if returncode == 0 and master_options:
+        # Only now: a failed connect must neither leave a sidecar nor evict a live master.
+        pool.register(host, config_path)
+    record_connection(host, returncode, time.monotonic() - started)
+    return returncode
+
+
+def remote_command_argv(
+    host: str,
+    command: str,
+    config_path: str,
+    keys_dir: str | None = None,
+    socket_path: str | None = None,
+    batch_mode: bool = False,
+) -> list[str]:
+    """``ssh`` argv running ``command`` on ``host``, multiplexed over ``socket_path`` when given."""
+    options = ["-o", "ControlMaster=no", "-o", f"ControlPath={socket_path}"] if socket_path else []
+    if batch_mode:
+        options += ["-o", "BatchMode=yes"]
+    return ["ssh", "-F", _final_config(config_path, keys_dir), *options, host, command]
+
+
+def run_remote(
+    host: str,
+    command: str,
+    config_path: str,
+    keys_dir: str | None = None,
+    pool: ControlMasterPool | None = None,
+    **run_kwargs,
+) -> subprocess.CompletedProcess:
+    """Run ``command`` on ``host`` over a pooled master (opened on demand); extra kwargs go to ``subprocess.run``."""
+    socket_path = (pool or default_pool()).open(host, config_path, _final_config(config_path, keys_dir))
+    with span(STAGE_SUBPROCESS, "ssh-command", host=host) as current:
+        result = subprocess.run(remote_command_argv(host, command, config_path, keys_dir, socket_path), **run_kwargs)
+        current.note(exit_code=result.returncode)
+    return result
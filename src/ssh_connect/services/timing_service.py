@@ -0,0 +1,208 @@
+"""Timing spans for the stages of a session, exported as JSON or Chrome trace events.
+
+Recording is off unless ``enable_timings`` is called (``--timings``); a
+disabled ``span`` returns a shared no-op context manager, so instrumented code
+pays one attribute check. Spans can be recorded from any thread.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+STAGE_CONFIG_PARSE = "config.parse"
+STAGE_KEY_SCAN = "keys.scan"
+STAGE_TEMP_CONFIG = "config.temp"
+STAGE_SUBPROCESS = "subprocess"
+STAGE_VIEW_REFRESH = "view.refresh"
+STAGES = (STAGE_CONFIG_PARSE, STAGE_KEY_SCAN, STAGE_TEMP_CONFIG, STAGE_SUBPROCESS, STAGE_VIEW_REFRESH)
+
+EXPORT_FORMATS = ("json", "chrome")
+MAX_SPANS = 50_000
+
+
+class Span(NamedTuple):
+    stage: str
+    name: str
+    start: float  # epoch seconds
+    duration: float  # seconds
+    thread_id: int
+    thread_name: str
+    attrs: dict
+
+    def to_dict(self) -> dict:
+        return {
+            "stage": self.stage,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration * 1000, 3),
+            "thread": self.thread_name,
+            "attrs": self.attrs,
+        }
+
+
+class StageSummary(NamedTuple):
+    stage: str
+    count: int
+    total: float
+    max: float
+    last: float
+
+
+class _ActiveSpan:
+    __slots__ = ("_timings", "stage", "name", "attrs", "_started")
+
+    def __init__(self, timings: Timings, stage: str, name: str, attrs: dict) -> None:
+        self._timings = timings
+        self.stage = stage
+        self.name = name
+        self.attrs = attrs
+        self._started = 0.0
+
+    def note(self, **attrs) -> None:
+        """Attach details known only inside the span (sizes, cache hits...)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> _ActiveSpan:
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        ended = time.perf_counter()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self._timings._finish(self, self._started, ended)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def note(self, **attrs) -> None:
+        pass
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Timings:
+    """Bounded, thread-safe store of finished spans (the oldest are dropped past ``capacity``)."""
+
+    def __init__(self, enabled: bool = False, capacity: int = MAX_SPANS) -> None:
+        self.enabled = enabled
+        self._spans: deque[Span] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        # perf_counter is monotonic but has no epoch; this offset places spans on the wall clock.
+        self._epoch_offset = time.time() - time.perf_counter()
+
+    def span(self, stage: str, name: str = "", **attrs) -> _ActiveSpan | _NullSpan:
+        if not self.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(self, stage, name or stage, attrs)
+
+    def _finish(self, active: _ActiveSpan, started: float, ended: float) -> None:
+        thread = threading.current_thread()
+        record = Span(active.stage, active.name, started + self._epoch_offset, ended - started, thread.ident or 0, thread.name, active.attrs)
+        with self._lock:
+            self._spans.append(record)
+
+    def spans(self) -> list[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def summary(self) -> list[StageSummary]:
+        return summarize(self.spans())
+
+    def export(self, target: str, fmt: str) -> int:
+        return export_spans(self.spans(), target, fmt)
+
+
+TIMINGS = Timings()
+
+
+def enable_timings() -> Timings:
+    TIMINGS.enabled = True
+    return TIMINGS
+
+
+def span(stage: str, name: str = "", **attrs) -> _ActiveSpan | _NullSpan:
+    """``with span(STAGE_KEY_SCAN, keys_dir) as current: ...`` on the process-wide recorder."""
+    return TIMINGS.span(stage, name, **attrs)
+
+
+def summarize(spans: list[Span]) -> list[StageSummary]:
+    """Count, total, max and last duration per stage; known stages first, in pipeline order."""
+    stats: dict[str, list] = {}
+    for record in spans:
+        entry = stats.setdefault(record.stage, [0, 0.0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += record.duration
+        entry[2] = max(entry[2], record.duration)
+        entry[3] = record.duration
+    order = [stage for stage in STAGES if stage in stats] + sorted(set(stats) - set(STAGES))
+    return [StageSummary(stage, *stats[stage]) for stage in order]
+
+
+def format_summary(summaries: list[StageSummary]) -> str:
+    lines = [f"{'etapa':<14} {'n':>6} {'total ms':>10} {'máx ms':>9} {'último ms':>10}"]
+    for item in summaries:
+        lines.append(f"{item.stage:<14} {item.count:>6} {item.total * 1000:>10.1f} {item.max * 1000:>9.1f} {item.last * 1000:>10.1f}")
+    return "\n".join(lines)
+
+
+def chrome_trace(spans: list[Span]) -> dict:
+    """Trace Event Format document (complete ``X`` events) for chrome://tracing or Perfetto."""
+    pid = os.getpid()
+    events = []
+    threads = {}
+    for record in spans:
+        threads.setdefault(record.thread_id, record.thread_name)
+        events.append(
+            {
+                "name": record.name,
+                "cat": record.stage,
+                "ph": "X",
+                "ts": round(record.start * 1_000_000, 1),
+                "dur": round(record.duration * 1_000_000, 1),
+                "pid": pid,
+                "tid": record.thread_id,
+                "args": record.attrs,
+            }
+        )
+    for thread_id, thread_name in threads.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_spans(spans: list[Span], target: str, fmt: str) -> int:
+    """Write ``spans`` to ``target`` as ``json`` (spans plus per-stage summary) or ``chrome`` trace; returns the count."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportação desconhecido: {fmt}")
+    import json
+
+    if fmt == "chrome":
+        document = chrome_trace(spans)
+    else:
+        document = {
+            "spans": [record.to_dict() for record in spans],
+            "summary": [
+                {"stage": item.stage, "count": item.count, "total_ms": round(item.total * 1000, 3), "max_ms": round(item.max * 1000, 3)}
+                for item in summarize(spans)
+            ],
+        }
+    with open(target, "w", encoding="utf-8") as handle:
+        json.dump(document, handle, ensure_ascii=False, default=str)
+        handle.write("\n")
+    return len(spans)
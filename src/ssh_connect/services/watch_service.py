@@ -0,0 +1,285 @@
+"""Debounced change notifications for the config files, include directories and keys directory.
+
+Linux uses inotify through ``ctypes``; elsewhere (or when inotify is not
+available) the watched paths are polled by stat signature. Both backends
+watch the parent directory of each file, so editors and tools that replace a
+file by renaming a temporary one over it are seen as well.
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+DEBOUNCE = 0.5
+MAX_DELAY = 5.0
+POLL_INTERVAL = 2.0
+
+BACKEND_INOTIFY = "inotify"
+BACKEND_POLL = "poll"
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+ChangeCallback = Callable[[set[str]], None]
+
+
+def _signature(path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class WatchSet:
+    """Files watched individually plus directories whose every entry is watched."""
+
+    def __init__(self, files: Iterable[str] = (), directories: Iterable[str] = ()) -> None:
+        self.files = {os.path.abspath(path) for path in files}
+        self.directories = {os.path.abspath(path) for path in directories}
+
+    def parents(self) -> set[str]:
+        """Directories to watch: every watched directory and the parent of every watched file."""
+        return self.directories | {os.path.dirname(path) for path in self.files}
+
+    def relevant(self, path: str) -> bool:
+        return path in self.files or path in self.directories or os.path.dirname(path) in self.directories
+
+    def snapshot(self) -> dict[str, tuple[int, int] | None]:
+        """Stat signature of every watched file and of every entry of the watched directories."""
+        signatures = {path: _signature(path) for path in self.files}
+        for directory in self.directories:
+            signatures[directory] = _signature(directory)
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        signatures[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return signatures
+
+
+class _PollBackend:
+    name = BACKEND_POLL
+
+    def __init__(self, interval: float = POLL_INTERVAL) -> None:
+        self.interval = interval
+        self._watch = WatchSet()
+        self._snapshot: dict[str, tuple[int, int] | None] = {}
+        self._wake = threading.Event()
+
+    def set_watch(self, watch: WatchSet) -> None:
+        self._watch = watch
+        self._snapshot = watch.snapshot()
+
+    def wait(self, timeout: float | None) -> set[str]:
+        self._wake.wait(self.interval if timeout is None else min(timeout, self.interval))
+        self._wake.clear()
+        current = self._watch.snapshot()
+        previous, self._snapshot = self._snapshot, current
+        return {path for path in previous.keys() | current.keys() if previous.get(path) != current.get(path)}
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def close(self) -> None:
+        self._wake.set()
+
+
+class _InotifyBackend:
+    name = BACKEND_INOTIFY
+
+    def __init__(self) -> None:
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._libc.inotify_rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._wake_read, self._wake_write = os.pipe()
+        self._watch = WatchSet()
+        self._directories: dict[int, str] = {}
+
+    def set_watch(self, watch: WatchSet) -> None:
+        self._watch = watch
+        wanted = watch.parents()
+        current = {directory: wd for wd, directory in self._directories.items()}
+        for directory in set(current) - wanted:
+            self._libc.inotify_rm_watch(self._fd, current[directory])
+            del self._directories[current[directory]]
+        for directory in wanted - set(current):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd >= 0:
+                self._directories[wd] = directory
+
+    def wait(self, timeout: float | None) -> set[str]:
+        readable, _, _ = select.select([self._fd, self._wake_read], [], [], timeout)
+        if self._wake_read in readable:
+            os.read(self._wake_read, 4096)
+        if self._fd not in readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except OSError as exc:
+            if exc.errno == errno.EAGAIN:
+                return set()
+            raise
+
+        changed: set[str] = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            raw_name = data[offset + _EVENT_HEADER.size : offset + _EVENT_HEADER.size + length]
+            offset += _EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                changed |= self._watch.files | self._watch.directories
+                continue
+            directory = self._directories.get(wd)
+            if directory is None:
+                continue
+            if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                if mask & IN_IGNORED:
+                    self._directories.pop(wd, None)
+                changed |= {path for path in self._watch.files if os.path.dirname(path) == directory}
+                if directory in self._watch.directories:
+                    changed.add(directory)
+                continue
+            name = raw_name.rstrip(b"\0")
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            if self._watch.relevant(path):
+                changed.add(path)
+        return changed
+
+    def wake(self) -> None:
+        os.write(self._wake_write, b"x")
+
+    def close(self) -> None:
+        for fd in (self._fd, self._wake_read, self._wake_write):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def _make_backend(prefer: str | None, poll_interval: float):
+    if prefer != BACKEND_POLL and sys.platform.startswith("linux"):
+        try:
+            return _InotifyBackend()
+        except (OSError, AttributeError):
+            pass
+    return _PollBackend(poll_interval)
+
+
+class ChangeWatcher:
+    """Background thread that reports changed paths in debounced batches.
+
+    A burst of events is delivered once, ``debounce`` seconds after it goes
+    quiet (at most ``max_delay`` after it started). ``on_change`` runs in the
+    watcher thread; UI code should hand the result over to its own thread.
+    """
+
+    def __init__(
+        self,
+        on_change: ChangeCallback,
+        debounce: float = DEBOUNCE,
+        max_delay: float = MAX_DELAY,
+        poll_interval: float = POLL_INTERVAL,
+        backend: str | None = None,
+    ) -> None:
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._backend = _make_backend(backend, poll_interval)
+        self._pending_watch: WatchSet | None = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def backend(self) -> str:
+        return self._backend.name
+
+    def watch(self, files: Iterable[str], directories: Iterable[str] = ()) -> None:
+        """Replace the watched paths; applied by the watcher thread on its next wake-up."""
+        watch = WatchSet(files, directories)
+        if self._thread is None:
+            self._backend.set_watch(watch)
+            return
+        with self._lock:
+            self._pending_watch = watch
+        self._backend.wake()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float | None = 2.0) -> None:
+        self._stopped.set()
+        self._backend.wake()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._backend.close()
+
+    def _run(self) -> None:
+        pending: set[str] = set()
+        first = last = 0.0
+        while not self._stopped.is_set():
+            with self._lock:
+                watch, self._pending_watch = self._pending_watch, None
+            if watch is not None:
+                self._backend.set_watch(watch)
+
+            timeout = None
+            if pending:
+                now = time.monotonic()
+                timeout = max(0.0, min(last + self.debounce, first + self.max_delay) - now)
+            changed = self._backend.wait(timeout)
+            if self._stopped.is_set():
+                return
+
+            now = time.monotonic()
+            if changed:
+                if not pending:
+                    first = now
+                pending |= changed
+                last = now
+            if pending and (now - last >= self.debounce or now - first >= self.max_delay):
+                batch, pending = pending, set()
+                try:
+                    self.on_change(batch)
+                except Exception:  # a failing consumer must not kill the watcher
+                    pass
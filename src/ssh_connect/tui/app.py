@@ -1,17 +1,34 @@
 from __future__ import annotations
 
-from datetime import datetime
+import os
+from collections.abc import Mapping
 
 from textual.app import App, ComposeResult
 from textual.containers import Container
 from textual.widgets import Footer, Header, TabbedContent, TabPane
+from textual.worker import get_current_worker
 
-from src.ssh_connect.services.config_service import parse_ssh_hosts
-from src.ssh_connect.services.key_service import list_local_private_keys
+from src.ssh_connect.services.cert_service import default_certificates
+from src.ssh_connect.services.config_cache import load_cached_config_index, read_cached_hosts
+from src.ssh_connect.services.config_index import ConfigIndex, scan_host_aliases
+from src.ssh_connect.services.control_master import default_pool
+from src.ssh_connect.services.history_service import load_scores
+from src.ssh_connect.services.key_service import KeyInfo, scan_private_keys
+from src.ssh_connect.services.known_hosts_service import HostKeyStatus
+from src.ssh_connect.services.log_service import ActivityLog
+from src.ssh_connect.services.probe_service import HostProber, ProbeResult
+from src.ssh_connect.services.search_service import HostSearchIndex
+from src.ssh_connect.services.timing_service import STAGE_VIEW_REFRESH, span
+from src.ssh_connect.services.watch_service import ChangeWatcher
+from src.ssh_connect.tui.loader import LOAD_HOSTS, LOAD_KEYS, growing_chunks
 from src.ssh_connect.tui.screens.home import HomeView
 from src.ssh_connect.tui.screens.hosts import HostsView
 from src.ssh_connect.tui.screens.keys import KeysView
 from src.ssh_connect.tui.screens.logs import LogsView
+from src.ssh_connect.tui.screens.masters import MastersView
+
+# How often (seconds) cached certificates are checked for background renewal.
+CERT_RENEW_INTERVAL = 60
 
 
 class SSHConnectTextualApp(App[None]):
@@ -41,6 +58,10 @@ class SSHConnectTextualApp(App[None]):
         padding: 1 0 0 0;
     }
 
+    #hosts-command, #logs-filter, #hosts-edit-bar Input {
+        width: 1fr;
+    }
+
     #logs-output {
         height: 1fr;
         border: heavy $surface;
@@ -51,9 +72,22 @@ class SSHConnectTextualApp(App[None]):
         super().__init__()
         self.config_path = config_path
         self.keys_dir = keys_dir
+        self.config_index: ConfigIndex | None = None
         self.hosts: list[str] = []
-        self.host_details: dict[str, dict[str, str]] = {}
+        self.host_details: Mapping[str, dict[str, str]] = {}
+        self.search_index = HostSearchIndex([], {})
         self.keys: list[str] = []
+        self.key_info: dict[str, KeyInfo] = {}
+        self.probe_results: dict[str, ProbeResult] = {}
+        self.host_keys: dict[str, HostKeyStatus] = {}
+        self.prober = HostProber()
+        self.master_pool = default_pool()
+        self.certificates = default_certificates()
+        self.activity_log = ActivityLog()
+        self.watcher: ChangeWatcher | None = None
+        self.loading: set[str] = set()
+        self._load_generation = 0
+        self.marked_hosts: set[str] = set()
         self.selected_host: str | None = None
         self.selected_key: str | None = None
 
@@ -67,39 +101,231 @@ class SSHConnectTextualApp(App[None]):
                     yield HostsView()
                 with TabPane("Keys", id="tab-keys"):
                     yield KeysView()
+                with TabPane("Masters", id="tab-masters"):
+                    yield MastersView()
                 with TabPane("Logs", id="tab-logs"):
                     yield LogsView()
         yield Footer()
 
     def on_mount(self) -> None:
-        self.refresh_data()
         self.append_log("SSH Connect TUI iniciada")
+        self.refresh_data()
+        self.start_watching()
+        if self.certificates is not None:
+            self.append_log(f"[certs] CA configurado: {self.certificates.settings.sign_url()}", action="cert")
+            self.set_interval(CERT_RENEW_INTERVAL, self._renew_certificates)
 
     def refresh_data(self) -> None:
-        hosts, host_details = parse_ssh_hosts(self.config_path)
-        keys = list_local_private_keys(self.keys_dir)
+        """Reload the config and the keys in background thread workers.
+
+        The first load streams aliases into the Hosts table as they are read;
+        details replace them once the full index is ready. A newer refresh
+        cancels the workers of the previous one, and results that still
+        arrive from an older generation are dropped.
+        """
+        self._load_generation += 1
+        generation = self._load_generation
+        preview = self.config_index is None
+        self.loading = {LOAD_HOSTS, LOAD_KEYS}
+        self._refresh_views(HomeView, HostsView, KeysView)
+        self.run_worker(
+            lambda: self._load_config(generation, preview),
+            name="load-config",
+            group="load-config",
+            exclusive=True,
+            thread=True,
+        )
+        self.run_worker(
+            lambda: self._load_keys(generation),
+            name="load-keys",
+            group="load-keys",
+            exclusive=True,
+            thread=True,
+        )
+
+    def _load_config(self, generation: int, preview: bool) -> None:
+        """Worker thread: stream a preview of the aliases, then build the full index."""
+        worker = get_current_worker()
+        try:
+            scores = load_scores()
+            if preview:
+                cached = read_cached_hosts(self.config_path)
+                chunks = [cached] if cached is not None else growing_chunks(scan_host_aliases(self.config_path))
+                loaded: list[str] = []
+                for chunk in chunks:
+                    if worker.is_cancelled:
+                        return
+                    loaded.extend(chunk)
+                    self.call_from_thread(self._apply_preview, generation, HostSearchIndex(loaded, {}, scores))
 
-        self.hosts = hosts
-        self.host_details = host_details
-        self.keys = keys
+            config_index = load_cached_config_index(self.config_path)
+            if worker.is_cancelled:
+                return
+            search_index = HostSearchIndex(list(config_index.hosts), config_index.host_details(), scores)
+        except (OSError, ValueError) as exc:
+            if not worker.is_cancelled:
+                self.call_from_thread(self._load_failed, generation, LOAD_HOSTS, exc)
+            return
+        if not worker.is_cancelled:
+            self.call_from_thread(self._apply_loaded_config, generation, config_index, search_index)
 
+    def _load_keys(self, generation: int) -> None:
+        """Worker thread: scan the keys directory (one read per new or changed file)."""
+        worker = get_current_worker()
+        try:
+            key_infos = scan_private_keys(self.keys_dir)
+        except OSError as exc:
+            if not worker.is_cancelled:
+                self.call_from_thread(self._load_failed, generation, LOAD_KEYS, exc)
+            return
+        if not worker.is_cancelled:
+            self.call_from_thread(self._apply_loaded_keys, generation, key_infos)
+
+    def _apply_preview(self, generation: int, search_index: HostSearchIndex) -> None:
+        if generation != self._load_generation:
+            return
+        self.hosts = list(search_index.hosts)
+        self.search_index = search_index
         if self.selected_host not in self.hosts:
             self.selected_host = self.hosts[0] if self.hosts else None
+        self._refresh_views(HostsView)
+
+    def _apply_loaded_config(self, generation: int, config_index: ConfigIndex, search_index: HostSearchIndex) -> None:
+        if generation != self._load_generation:
+            return
+        self.loading.discard(LOAD_HOSTS)
+        self._apply_config(config_index, search_index)
+        self._refresh_views(HomeView, HostsView, MastersView)
+        self.append_log(f"[load] {len(self.hosts)} hosts carregados", action="reload")
+
+    def _apply_loaded_keys(self, generation: int, key_infos: list[KeyInfo]) -> None:
+        if generation != self._load_generation:
+            return
+        self.loading.discard(LOAD_KEYS)
+        self._apply_keys(key_infos)
+        self._refresh_views(HomeView, KeysView)
+
+    def _load_failed(self, generation: int, part: str, exc: Exception) -> None:
+        if generation != self._load_generation:
+            return
+        self.loading.discard(part)
+        self._refresh_views(HomeView, HostsView, KeysView)
+        self.append_log(f"[load] falha ao carregar {part}: {exc}", action="reload", level="error")
+
+    def _apply_config(self, config_index: ConfigIndex, search_index: HostSearchIndex | None = None) -> None:
+        self.config_index = config_index
+        self.hosts = list(config_index.hosts)
+        self.host_details = config_index.host_details()
+        self.host_keys.clear()
+        if search_index is None:
+            search_index = HostSearchIndex(self.hosts, self.host_details, load_scores())
+        self.search_index = search_index
+        self.marked_hosts.intersection_update(self.hosts)
+        if self.selected_host not in self.hosts:
+            self.selected_host = self.hosts[0] if self.hosts else None
+        self._update_watch()
+
+    def _apply_keys(self, key_infos: list[KeyInfo]) -> None:
+        self.keys = [info.path for info in key_infos]
+        self.key_info = {info.path: info for info in key_infos}
         if self.selected_key not in self.keys:
             self.selected_key = self.keys[0] if self.keys else None
 
-        for view_type in (HomeView, HostsView, KeysView):
+    def _renew_certificates(self) -> None:
+        keys = list(self.keys)
+        self.run_worker(lambda: self.certificates.renew_due(keys), name="renew-certs", group="certs", exclusive=True, thread=True)
+
+    def _refresh_views(self, *view_types) -> None:
+        for view_type in view_types:
             matches = list(self.query(view_type))
             if matches:
-                matches[0].refresh_view()
+                with span(STAGE_VIEW_REFRESH, view_type.__name__):
+                    matches[0].refresh_view()
+
+    def start_watching(self) -> None:
+        """Reload the config and keys automatically when their files change."""
+        self.watcher = ChangeWatcher(self._on_files_changed)
+        self._update_watch()
+        self.watcher.start()
+        self.append_log(f"[watch] monitorando config e chaves ({self.watcher.backend})", action="reload")
+
+    def stop_watching(self) -> None:
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    def _update_watch(self) -> None:
+        if self.watcher is None or self.config_index is None:
+            return
+        directories = list(self.config_index.include_dirs)
+        if self.keys_dir:
+            directories.append(self.keys_dir)
+        self.watcher.watch([self.config_path, *self.config_index.sources], directories)
+
+    def _on_files_changed(self, paths: set[str]) -> None:
+        """Watcher thread: re-parse only what changed, then apply the result on the UI thread.
+
+        ``load_cached_config_index`` re-parses just the fragments whose stat
+        signature changed, and ``scan_private_keys`` only the changed keys.
+        """
+        index = self.config_index
+        config_files = {os.path.abspath(path) for path in (self.config_path, *(index.sources if index else ()))}
+        include_dirs = {os.path.abspath(path) for path in (index.include_dirs if index else ())}
+        keys_dir = os.path.abspath(self.keys_dir) if self.keys_dir else None
+
+        config_changed = any(
+            path in config_files or path in include_dirs or os.path.dirname(path) in include_dirs for path in paths
+        )
+        keys_changed = keys_dir is not None and any(
+            path == keys_dir or os.path.dirname(path) == keys_dir for path in paths - config_files
+        )
+
+        config_index = key_infos = None
+        try:
+            if config_changed:
+                config_index = load_cached_config_index(self.config_path)
+            if keys_changed:
+                key_infos = scan_private_keys(self.keys_dir)
+        except (OSError, ValueError) as exc:
+            self.call_from_thread(self.append_log, f"[watch] falha ao recarregar: {exc}", action="reload", level="error")
+            return
+        if config_index is not None or key_infos is not None:
+            self.call_from_thread(self._apply_reload, config_index, key_infos)
+
+    def _apply_reload(self, config_index: ConfigIndex | None, key_infos: list[KeyInfo] | None) -> None:
+        views = set()
+        if config_index is not None and config_index is not self.config_index:
+            before = set(self.hosts)
+            self._apply_config(config_index)
+            after = set(self.hosts)
+            views |= {HomeView, HostsView}
+            self.append_log(
+                f"[watch] config recarregado: {len(after)} hosts (+{len(after - before)} / -{len(before - after)})",
+                action="reload",
+            )
+        if key_infos is not None and key_infos != [self.key_info[path] for path in self.keys]:
+            self._apply_keys(key_infos)
+            views |= {HomeView, KeysView}
+            self.append_log(f"[watch] chaves recarregadas: {len(self.keys)}", action="reload")
+        self._refresh_views(*[view for view in (HomeView, HostsView, KeysView) if view in views])
+
+    def refresh_frecency(self) -> None:
+        """Re-read the connection history so the Hosts ordering reflects the latest session."""
+        self.search_index.set_frecency(load_scores())
+        matches = list(self.query(HostsView))
+        if matches:
+            matches[0].refresh_view()
 
-    def append_log(self, message: str) -> None:
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        full = f"[{ts}] {message}"
+    def append_log(self, message: str, **fields) -> None:
+        entry = self.activity_log.record(message, **fields)
         logs_view = self.query_one(LogsView)
-        logs_view.append(full)
+        logs_view.append(entry)
 
 
 def main(config_path: str, keys_dir: str | None) -> None:
     app = SSHConnectTextualApp(config_path=config_path, keys_dir=keys_dir)
-    app.run()
+    try:
+        app.run()
+    finally:
+        app.stop_watching()
+        app.activity_log.close()
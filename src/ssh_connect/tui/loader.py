@@ -0,0 +1,45 @@
+"""Batching for progressive loading: hand items to the UI in chunks that grow as loading goes on."""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterable, Iterator
+from typing import TypeVar
+
+T = TypeVar("T")
+
+# Parts of the data still being loaded in the background (``app.loading``).
+LOAD_HOSTS = "hosts"
+LOAD_KEYS = "keys"
+
+FIRST_CHUNK = 200
+CHUNK_GROWTH = 4
+MAX_CHUNK_INTERVAL = 0.25
+
+
+def growing_chunks(
+    items: Iterable[T],
+    first: int = FIRST_CHUNK,
+    growth: int = CHUNK_GROWTH,
+    max_interval: float = MAX_CHUNK_INTERVAL,
+    clock: Callable[[], float] = time.monotonic,
+) -> Iterator[list[T]]:
+    """Split ``items`` into lists of ``first``, ``first * growth``, ... items.
+
+    The first rows reach the screen quickly, while the geometric growth keeps
+    the number of UI updates (each re-ranking everything loaded so far)
+    logarithmic in the total. A chunk is also cut early once ``max_interval``
+    seconds have passed since the previous one, so a slow source (a config on
+    a network home directory) still shows progress.
+    """
+    size = first
+    chunk: list[T] = []
+    started = clock()
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size or clock() - started >= max_interval:
+            yield chunk
+            chunk = []
+            size *= growth
+            started = clock()
+    if chunk:
+        yield chunk
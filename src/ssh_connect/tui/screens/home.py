@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import os
+from datetime import datetime
+
 from textual.containers import Horizontal, Vertical
 from textual.widgets import Button, DataTable, Static
 
+from src.ssh_connect.services.paths import ensure_private_dir, state_dir
+from src.ssh_connect.services.timing_service import TIMINGS
+from src.ssh_connect.tui.loader import LOAD_HOSTS, LOAD_KEYS
+
 
 class HomeView(Vertical):
     def compose(self):
@@ -10,36 +18,46 @@ class HomeView(Vertical):
         yield Static("", id="home-summary")
         yield Horizontal(
             Button("Refresh", id="home-refresh", variant="primary"),
+            Button("Export Timings JSON", id="home-export-json"),
+            Button("Export Chrome Trace", id="home-export-chrome"),
             id="home-actions",
         )
         table = DataTable(id="home-checks")
         table.cursor_type = "row"
         yield table
+        yield Static("", id="home-status", classes="status")
 
     def on_mount(self) -> None:
         table = self.query_one("#home-checks", DataTable)
         table.add_columns("Check", "Status", "Details")
+        for button_id in ("#home-export-json", "#home-export-chrome"):
+            self.query_one(button_id, Button).display = TIMINGS.enabled
         self.refresh_view()
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "home-refresh":
             self.app.refresh_data()
             self._log("[home] ambiente atualizado")
+        elif event.button.id in ("home-export-json", "home-export-chrome"):
+            fmt = "json" if event.button.id == "home-export-json" else "chrome"
+            self.run_worker(self._export_timings(fmt), exclusive=True, group="timings-export")
 
     def refresh_view(self) -> None:
+        hosts_loading = " (carregando...)" if LOAD_HOSTS in self.app.loading else ""
+        keys_loading = " (carregando...)" if LOAD_KEYS in self.app.loading else ""
         summary_text = (
             f"Config: {self.app.config_path}\n"
             f"Keys Dir: {self.app.keys_dir or '~/.ssh'}\n"
-            f"Hosts: {len(self.app.hosts)}\n"
-            f"Keys: {len(self.app.keys)}\n"
+            f"Hosts: {len(self.app.hosts)}{hosts_loading}\n"
+            f"Keys: {len(self.app.keys)}{keys_loading}\n"
             f"Selected Host: {self.app.selected_host or '-'}\n"
             f"Selected Key: {self.app.selected_key or '-'}"
         )
         self.query_one("#home-summary", Static).update(summary_text)
 
         checks = [
-            ("SSH config", bool(self.app.hosts), "Hosts carregados do arquivo"),
-            ("SSH keys", bool(self.app.keys), "Chaves privadas detectadas"),
+            ("SSH config", None if hosts_loading else bool(self.app.hosts), "Hosts carregados do arquivo"),
+            ("SSH keys", None if keys_loading else bool(self.app.keys), "Chaves privadas detectadas"),
             ("Host selecionado", bool(self.app.selected_host), "Host ativo para conectar"),
             ("Key selecionada", bool(self.app.selected_key), "Chave ativa para copiar"),
         ]
@@ -47,8 +65,28 @@ class HomeView(Vertical):
         table = self.query_one("#home-checks", DataTable)
         table.clear()
         for name, ok, details in checks:
-            table.add_row(name, "ok" if ok else "fail", details)
+            table.add_row(name, "..." if ok is None else "ok" if ok else "fail", details)
+
+        if TIMINGS.enabled:
+            for item in TIMINGS.summary():
+                table.add_row(
+                    f"Tempo: {item.stage}",
+                    f"{item.total * 1000:.1f} ms",
+                    f"{item.count}x, máx {item.max * 1000:.1f} ms, último {item.last * 1000:.1f} ms",
+                )
+
+    async def _export_timings(self, fmt: str) -> None:
+        export_dir = ensure_private_dir(os.path.join(ensure_private_dir(state_dir()), "exports"))
+        suffix = "trace.json" if fmt == "chrome" else "json"
+        target = os.path.join(export_dir, f"timings-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{suffix}")
+        try:
+            count = await asyncio.to_thread(TIMINGS.export, target, fmt)
+        except (OSError, ValueError) as exc:
+            self.query_one("#home-status", Static).update(f"Falha ao exportar: {exc}")
+            return
+        self.query_one("#home-status", Static).update(f"{count} medições exportadas para {target}")
+        self._log(f"[home] medições exportadas para {target}", action="export")
 
-    def _log(self, message: str) -> None:
+    def _log(self, message: str, **fields) -> None:
         if hasattr(self.app, "append_log"):
-            self.app.append_log(message)
+            self.app.append_log(message, **fields)
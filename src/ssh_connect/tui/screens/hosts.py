@@ -1,28 +1,108 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from collections.abc import Callable
 
 from textual.containers import Horizontal, Vertical
-from textual.widgets import Button, DataTable, Input, Static
+from textual.coordinate import Coordinate
+from textual.widgets import Button, Checkbox, DataTable, Input, Static
+from textual.worker import get_current_worker
 
+from src.ssh_connect.services.config_editor import ConfigEditor
+from src.ssh_connect.services.config_index import ConfigIndex
+from src.ssh_connect.services.fanout_service import STREAM_STDERR, FanoutRunner, HostRunResult, exit_code, summarize
+from src.ssh_connect.services.key_deploy_service import DeployResult, KeyDeployer, deploy_report
+from src.ssh_connect.services.known_hosts_service import KEY_KNOWN, HostKeyStatus, KnownHostsChecker
+from src.ssh_connect.services.probe_service import STATUS_DOWN, STATUS_UP, ProbeResult, probe_target
 from src.ssh_connect.services.ssh_service import connect_ssh, copy_ssh_key
+from src.ssh_connect.services.timing_service import STAGE_VIEW_REFRESH, span
+from src.ssh_connect.tui.loader import LOAD_HOSTS
+from src.ssh_connect.tui.table_sync import TableSync
+
+# Above WINDOW_THRESHOLD matching hosts only a window of WINDOW_SIZE rows around
+# the viewport is materialized; it is re-centred when the cursor or the viewport
+# gets within WINDOW_MARGIN rows of either edge.
+WINDOW_THRESHOLD = 2000
+WINDOW_SIZE = 600
+WINDOW_MARGIN = 40
+JUMP_FIRST = "first"
+JUMP_LAST = "last"
+JUMP_PAGE_UP = "page-up"
+JUMP_PAGE_DOWN = "page-down"
+# Host key results are handed to the UI in batches, at most this often (seconds).
+HOST_KEY_FLUSH = 0.1
+
+# Fields of the edit bar, in the order of its inputs, after the host name.
+EDIT_FIELDS = (("hosts-edit-hostname", "HostName"), ("hosts-edit-user", "User"), ("hosts-edit-port", "Port"))
+
+
+class HostsTable(DataTable):
+    """The hosts table: Home/End and paging move over every matching host, not only the materialized window."""
+
+    def __init__(self, jump: Callable[[str], None], **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._jump = jump
+
+    def action_scroll_home(self) -> None:
+        self._jump(JUMP_FIRST)
+
+    def action_scroll_top(self) -> None:
+        self._jump(JUMP_FIRST)
+
+    def action_scroll_end(self) -> None:
+        self._jump(JUMP_LAST)
+
+    def action_scroll_bottom(self) -> None:
+        self._jump(JUMP_LAST)
+
+    def action_page_up(self) -> None:
+        self._jump(JUMP_PAGE_UP)
+
+    def action_page_down(self) -> None:
+        self._jump(JUMP_PAGE_DOWN)
 
 
 class HostsView(Vertical):
+    BINDINGS = [("space", "toggle_mark", "Mark host")]
+
     def __init__(self) -> None:
         super().__init__()
         self._visible_hosts: list[str] = []
+        self._window_start = 0
+        self._rows: TableSync | None = None
+        self._editing: str | None = None
+        self._pending_delete: str | None = None
+        self._rewindowing = False
 
     def compose(self):
-        yield Static("Hosts", classes="title")
+        yield Static("Hosts", classes="title", id="hosts-title")
         yield Input(placeholder="Filter hosts", id="hosts-filter")
         yield Horizontal(
             Button("Refresh", id="hosts-refresh", variant="primary"),
             Button("Connect", id="hosts-connect", variant="success"),
             Button("Copy Selected Key", id="hosts-copy-key"),
+            Button("Probe", id="hosts-probe"),
             id="hosts-actions",
         )
-        table = DataTable(id="hosts-table")
+        yield Horizontal(
+            Input(placeholder="Command for marked hosts (space marks a host)", id="hosts-command"),
+            Checkbox("Fail fast", id="hosts-fail-fast"),
+            Button("Run on Marked", id="hosts-run", variant="warning"),
+            Button("Deploy Key to Marked", id="hosts-deploy-key"),
+            id="hosts-run-bar",
+        )
+        yield Horizontal(
+            Input(placeholder="Host (aliases separated by spaces)", id="hosts-edit-name"),
+            *(Input(placeholder=key, id=input_id) for input_id, key in EDIT_FIELDS),
+            Input(placeholder="Comment (##)", id="hosts-edit-comment"),
+            Button("Edit Selected", id="hosts-edit"),
+            Button("Add", id="hosts-add", variant="success"),
+            Button("Save", id="hosts-save", variant="primary"),
+            Button("Delete", id="hosts-delete", variant="error"),
+            id="hosts-edit-bar",
+        )
+        table = HostsTable(self._jump, id="hosts-table")
         table.cursor_type = "row"
         yield table
         yield Static("", id="hosts-details")
@@ -30,61 +110,440 @@ class HostsView(Vertical):
 
     def on_mount(self) -> None:
         table = self.query_one("#hosts-table", DataTable)
-        table.add_columns("Host", "HostName", "User", "Comment")
+        self._rows = TableSync(table, table.add_columns("✓", "Host", "HostName", "User", "Comment", "Status", "RTT", "Server", "Host Key"), key_column=1)
+        self.watch(table, "scroll_y", lambda _value: self._on_table_scrolled(), init=False)
         self.refresh_view()
 
+    def on_show(self) -> None:
+        self.call_after_refresh(self._check_visible_host_keys)
+
+    def on_resize(self) -> None:
+        self.call_after_refresh(self._check_visible_host_keys)
+
     def on_input_changed(self, event: Input.Changed) -> None:
         if event.input.id == "hosts-filter":
-            self.refresh_view(event.value)
+            with span(STAGE_VIEW_REFRESH, "HostsView.filter", query=event.value):
+                self.refresh_view(event.value)
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        if event.input.id == "hosts-command":
+            self._start_run()
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         button_id = event.button.id
         if button_id == "hosts-refresh":
             self.app.refresh_data()
-            self._status("Lista de hosts atualizada")
+            self._status("Recarregando lista de hosts...")
             self._log("[hosts] refresh")
         elif button_id == "hosts-connect":
             self.run_worker(self._connect_selected(), exclusive=True)
         elif button_id == "hosts-copy-key":
             self.run_worker(self._copy_selected_key(), exclusive=True)
+        elif button_id == "hosts-deploy-key":
+            self._start_deploy()
+        elif button_id == "hosts-run":
+            self._start_run()
+        elif button_id == "hosts-probe":
+            self.run_worker(self._probe_hosts(list(self._visible_hosts)), exclusive=True, group="probe")
+        elif button_id == "hosts-edit":
+            self._load_edit_form()
+        elif button_id == "hosts-add":
+            self._start_add()
+        elif button_id == "hosts-save":
+            self._start_save()
+        elif button_id == "hosts-delete":
+            self._start_delete()
 
     def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
         if event.data_table.id != "hosts-table":
             return
 
         host = self._host_at_cursor()
+        table = event.data_table
+        row = event.cursor_row
+        on_screen = table.scroll_offset.y <= row < table.scroll_offset.y + table.size.height
+        # A cursor moved off screen by a scroll re-window must not pull the window back to it.
+        if self._windowed() and host is not None and on_screen:
+            near_top = row < WINDOW_MARGIN and self._window_start > 0
+            near_bottom = row >= len(self._rows) - WINDOW_MARGIN and self._window_start + len(self._rows) < len(self._visible_hosts)
+            if near_top or near_bottom:
+                self._show_window_around(host)
         self.app.selected_host = host
         self._update_details(host)
 
-    def refresh_view(self, filter_text: str = "") -> None:
-        filter_value = filter_text.lower().strip()
-        self._visible_hosts = [
-            host
-            for host in self.app.hosts
-            if not filter_value or filter_value in host.lower() or filter_value in str(self.app.host_details.get(host, {})).lower()
-        ]
+    def refresh_view(self, filter_text: str | None = None) -> None:
+        if filter_text is None:
+            filter_text = self.query_one("#hosts-filter", Input).value
+        self._visible_hosts = self.app.search_index.search(filter_text)
 
-        table = self.query_one("#hosts-table", DataTable)
-        table.clear()
-        for host in self._visible_hosts:
-            details = self.app.host_details.get(host, {})
-            table.add_row(
-                host,
-                details.get("HostName", "-"),
-                details.get("User", "-"),
-                details.get("Comentário", "-"),
+        if self.app.selected_host not in self._visible_hosts:
+            self.app.selected_host = self._visible_hosts[0] if self._visible_hosts else None
+
+        self._show_window_around(self.app.selected_host)
+        self._update_details(self.app.selected_host)
+
+    def _windowed(self) -> bool:
+        return len(self._visible_hosts) > WINDOW_THRESHOLD
+
+    def _show_window_around(self, host: str | None) -> None:
+        """Sync the table with the rows around ``host`` (all rows when not windowed) and put the cursor on it."""
+        start = 0
+        if self._windowed():
+            position = self._visible_hosts.index(host) if host is not None else 0
+            start = min(max(0, position - WINDOW_SIZE // 2), len(self._visible_hosts) - WINDOW_SIZE)
+        self._sync_window(start)
+
+        row_index = self._rows.index_of(host)
+        if row_index is not None:
+            self.query_one("#hosts-table", DataTable).cursor_coordinate = (row_index, 0)
+        # The cursor move scrolls the table on the next refresh; check the rows on screen after it.
+        self.call_after_refresh(self._check_visible_host_keys)
+
+    def _sync_window(self, start: int) -> None:
+        """Materialize the window of rows starting at ``start`` (every row when not windowed) and title the view."""
+        window = self._visible_hosts[start:start + WINDOW_SIZE] if self._windowed() else self._visible_hosts
+        self._window_start = start
+        self._rows.sync([(host_name, self._row_cells(host_name)) for host_name in window])
+
+        title = f"Hosts ({len(self._visible_hosts)})"
+        if self._windowed():
+            title = f"Hosts ({start + 1}-{start + len(window)} de {len(self._visible_hosts)})"
+        loading = LOAD_HOSTS in self.app.loading
+        if loading:
+            title += " - carregando..."
+        self.query_one("#hosts-title", Static).update(title)
+        self.query_one("#hosts-table", DataTable).loading = loading and not self.app.hosts
+
+    def _on_table_scrolled(self) -> None:
+        """Mouse wheel and scrollbar: re-centre the window when the viewport nears one of its edges."""
+        if self._windowed() and not self._rewindowing:
+            table = self.query_one("#hosts-table", DataTable)
+            first = int(table.scroll_offset.y)
+            near_top = first < WINDOW_MARGIN and self._window_start > 0
+            near_bottom = (
+                first + table.size.height > len(self._rows) - WINDOW_MARGIN
+                and self._window_start + len(self._rows) < len(self._visible_hosts)
             )
+            if near_top or near_bottom:
+                self._rewindow_at(first)
+        self._check_visible_host_keys()
+
+    def _rewindow_at(self, first_row: int) -> None:
+        """Re-centre the window on the viewport while keeping the same hosts on screen."""
+        table = self.query_one("#hosts-table", DataTable)
+        anchor = self._window_start + first_row
+        # The cursor, not selected_host: a key press may have moved it before its highlight event is handled.
+        cursor_host = self._rows.key_at(table.cursor_row)
+        start = min(max(0, anchor - WINDOW_SIZE // 2), len(self._visible_hosts) - WINDOW_SIZE)
+        self._rewindowing = True
+        try:
+            self._sync_window(start)
+            table.scroll_to(y=anchor - start, animate=False, immediate=True)
+            row = self._rows.index_of(cursor_host)
+            if row is None:
+                # The cursor's host left the window: select the top row on screen instead.
+                row = anchor - start
+                self.app.selected_host = self._rows.key_at(row)
+                self._update_details(self.app.selected_host)
+            # Set without the watcher: it would scroll the table back to the cursor.
+            table.set_reactive(DataTable.cursor_coordinate, Coordinate(row, 0))
+            table.refresh()
+        finally:
+            self._rewindowing = False
+
+    def _jump(self, where: str) -> None:
+        """Home/End/PageUp/PageDown over all matching hosts (the table itself only knows the window)."""
+        if not self._visible_hosts:
+            return
+        table = self.query_one("#hosts-table", DataTable)
+        position = self._window_start + table.cursor_row
+        page = max(1, table.scrollable_content_region.height - table.header_height)
+        target = {
+            JUMP_FIRST: 0,
+            JUMP_LAST: len(self._visible_hosts) - 1,
+            JUMP_PAGE_UP: position - page,
+            JUMP_PAGE_DOWN: position + page,
+        }[where]
+        target = min(max(0, target), len(self._visible_hosts) - 1)
+        row = target - self._window_start
+        if 0 <= row < len(self._rows):
+            # Inside the window: the highlight handler re-centres it near an edge.
+            table.move_cursor(row=row)
+            return
+        host = self._visible_hosts[target]
+        self.app.selected_host = host
+        self._show_window_around(host)
+        self._update_details(host)
 
-        if self.app.selected_host in self._visible_hosts:
-            index = self._visible_hosts.index(self.app.selected_host)
+    def _row_cells(self, host: str) -> tuple[str, ...]:
+        details = self.app.host_details.get(host, {})
+        probe = self.app.probe_results.get(host)
+        if probe is None:
+            status = ("", "", "")
         else:
-            index = 0 if self._visible_hosts else None
-            self.app.selected_host = self._visible_hosts[0] if self._visible_hosts else None
+            rtt = f"{probe.rtt_ms:.1f} ms" if probe.rtt_ms is not None else "-"
+            status = (probe.status, rtt, probe.server_version or probe.error or "-")
+        mark = "✓" if host in self.app.marked_hosts else ""
+        host_key = self.app.host_keys.get(host)
+        return (
+            mark,
+            host,
+            details.get("HostName", "-"),
+            details.get("User", "-"),
+            details.get("Comentário", "-"),
+            *status,
+            host_key.status if host_key is not None else "",
+        )
 
-        if index is not None:
-            table.cursor_coordinate = (index, 0)
+    def _check_visible_host_keys(self) -> None:
+        """Check the host keys of the rows inside the table's viewport (and of the selected host)."""
+        table = self.query_one("#hosts-table", DataTable)
+        first = int(table.scroll_offset.y)
+        visible = [self._rows.key_at(row) for row in range(first, first + table.size.height)]
+        hosts = [host for host in visible if host is not None]
+        if self.app.selected_host is not None:
+            hosts.insert(0, self.app.selected_host)
+        self._check_host_keys(hosts)
 
-        self._update_details(self.app.selected_host)
+    def _check_host_keys(self, hosts: list[str]) -> None:
+        """Look up the known host keys of ``hosts`` (the rows on screen) in a thread, replacing an older lookup."""
+        index = self.app.config_index
+        pending = [host for host in dict.fromkeys(hosts) if host not in self.app.host_keys]
+        if index is None or not pending:
+            return
+        self.run_worker(
+            lambda: self._look_up_host_keys(index, pending),
+            name="host-keys",
+            group="host-keys",
+            exclusive=True,
+            thread=True,
+        )
+
+    def _look_up_host_keys(self, index: ConfigIndex, hosts: list[str]) -> None:
+        """Worker thread: one ``known_hosts`` check per host (hashed files cost one HMAC per entry for a new name)."""
+        worker = get_current_worker()
+        checker = KnownHostsChecker(index)
+        batch: list[HostKeyStatus] = []
+        flushed = time.monotonic()
+        for host in hosts:
+            if worker.is_cancelled:
+                return
+            try:
+                batch.append(checker.check(host))
+            except (OSError, ValueError):
+                continue
+            if time.monotonic() - flushed >= HOST_KEY_FLUSH:
+                self.app.call_from_thread(self._show_host_keys, index, batch)
+                batch, flushed = [], time.monotonic()
+        if batch and not worker.is_cancelled:
+            self.app.call_from_thread(self._show_host_keys, index, batch)
+
+    def _show_host_keys(self, index: ConfigIndex, results: list[HostKeyStatus]) -> None:
+        if index is not self.app.config_index:
+            return
+        for result in results:
+            self.app.host_keys[result.host] = result
+            self._rows.update(result.host, self._row_cells(result.host))
+            if result.host == self.app.selected_host:
+                self._update_details(result.host)
+
+    def action_toggle_mark(self) -> None:
+        host = self._host_at_cursor()
+        if host is None:
+            return
+        marked = self.app.marked_hosts
+        if host in marked:
+            marked.discard(host)
+        else:
+            marked.add(host)
+        self._rows.update(host, self._row_cells(host))
+        self._status(f"{len(marked)} hosts marcados")
+
+    def _start_run(self) -> None:
+        command = self.query_one("#hosts-command", Input).value.strip()
+        hosts = [host for host in self.app.hosts if host in self.app.marked_hosts]
+        if not hosts:
+            self._status("Marque hosts com espaço antes de executar")
+            return
+        if not command:
+            self._status("Informe o comando a executar")
+            return
+        fail_fast = self.query_one("#hosts-fail-fast", Checkbox).value
+        self.run_worker(self._run_on_hosts(hosts, command, fail_fast), exclusive=True, group="run")
+
+    async def _run_on_hosts(self, hosts: list[str], command: str, fail_fast: bool) -> None:
+        self._status(f"Executando em {len(hosts)} hosts... (saída na aba Logs)")
+        self._log(f"[run] start: {command!r} em {len(hosts)} hosts", action="run")
+
+        def show_line(host: str, stream: str, line: str) -> None:
+            self._log(f"[run] {host} {'!' if stream == STREAM_STDERR else '|'} {line}", host=host, action="run")
+
+        def show_result(result: HostRunResult) -> None:
+            detail = f": {result.error}" if result.error else ""
+            self._log(
+                f"[run] {result.host}: {result.status}{detail}",
+                host=result.host,
+                action="run",
+                duration=result.duration,
+                exit_code=result.returncode,
+            )
+
+        runner = FanoutRunner(self.app.config_path, self.app.keys_dir, fail_fast=fail_fast, pool=self.app.master_pool)
+        results = await runner.run(hosts, command, show_line, show_result)
+
+        for label, group in summarize(results):
+            self._log(f"[run] {label}: {len(group)} ({', '.join(group)})", action="run")
+        succeeded = sum(1 for result in results if result.ok)
+        self._status(f"Execução concluída: {succeeded}/{len(results)} ok (código {exit_code(results)})")
+
+    def _start_deploy(self) -> None:
+        key_path = self.app.selected_key
+        if not key_path:
+            self._status("Selecione uma chave na aba Keys")
+            return
+        hosts = [host for host in self.app.hosts if host in self.app.marked_hosts]
+        if not hosts:
+            self._status("Marque hosts com espaço antes de distribuir a chave")
+            return
+        self.run_worker(self._deploy_key(hosts, key_path), exclusive=True, group="deploy")
+
+    async def _deploy_key(self, hosts: list[str], key_path: str) -> None:
+        """Bulk, non-interactive key deployment; the UI keeps running while hosts are processed."""
+        done: list[DeployResult] = []
+        self._log(f"[deploy] start: {key_path} -> {len(hosts)} hosts", action="deploy")
+
+        def show_progress() -> None:
+            report = deploy_report(done)
+            self._status(
+                f"Distribuindo chave: {len(done)}/{len(hosts)} "
+                f"(adicionada {len(report['added'])}, já presente {len(report['present'])}, falha {len(report['failed'])})"
+            )
+
+        def show_result(result: DeployResult) -> None:
+            done.append(result)
+            detail = f": {result.error}" if result.error else ""
+            self._log(f"[deploy] {result.host}: {result.status} (tentativas: {result.attempts}){detail}", host=result.host, action="deploy")
+            show_progress()
+
+        def show_retry(host: str, attempt: int, delay: float, error: str) -> None:
+            self._log(
+                f"[deploy] {host}: tentativa {attempt} falhou ({error}), nova tentativa em {delay:.1f}s",
+                host=host,
+                action="deploy",
+                level="warning",
+            )
+
+        show_progress()
+        deployer = KeyDeployer(self.app.config_path, self.app.keys_dir, pool=self.app.master_pool)
+        try:
+            results = await deployer.deploy(hosts, key_path, show_result, show_retry)
+        except (OSError, ValueError) as exc:
+            self._status(f"Falha ao ler a chave pública: {exc}")
+            self._log(f"[deploy] error: {exc}", action="deploy", level="error")
+            return
+
+        for status, group in deploy_report(results).items():
+            if group:
+                self._log(f"[deploy] {status}: {len(group)} ({', '.join(group)})", action="deploy")
+        show_progress()
+
+    def _form(self) -> tuple[list[str], dict[str, str | None], str]:
+        names = self.query_one("#hosts-edit-name", Input).value.split()
+        options = {key: self.query_one(f"#{input_id}", Input).value.strip() or None for input_id, key in EDIT_FIELDS}
+        return names, options, self.query_one("#hosts-edit-comment", Input).value.strip()
+
+    def _load_edit_form(self) -> None:
+        """Fill the edit bar with what the selected host's own block says (inherited values are left out)."""
+        host = self._host_at_cursor()
+        index = self.app.config_index
+        blocks = index.blocks_for(host) if host and index is not None else ()
+        if not blocks:
+            self._status("Selecione um host")
+            return
+        self._editing = host
+        self.query_one("#hosts-edit-name", Input).value = host
+        for input_id, key in EDIT_FIELDS:
+            self.query_one(f"#{input_id}", Input).value = blocks[0].get(key) or ""
+        self.query_one("#hosts-edit-comment", Input).value = blocks[0].comment or ""
+        self._status(f"Editando {host}: altere os campos e use Save (campo vazio remove a opção)")
+
+    def _start_add(self) -> None:
+        names, options, comment = self._form()
+        if not names:
+            self._status("Informe o nome do novo host")
+            return
+        options = {key: value for key, value in options.items() if value}
+        self.app.selected_host = names[0]
+        self._start_edit(f"host {' '.join(names)} adicionado", lambda editor: editor.add_host(names, options, comment or None))
+
+    def _start_save(self) -> None:
+        host = self._editing
+        if host is None:
+            self._status("Use Edit Selected antes de salvar")
+            return
+        names, options, comment = self._form()
+        if len(names) != 1:
+            self._status("Save altera um único host: informe só o nome dele")
+            return
+
+        def queue(editor: ConfigEditor) -> None:
+            editor.set_options(host, options, comment=comment or None)
+            editor.rename_host(host, names[0])
+
+        self._editing = self.app.selected_host = names[0]
+        self._start_edit(f"host {host} salvo" if names[0] == host else f"host {host} renomeado para {names[0]}", queue)
+
+    def _start_delete(self) -> None:
+        host = self._host_at_cursor()
+        if not host:
+            self._status("Selecione um host")
+            return
+        if self._pending_delete != host:
+            self._pending_delete = host
+            self._status(f"Clique em Delete de novo para remover {host} do config")
+            return
+        self._pending_delete = None
+        self._start_edit(f"host {host} removido", lambda editor: editor.delete_host(host))
+
+    def _start_edit(self, description: str, queue) -> None:
+        self._pending_delete = None
+        self.run_worker(self._apply_edit(description, queue), exclusive=True, group="edit")
+
+    async def _apply_edit(self, description: str, queue) -> None:
+        """Queue the edit on a fresh ``ConfigEditor`` and write it off the UI thread, then reload."""
+
+        def commit() -> list[str]:
+            editor = ConfigEditor(self.app.config_path)
+            queue(editor)
+            return editor.commit()
+
+        try:
+            written = await asyncio.to_thread(commit)
+        except (OSError, ValueError) as exc:
+            self._status(f"Falha ao editar o config: {exc}")
+            self._log(f"[hosts] config edit error: {exc}", action="config-edit", level="error")
+            return
+        self._status(f"Config atualizado: {description}" if written else "Nada a alterar")
+        self._log(f"[hosts] config edit: {description}", action="config-edit")
+        self.app.refresh_data()
+
+    async def _probe_hosts(self, hosts: list[str]) -> None:
+        if not hosts or self.app.config_index is None:
+            self._status("Nenhum host para sondar")
+            return
+
+        self._status(f"Sondando {len(hosts)} hosts...")
+        self._log(f"[hosts] probe start: {len(hosts)} hosts", action="probe")
+
+        def show(result: ProbeResult) -> None:
+            self.app.probe_results[result.host] = result
+            self._rows.update(result.host, self._row_cells(result.host))
+
+        targets = [probe_target(self.app.config_index, host) for host in hosts]
+        results = await self.app.prober.probe_all(targets, on_result=show)
+        online = sum(1 for result in results if result.status == STATUS_UP)
+        self._status(f"Sondagem concluída: {online}/{len(results)} hosts respondendo")
+        self._log(f"[hosts] probe end: {online}/{len(results)} up", action="probe")
 
     async def _connect_selected(self) -> None:
         host = self._host_at_cursor()
@@ -94,16 +553,36 @@ class HostsView(Vertical):
 
         self.app.selected_host = host
         self._status(f"Conectando em {host}...")
-        self._log(f"[hosts] connect start: {host}")
+        self._log(f"[hosts] connect start: {host}", host=host, action="connect")
+        probe = self.app.probe_results.get(host)
+        if probe is not None and probe.status == STATUS_DOWN:
+            self._log(f"[hosts] aviso: {host} não respondeu na última sondagem ({probe.error})", host=host, level="warning")
 
+        started = time.monotonic()
         try:
             with self.app.suspend():
-                await asyncio.to_thread(connect_ssh, host, self.app.config_path, self.app.keys_dir)
+                returncode = await asyncio.to_thread(
+                    connect_ssh,
+                    host,
+                    self.app.config_path,
+                    self.app.keys_dir,
+                    certificate_key=self.app.selected_key if self.app.certificates else None,
+                    certificates=self.app.certificates,
+                )
             self._status(f"Sessão encerrada para {host}")
-            self._log(f"[hosts] connect end: {host}")
+            self._log(
+                f"[hosts] connect end: {host}",
+                host=host,
+                action="connect",
+                duration=time.monotonic() - started,
+                exit_code=returncode,
+            )
+            # The session may have added the host key to known_hosts: check it again.
+            self.app.host_keys.pop(host, None)
+            self.app.refresh_frecency()
         except Exception as exc:
             self._status(f"Falha ao conectar em {host}")
-            self._log(f"[hosts] connect error: {exc}")
+            self._log(f"[hosts] connect error: {exc}", host=host, action="connect", level="error")
 
     async def _copy_selected_key(self) -> None:
         host = self._host_at_cursor()
@@ -118,25 +597,24 @@ class HostsView(Vertical):
 
         self.app.selected_host = host
         self._status(f"Copiando chave para {host}...")
-        self._log(f"[hosts] copy key start: {host} <- {key_path}")
+        self._log(f"[hosts] copy key start: {host} <- {key_path}", host=host, action="copy-key")
 
+        started = time.monotonic()
         try:
             with self.app.suspend():
                 await asyncio.to_thread(copy_ssh_key, host, key_path, self.app.config_path)
             self._status(f"Chave copiada para {host}")
-            self._log(f"[hosts] copy key end: {host}")
+            self._log(f"[hosts] copy key end: {host}", host=host, action="copy-key", duration=time.monotonic() - started)
         except Exception as exc:
             self._status(f"Falha ao copiar chave para {host}")
-            self._log(f"[hosts] copy key error: {exc}")
+            self._log(f"[hosts] copy key error: {exc}", host=host, action="copy-key", level="error")
 
     def _host_at_cursor(self) -> str | None:
         if not self._visible_hosts:
             return None
 
         row_index = self.query_one("#hosts-table", DataTable).cursor_row
-        if row_index is None or row_index < 0 or row_index >= len(self._visible_hosts):
-            return self._visible_hosts[0]
-        return self._visible_hosts[row_index]
+        return self._rows.key_at(row_index) or self._visible_hosts[self._window_start]
 
     def _update_details(self, host: str | None) -> None:
         if not host:
@@ -144,11 +622,23 @@ class HostsView(Vertical):
         else:
             host_info = self.app.host_details.get(host, {})
             details = "\n".join(f"{key}: {value}" for key, value in host_info.items()) or "Nenhuma informação disponível."
+            host_key = self.app.host_keys.get(host)
+            if host_key is not None:
+                details += "\n" + self._host_key_details(host_key)
         self.query_one("#hosts-details", Static).update(details)
 
+    @staticmethod
+    def _host_key_details(host_key: HostKeyStatus) -> str:
+        if not host_key.keys:
+            return f"Host key ({host_key.name}): nenhuma em known_hosts"
+        lines = [f"Host key ({host_key.name}): {entry.describe()}" for entry in host_key.keys]
+        if host_key.status != KEY_KNOWN:
+            lines.append(f"Atenção: {host_key.status}" + (f" (chave diferente em {', '.join(host_key.mismatched)})" if host_key.mismatched else ""))
+        return "\n".join(lines)
+
     def _status(self, text: str) -> None:
         self.query_one("#hosts-status", Static).update(text)
 
-    def _log(self, message: str) -> None:
+    def _log(self, message: str, **fields) -> None:
         if hasattr(self.app, "append_log"):
-            self.app.append_log(message)
+            self.app.append_log(message, **fields)
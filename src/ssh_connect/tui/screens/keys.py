@@ -1,15 +1,27 @@
 from __future__ import annotations
 
+import time
+
 from textual.containers import Horizontal, Vertical
 from textual.widgets import Button, DataTable, Static
+from textual.worker import get_current_worker
+
+from src.ssh_connect.services.key_service import CERT_FOREVER, KeyInfo
+from src.ssh_connect.tui.loader import LOAD_KEYS
+from src.ssh_connect.tui.table_sync import TableSync
 
 
 class KeysView(Vertical):
+    def __init__(self) -> None:
+        super().__init__()
+        self._rows: TableSync | None = None
+
     def compose(self):
         yield Static("Keys", classes="title")
         yield Horizontal(
             Button("Refresh", id="keys-refresh", variant="primary"),
             Button("Use Selected Key", id="keys-select", variant="success"),
+            Button("Sign with Vault", id="keys-sign"),
             id="keys-actions",
         )
         table = DataTable(id="keys-table")
@@ -19,52 +31,114 @@ class KeysView(Vertical):
 
     def on_mount(self) -> None:
         table = self.query_one("#keys-table", DataTable)
-        table.add_columns("Path", "Selected")
+        self._rows = TableSync(table, table.add_columns("Path", "Type", "Bits", "Encrypted", "Comment", "Fingerprint", "Certificate", "Selected"))
         self.refresh_view()
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "keys-refresh":
             self.app.refresh_data()
-            self._status("Lista de chaves atualizada")
+            self._status("Recarregando lista de chaves...")
             self._log("[keys] refresh")
         elif event.button.id == "keys-select":
             self._select_current_key()
+        elif event.button.id == "keys-sign":
+            self._start_signing()
 
     def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
         if event.data_table.id == "keys-table":
             self._select_current_key()
 
     def refresh_view(self) -> None:
-        table = self.query_one("#keys-table", DataTable)
-        table.clear()
-        for key_path in self.app.keys:
-            selected = "yes" if key_path == self.app.selected_key else ""
-            table.add_row(key_path, selected)
-
-        if self.app.selected_key in self.app.keys:
-            index = self.app.keys.index(self.app.selected_key)
-        else:
-            index = 0 if self.app.keys else None
+        if self.app.selected_key not in self.app.keys:
             self.app.selected_key = self.app.keys[0] if self.app.keys else None
 
+        self._rows.sync([(key_path, self._row_cells(key_path)) for key_path in self.app.keys])
+
+        table = self.query_one("#keys-table", DataTable)
+        index = self._rows.index_of(self.app.selected_key)
         if index is not None:
             table.cursor_coordinate = (index, 0)
 
-        if self.app.selected_key:
+        loading = LOAD_KEYS in self.app.loading
+        table.loading = loading and not self.app.keys
+        if loading:
+            self._status("Carregando chaves...")
+        elif self.app.selected_key:
             self._status(f"Chave ativa: {self.app.selected_key}")
         else:
             self._status("Nenhuma chave encontrada")
 
+    def _row_cells(self, key_path: str) -> tuple[str, ...]:
+        info = self.app.key_info.get(key_path) or KeyInfo(key_path)
+        if info.encrypted is None:
+            encrypted = "?"
+        else:
+            encrypted = "yes" if info.encrypted else "no"
+        return (
+            key_path,
+            info.key_type or "-",
+            str(info.bits) if info.bits else "-",
+            encrypted,
+            info.comment or "",
+            info.fingerprint or "",
+            self._certificate_cell(key_path),
+            "yes" if key_path == self.app.selected_key else "",
+        )
+
+    def _certificate_cell(self, key_path: str) -> str:
+        certificates = self.app.certificates
+        if certificates is None:
+            return ""
+        try:
+            cert = certificates.cached(key_path)
+        except ValueError:
+            return ""
+        if cert is None:
+            return "-"
+        if cert.valid_before == CERT_FOREVER:
+            return "sem validade"
+        return f"até {time.strftime('%Y-%m-%d %H:%M', time.localtime(cert.valid_before))}"
+
+    def _start_signing(self) -> None:
+        key_path = self.app.selected_key
+        if self.app.certificates is None:
+            self._status("Vault não configurado (defina VAULT_ADDR e SSH_CONNECT_VAULT_ROLE)")
+            return
+        if not key_path:
+            self._status("Nenhuma chave selecionada")
+            return
+        self._status(f"Assinando {key_path} no Vault...")
+        self._log(f"[keys] sign start: {key_path}", action="cert")
+        self.run_worker(lambda: self._sign_key(key_path), name="sign-key", group="certs", exclusive=True, thread=True)
+
+    def _sign_key(self, key_path: str) -> None:
+        """Thread worker: sign ``key_path`` even when a valid certificate is cached, then show the result."""
+        started = time.monotonic()
+        try:
+            cert = self.app.certificates.sign(key_path).result()
+        except (OSError, ValueError) as exc:
+            if not get_current_worker().is_cancelled:
+                self.app.call_from_thread(self._signing_failed, key_path, exc)
+            return
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self._signed, key_path, cert, time.monotonic() - started)
+
+    def _signed(self, key_path: str, cert, duration: float) -> None:
+        self.refresh_view()
+        self._status(f"Certificado emitido para {key_path} ({self._certificate_cell(key_path)})")
+        self._log(f"[keys] sign end: {key_path} serial {cert.serial}", action="cert", duration=duration)
+
+    def _signing_failed(self, key_path: str, exc: Exception) -> None:
+        self._status(f"Falha ao assinar {key_path}: {exc}")
+        self._log(f"[keys] erro ao assinar {key_path}: {exc}", action="cert", level="error")
+
     def _select_current_key(self) -> None:
         if not self.app.keys:
             self._status("Nenhuma chave disponível")
             return
 
         row_index = self.query_one("#keys-table", DataTable).cursor_row
-        if row_index is None or row_index < 0 or row_index >= len(self.app.keys):
-            row_index = 0
-
-        self.app.selected_key = self.app.keys[row_index]
+        self.app.selected_key = self._rows.key_at(row_index) or self.app.keys[0]
         self.refresh_view()
         self._status(f"Chave ativa: {self.app.selected_key}")
         self._log(f"[keys] selected: {self.app.selected_key}")
@@ -72,6 +146,6 @@ class KeysView(Vertical):
     def _status(self, text: str) -> None:
         self.query_one("#keys-status", Static).update(text)
 
-    def _log(self, message: str) -> None:
+    def _log(self, message: str, **fields) -> None:
         if hasattr(self.app, "append_log"):
-            self.app.append_log(message)
+            self.app.append_log(message, **fields)
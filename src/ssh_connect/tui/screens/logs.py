@@ -1,14 +1,78 @@
 from __future__ import annotations
 
-from textual.containers import Vertical
-from textual.widgets import RichLog, Static
+import asyncio
+import os
+from datetime import datetime
+
+from textual.containers import Horizontal, Vertical
+from textual.widgets import Button, Input, RichLog, Static
+
+from src.ssh_connect.services.log_service import DEFAULT_CAPACITY, LogRecord, record_matches
+from src.ssh_connect.services.paths import ensure_private_dir, state_dir
+
+
+def parse_log_filter(text: str) -> dict[str, str]:
+    """``host:web* action:run texto`` -> keyword filters for ``record_matches``."""
+    filters: dict[str, str] = {}
+    words = []
+    for token in text.split():
+        key, sep, value = token.partition(":")
+        if sep and key in ("host", "action", "since", "until") and value:
+            filters[key] = value
+        else:
+            words.append(token)
+    if words:
+        filters["text"] = " ".join(words)
+    return filters
 
 
 class LogsView(Vertical):
+    def __init__(self) -> None:
+        super().__init__()
+        self._filters: dict[str, str] = {}
+
     def compose(self):
         yield Static("Logs", classes="title")
-        yield RichLog(id="logs-output", wrap=True, highlight=True)
+        yield Horizontal(
+            Input(placeholder="Filter logs (host:web* action:run text)", id="logs-filter"),
+            Button("Export JSON", id="logs-export-json"),
+            Button("Export CSV", id="logs-export-csv"),
+            id="logs-actions",
+        )
+        yield RichLog(id="logs-output", wrap=True, highlight=True, max_lines=DEFAULT_CAPACITY)
+        yield Static("", id="logs-status", classes="status")
 
-    def append(self, message: str) -> None:
+    def append(self, entry: LogRecord) -> None:
+        if not self._filters or self._matches(entry):
+            self.query_one("#logs-output", RichLog).write(entry.format())
+
+    def _matches(self, entry: LogRecord) -> bool:
+        try:
+            return record_matches(entry, **self._filters)
+        except ValueError:
+            return True
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        if event.input.id != "logs-filter":
+            return
+        self._filters = parse_log_filter(event.value)
         log = self.query_one("#logs-output", RichLog)
-        log.write(message)
+        log.clear()
+        for entry in self.app.activity_log.buffer:
+            if self._matches(entry):
+                log.write(entry.format())
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id in ("logs-export-json", "logs-export-csv"):
+            fmt = "json" if event.button.id == "logs-export-json" else "csv"
+            self.run_worker(self._export(fmt), exclusive=True, group="logs-export", thread=False)
+
+    async def _export(self, fmt: str) -> None:
+        export_dir = ensure_private_dir(os.path.join(ensure_private_dir(state_dir()), "exports"))
+        target = os.path.join(export_dir, f"activity-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}")
+        try:
+            count = await asyncio.to_thread(self.app.activity_log.export, target, fmt, **self._filters)
+        except (OSError, ValueError) as exc:
+            self.query_one("#logs-status", Static).update(f"Falha ao exportar: {exc}")
+            return
+        self.query_one("#logs-status", Static).update(f"{count} registros exportados para {target}")
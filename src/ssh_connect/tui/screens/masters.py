@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from textual.containers import Horizontal, Vertical
+from textual.widgets import Button, DataTable, Static
+
+from src.ssh_connect.services.control_master import MasterInfo
+from src.ssh_connect.tui.table_sync import TableSync
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = max(0, int(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+
+
+class MastersView(Vertical):
+    def __init__(self) -> None:
+        super().__init__()
+        self._rows: TableSync | None = None
+        self._masters: dict[str, MasterInfo] = {}
+        self._checked: set[str] = set()
+
+    def compose(self):
+        yield Static("Masters", classes="title")
+        yield Horizontal(
+            Button("Check", id="masters-check", variant="primary"),
+            Button("Close Selected", id="masters-close"),
+            Button("Close All", id="masters-close-all", variant="error"),
+            id="masters-actions",
+        )
+        table = DataTable(id="masters-table")
+        table.cursor_type = "row"
+        yield table
+        yield Static("", id="masters-status", classes="status")
+
+    def on_mount(self) -> None:
+        table = self.query_one("#masters-table", DataTable)
+        self._rows = TableSync(table, table.add_columns("Host", "Config", "Socket", "Age", "Idle", "Status"), key_column=2)
+        self.refresh_view()
+
+    def on_show(self) -> None:
+        self.refresh_view()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        button_id = event.button.id
+        if button_id == "masters-check":
+            self.run_worker(self._check_masters(), exclusive=True, group="masters")
+        elif button_id == "masters-close":
+            self.run_worker(self._close_selected(), exclusive=True, group="masters")
+        elif button_id == "masters-close-all":
+            self.run_worker(self._close_all(), exclusive=True, group="masters")
+
+    def refresh_view(self) -> None:
+        """List the registered masters from disk (no ``ssh -O`` calls)."""
+        masters = self.app.master_pool.masters()
+        self._masters = {master.socket_path: master for master in masters}
+        now = time.time()
+        rows = []
+        for master in masters:
+            status = "alive" if master.socket_path in self._checked else "?"
+            rows.append(
+                (
+                    master.socket_path,
+                    (
+                        master.host,
+                        master.config_path,
+                        master.socket_path,
+                        _format_duration(now - master.created),
+                        _format_duration(now - master.last_used),
+                        status,
+                    ),
+                )
+            )
+        self._rows.sync(rows)
+        self._status(f"{len(masters)} masters abertos" if masters else "Nenhum master aberto")
+
+    async def _check_masters(self) -> None:
+        pool = self.app.master_pool
+        removed = await asyncio.to_thread(pool.prune)
+        self._checked = {master.socket_path for master in pool.masters()}
+        self.refresh_view()
+        self._log(f"[masters] check: {len(self._checked)} ativos, {len(removed)} removidos", action="master")
+
+    async def _close_selected(self) -> None:
+        socket_path = self._rows.key_at(self.query_one("#masters-table", DataTable).cursor_row)
+        master = self._masters.get(socket_path)
+        if master is None:
+            self._status("Selecione um master")
+            return
+
+        await asyncio.to_thread(self.app.master_pool.close, master)
+        self.refresh_view()
+        self._log(f"[masters] close: {master.host}", host=master.host, action="master")
+
+    async def _close_all(self) -> None:
+        closed = await asyncio.to_thread(self.app.master_pool.close_all)
+        self.refresh_view()
+        self._log(f"[masters] close all: {closed}", action="master")
+
+    def _status(self, text: str) -> None:
+        self.query_one("#masters-status", Static).update(text)
+
+    def _log(self, message: str, **fields) -> None:
+        if hasattr(self.app, "append_log"):
+            self.app.append_log(message, **fields)
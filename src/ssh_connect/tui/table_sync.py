@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from textual.coordinate import Coordinate
+from textual.widgets import DataTable
+from textual.widgets.data_table import ColumnKey
+
+
+class TableSync:
+    """Keep a DataTable in step with a keyed row list by applying only the differences.
+
+    Rows are identified by a stable string key (the host alias, the key path),
+    which is also the value of the ``key_column``-th column; reordering sorts
+    on that column by the rank of each key. ``sync`` removes rows that
+    disappeared, updates changed cells, appends new rows and re-sorts only when
+    the order changed. When most rows change it is cheaper to rebuild, since
+    ``DataTable.remove_row`` is linear in the row count.
+    """
+
+    REBUILD_RATIO = 0.5
+    REBUILD_MIN_REMOVED = 32
+
+    def __init__(self, table: DataTable, column_keys: list[ColumnKey], key_column: int = 0) -> None:
+        self.table = table
+        self.column_keys = column_keys
+        self.key_column = column_keys[key_column]
+        self._cells: dict[str, tuple[str, ...]] = {}
+        self._order: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    @property
+    def keys(self) -> list[str]:
+        return list(self._order)
+
+    def key_at(self, row_index: int | None) -> str | None:
+        """Return the row key displayed at ``row_index`` (None when out of range)."""
+        if row_index is None or not 0 <= row_index < self.table.row_count:
+            return None
+        return self.table.coordinate_to_cell_key(Coordinate(row_index, 0)).row_key.value
+
+    def index_of(self, key: str | None) -> int | None:
+        if key is None or key not in self._cells:
+            return None
+        return self.table.get_row_index(key)
+
+    def update(self, key: str, cells: tuple[str, ...]) -> bool:
+        """Update the changed cells of an existing row; returns False when ``key`` is not displayed."""
+        previous = self._cells.get(key)
+        if previous is None:
+            return False
+        for column_key, old_value, new_value in zip(self.column_keys, previous, cells):
+            if old_value != new_value:
+                self.table.update_cell(key, column_key, new_value)
+        self._cells[key] = cells
+        return True
+
+    def rebuild(self, rows: list[tuple[str, tuple[str, ...]]]) -> None:
+        self.table.clear()
+        for key, cells in rows:
+            self.table.add_row(*cells, key=key)
+        self._cells = dict(rows)
+        self._order = [key for key, _ in rows]
+
+    def sync(self, rows: list[tuple[str, tuple[str, ...]]]) -> None:
+        desired = dict(rows)
+        removed = [key for key in self._order if key not in desired]
+        if len(removed) > max(self.REBUILD_MIN_REMOVED, len(self._order) * self.REBUILD_RATIO):
+            self.rebuild(rows)
+            return
+
+        table = self.table
+        for key in removed:
+            table.remove_row(key)
+            del self._cells[key]
+
+        added: list[str] = []
+        for key, cells in rows:
+            previous = self._cells.get(key)
+            if previous is None:
+                table.add_row(*cells, key=key)
+                added.append(key)
+                self._cells[key] = cells
+            elif previous != cells:
+                self.update(key, cells)
+
+        current_order = [key for key in self._order if key in desired] + added
+        self._order = [key for key, _ in rows]
+        if current_order != self._order:
+            rank = {key: position for position, key in enumerate(self._order)}
+            table.sort(self.key_column, key=rank.__getitem__)
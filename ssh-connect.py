@@ -3,18 +3,32 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import os
 import sys
+import time
 
-from src.ssh_connect.legacy.curses_ui import run as run_curses_ui
-from src.ssh_connect.services.config_service import parse_ssh_hosts
+# Only the service layer is imported up front: direct connect and --list are
+# called from scripts, so Textual and curses are loaded when a UI is launched.
+from src.ssh_connect.services.config_cache import load_cached_hosts
+from src.ssh_connect.services.control_master import default_pool
 from src.ssh_connect.services.ssh_service import connect_ssh
-from src.ssh_connect.tui.app import main as run_textual_ui
+from src.ssh_connect.services.timing_service import Timings, enable_timings, format_summary
 from utils import verificar_ou_criar_ssh_config
 
+SUGGESTION_LIMIT = 10
+
 
 def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(description="Gerenciador de conexões SSH")
+    parser = argparse.ArgumentParser(
+        description="Gerenciador de conexões SSH",
+        epilog=(
+            "Subcomandos para vários hosts: ssh-connect.py run -H 'web-*' -- uptime; "
+            "ssh-connect.py deploy-key -H 'web-*' -i ~/.ssh/id_ed25519; "
+            "ssh-connect.py logs --action run -o atividade.csv; "
+            "ssh-connect.py config add web-9 -o HostName=10.0.0.9 (veja <subcomando> --help)"
+        ),
+    )
     parser.add_argument("-f", "--file", help="Especifica um arquivo de configuração SSH", metavar="CONFIG")
     parser.add_argument("-k", "--keys-dir", help="Especifica um diretório alternativo para as chaves SSH", metavar="KEYS_DIR")
     parser.add_argument(
@@ -23,6 +37,39 @@ def build_parser() -> argparse.ArgumentParser:
         default="textual",
         help="Seleciona a interface interativa (padrão: textual; use curses para a interface legada)",
     )
+    parser.add_argument("-l", "--list", action="store_true", help="Lista os hosts do arquivo de configuração e sai")
+    parser.add_argument(
+        "--probe",
+        action="store_true",
+        help="Testa a conexão TCP (e lê o banner SSH) de todos os hosts, ou só do host informado, e sai",
+    )
+    parser.add_argument("--probe-timeout", type=float, default=3.0, metavar="SEG", help="Timeout de cada sondagem (padrão: 3)")
+    parser.add_argument(
+        "--probe-concurrency", type=int, default=64, metavar="N", help="Sondagens simultâneas (padrão: 64)"
+    )
+    parser.add_argument(
+        "--close-masters",
+        action="store_true",
+        help="Encerra as conexões ControlMaster mantidas pelo ssh-connect e sai",
+    )
+    parser.add_argument(
+        "--completion",
+        choices=["bash", "zsh", "fish"],
+        metavar="SHELL",
+        help="Imprime o script de completação para bash, zsh ou fish e sai",
+    )
+    parser.add_argument(
+        "--timings",
+        "--profile",
+        action="store_true",
+        help="Mede cada etapa (parse do config, varredura de chaves, config temporário, ssh, telas) e mostra um resumo ao sair",
+    )
+    parser.add_argument("--timings-output", metavar="ARQUIVO", help="Exporta as medições para ARQUIVO (implica --timings)")
+    parser.add_argument(
+        "--timings-format",
+        choices=["json", "chrome"],
+        help="Formato da exportação (padrão: chrome para *.trace.json, senão json)",
+    )
     parser.add_argument("host", nargs="?", help="Nome do host para conexão direta")
     return parser
 
@@ -35,42 +82,439 @@ def resolve_keys_dir(explicit_path: str | None, config_path: str) -> str:
     return explicit_path if explicit_path else os.path.dirname(config_path)
 
 
-def run_cli(argv: list[str] | None = None) -> int:
-    args = build_parser().parse_args(argv)
-
-    config_path = resolve_config_path(args.file)
-    keys_dir = resolve_keys_dir(args.keys_dir, config_path)
+def load_inventory(explicit_config: str | None, explicit_keys_dir: str | None) -> tuple[str, str, list[str]] | None:
+    """Resolve and validate the config and keys paths and load the host list; prints the error and returns None on failure."""
+    config_path = resolve_config_path(explicit_config)
+    keys_dir = resolve_keys_dir(explicit_keys_dir, config_path)
 
     verificar_ou_criar_ssh_config(config_path)
 
     if not os.path.exists(config_path):
         print(f"Erro: O arquivo de configuração '{config_path}' não existe.")
-        return 1
+        return None
 
     if not os.path.exists(keys_dir):
         print(f"Erro: O diretório de chaves '{keys_dir}' não existe.")
-        return 1
+        return None
 
-    hosts, _ = parse_ssh_hosts(config_path)
+    hosts = load_cached_hosts(config_path)
     if not hosts:
         print("Nenhum host encontrado.")
+        return None
+    return config_path, keys_dir, hosts
+
+
+def add_fleet_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options shared by the subcommands that act on many hosts at once."""
+    parser.add_argument("-f", "--file", help="Especifica um arquivo de configuração SSH", metavar="CONFIG")
+    parser.add_argument("-k", "--keys-dir", help="Especifica um diretório alternativo para as chaves SSH", metavar="KEYS_DIR")
+    parser.add_argument(
+        "-H",
+        "--hosts",
+        action="append",
+        required=True,
+        metavar="PADRÃO",
+        help="Hosts alvo (glob, ex.: 'web-*'; pode repetir ou separar por vírgulas)",
+    )
+    parser.add_argument("-p", "--parallel", type=int, default=32, metavar="N", help="Hosts simultâneos (padrão: 32)")
+
+
+def build_run_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ssh-connect.py run",
+        description="Executa um comando em vários hosts em paralelo",
+    )
+    add_fleet_arguments(parser)
+    parser.add_argument("-t", "--timeout", type=float, default=None, metavar="SEG", help="Timeout por host")
+    parser.add_argument("--fail-fast", action="store_true", help="Interrompe todos os hosts na primeira falha")
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="Comando remoto")
+    return parser
+
+
+def build_deploy_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ssh-connect.py deploy-key",
+        description="Adiciona uma chave pública ao authorized_keys de vários hosts (sem duplicar)",
+    )
+    add_fleet_arguments(parser)
+    parser.add_argument("-i", "--identity", required=True, metavar="CHAVE", help="Chave privada cuja .pub será distribuída")
+    parser.add_argument("-t", "--timeout", type=float, default=30.0, metavar="SEG", help="Timeout por tentativa (padrão: 30)")
+    parser.add_argument("--attempts", type=int, default=3, metavar="N", help="Tentativas por host em erros de conexão (padrão: 3)")
+    return parser
+
+
+def build_logs_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ssh-connect.py logs",
+        description="Mostra ou exporta o registro de atividades (conexões, comandos, chaves)",
+    )
+    parser.add_argument("--host", metavar="PADRAO", help="Filtra por host (aceita curingas)")
+    parser.add_argument("--action", metavar="ACAO", help="Filtra por ação (connect, run, deploy, probe, copy-key...)")
+    parser.add_argument("--since", metavar="DATA", help="Só registros a partir de DATA (ISO 8601)")
+    parser.add_argument("--until", metavar="DATA", help="Só registros até DATA (ISO 8601)")
+    parser.add_argument("--format", choices=["json", "csv"], help="Formato da exportação (padrão: extensão de --output)")
+    parser.add_argument("-o", "--output", metavar="ARQUIVO", help="Exporta para ARQUIVO em vez de imprimir")
+    return parser
+
+
+def build_config_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ssh-connect.py config",
+        description="Adiciona, renomeia, altera ou remove hosts do arquivo de configuração, reescrevendo só o bloco afetado",
+    )
+    parser.add_argument("-f", "--file", help="Especifica um arquivo de configuração SSH", metavar="CONFIG")
+    parser.add_argument(
+        "-o",
+        "--option",
+        action="append",
+        default=[],
+        metavar="CHAVE=VALOR",
+        help="Opção do bloco (ex.: -o HostName=10.0.0.9; CHAVE= remove a opção); pode repetir",
+    )
+    parser.add_argument("-c", "--comment", metavar="TEXTO", help="Comentário ## acima do bloco (vazio remove)")
+    parser.add_argument(
+        "action",
+        choices=["add", "set", "rename", "rm"],
+        help="add HOST [ALIAS...] | set HOST... | rename HOST NOVO | rm HOST...",
+    )
+    parser.add_argument("names", nargs="+", metavar="HOST", help="Hosts afetados")
+    return parser
+
+
+def parse_option_assignments(items: list[str]) -> dict[str, str | None]:
+    """``["HostName=10.0.0.9", "Port="]`` -> ``{"HostName": "10.0.0.9", "Port": None}``."""
+    options: dict[str, str | None] = {}
+    for item in items:
+        key, separator, value = item.partition("=")
+        if not separator or not key.strip():
+            raise ValueError(f"Use CHAVE=VALOR em -o: {item!r}")
+        options[key.strip()] = value.strip() or None
+    return options
+
+
+@contextlib.contextmanager
+def activity_log():
+    """The persisted activity log (the one the TUI and ``logs`` use), written out when the action ends."""
+    from src.ssh_connect.services.log_service import ActivityLog
+
+    log = ActivityLog()
+    try:
+        yield log
+    finally:
+        log.close()
+
+
+def run_config(argv: list[str]) -> int:
+    """``config`` subcommand: queue the edits for every named host and write them in one pass."""
+    from src.ssh_connect.services.config_editor import ConfigEditor
+
+    args = build_config_parser().parse_args(argv)
+    config_path = resolve_config_path(args.file)
+    verificar_ou_criar_ssh_config(config_path)
+    extra = {"comment": args.comment} if args.comment is not None else {}
+    try:
+        options = parse_option_assignments(args.option)
+        editor = ConfigEditor(config_path)
+        if args.action == "add":
+            editor.add_host(args.names, options, args.comment)
+        elif args.action == "rename":
+            if len(args.names) != 2:
+                raise ValueError("rename espera HOST NOVO")
+            editor.rename_host(*args.names)
+            if options or extra:
+                editor.set_options(args.names[1], options, **extra)
+        elif args.action == "set":
+            if not options and not extra:
+                raise ValueError("informe ao menos uma opção (-o) ou um comentário (-c)")
+            for name in args.names:
+                editor.set_options(name, options, **extra)
+        else:
+            for name in args.names:
+                editor.delete_host(name)
+        written = editor.commit()
+    except (OSError, ValueError) as exc:
+        print(f"Erro: {exc}")
+        with activity_log() as log:
+            log.record(f"[cli] config edit error: {exc}", action="config-edit", level="error")
         return 1
 
-    if args.host:
-        if args.host not in hosts:
+    if written:
+        with activity_log() as log:
+            log.record(f"[cli] config edit: {args.action} {' '.join(args.names)}", action="config-edit")
+    print(f"Arquivo atualizado: {', '.join(written)}" if written else "Nada a alterar.")
+    return 0
+
+
+def run_logs(argv: list[str]) -> int:
+    """``logs`` subcommand: print the persisted activity records, or export them with ``-o``."""
+    from src.ssh_connect.services.log_service import ActivityLog
+
+    args = build_logs_parser().parse_args(argv)
+    filters = {key: getattr(args, key) for key in ("host", "action", "since", "until") if getattr(args, key)}
+    log = ActivityLog()
+    try:
+        if args.output:
+            count = log.export(args.output, args.format, **filters)
+            print(f"{count} registros exportados para {args.output}")
+        else:
+            for entry in log.read_records(**filters):
+                print(entry.format())
+    except (OSError, ValueError) as exc:
+        print(f"Erro: {exc}")
+        return 1
+    return 0
+
+
+def run_fanout(argv: list[str]) -> int:
+    """``run`` subcommand: stream ``host | line`` output as it arrives, then an exit-code summary."""
+    import asyncio
+
+    from src.ssh_connect.services.fanout_service import STREAM_STDERR, FanoutRunner, exit_code, select_hosts, summarize
+
+    args = build_run_parser().parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        print("Erro: informe o comando a executar.")
+        return 2
+
+    inventory = load_inventory(args.file, args.keys_dir)
+    if inventory is None:
+        return 1
+    config_path, keys_dir, hosts = inventory
+
+    targets = select_hosts(hosts, args.hosts)
+    if not targets:
+        print(f"Erro: nenhum host corresponde a {', '.join(args.hosts)}")
+        return 1
+
+    width = max(len(host) for host in targets)
+
+    def show(host: str, stream: str, line: str) -> None:
+        print(f"{host:<{width}} | {line}", file=sys.stderr if stream == STREAM_STDERR else sys.stdout, flush=True)
+
+    runner = FanoutRunner(config_path, keys_dir, parallelism=args.parallel, timeout=args.timeout, fail_fast=args.fail_fast)
+    with activity_log() as log:
+        log.record(f"[run] start: {' '.join(command)!r} em {len(targets)} hosts", action="run")
+
+        def record(result) -> None:
+            detail = f": {result.error}" if result.error else ""
+            log.record(
+                f"[run] {result.host}: {result.status}{detail}",
+                host=result.host,
+                action="run",
+                duration=result.duration,
+                exit_code=result.returncode,
+            )
+
+        results = asyncio.run(runner.run(targets, " ".join(command), show, record))
+
+        succeeded = sum(1 for result in results if result.ok)
+        print(f"\nResumo: {len(results)} hosts, {succeeded} ok, {len(results) - succeeded} com falha")
+        for label, group in summarize(results):
+            print(f"  {label}: {len(group)} ({', '.join(group)})")
+            log.record(f"[run] {label}: {len(group)} ({', '.join(group)})", action="run")
+    return exit_code(results)
+
+
+def run_deploy(argv: list[str]) -> int:
+    """``deploy-key`` subcommand: one progress line per host, then a report; exit 1 when any host failed."""
+    import asyncio
+
+    from src.ssh_connect.services.fanout_service import select_hosts
+    from src.ssh_connect.services.key_deploy_service import KeyDeployer, deploy_report
+
+    args = build_deploy_parser().parse_args(argv)
+    inventory = load_inventory(args.file, args.keys_dir)
+    if inventory is None:
+        return 1
+    config_path, keys_dir, hosts = inventory
+
+    targets = select_hosts(hosts, args.hosts)
+    if not targets:
+        print(f"Erro: nenhum host corresponde a {', '.join(args.hosts)}")
+        return 1
+
+    done = 0
+    with activity_log() as log:
+        log.record(f"[deploy] start: {args.identity} -> {len(targets)} hosts", action="deploy")
+
+        def show_result(result) -> None:
+            nonlocal done
+            done += 1
+            detail = f" ({result.error})" if result.error else ""
+            print(f"[{done}/{len(targets)}] {result.host}: {result.status}{detail}", flush=True)
+            log.record(f"[deploy] {result.host}: {result.status} (tentativas: {result.attempts}){detail}", host=result.host, action="deploy")
+
+        def show_retry(host: str, attempt: int, delay: float, error: str) -> None:
+            message = f"{host}: tentativa {attempt} falhou ({error}), nova tentativa em {delay:.1f}s"
+            print(message, file=sys.stderr, flush=True)
+            log.record(f"[deploy] {message}", host=host, action="deploy", level="warning")
+
+        deployer = KeyDeployer(config_path, keys_dir, parallelism=args.parallel, timeout=args.timeout, attempts=args.attempts)
+        try:
+            results = asyncio.run(deployer.deploy(targets, args.identity, show_result, show_retry))
+        except (OSError, ValueError) as exc:
+            print(f"Erro: não foi possível ler a chave pública: {exc}")
+            log.record(f"[deploy] error: {exc}", action="deploy", level="error")
+            return 1
+
+    report = deploy_report(results)
+    print(f"\nResumo: {len(report['added'])} adicionadas, {len(report['present'])} já presentes, {len(report['failed'])} com falha")
+    if report["failed"]:
+        print(f"  falha: {', '.join(report['failed'])}")
+    return 1 if report["failed"] else 0
+
+
+def suggest_hosts(hosts: list[str], query: str) -> list[str]:
+    """Fuzzy matches for a direct-connect name that is not an exact alias, best and most used first."""
+    from src.ssh_connect.services.history_service import load_scores
+    from src.ssh_connect.services.search_service import HostSearchIndex
+
+    return HostSearchIndex(hosts, {}, load_scores()).search(query)
+
+
+def completion_options() -> list:
+    """Every option of the main command and the subcommands, described for the completion scripts."""
+    from src.ssh_connect.services.completion_scripts import VALUE_ANY, VALUE_FILE, VALUE_HOST, CompletionOption
+
+    file_options = {"--file", "--keys-dir", "--identity", "--output", "--timings-output"}
+    parsers = {
+        "": build_parser(),
+        "run": build_run_parser(),
+        "deploy-key": build_deploy_parser(),
+        "logs": build_logs_parser(),
+        "config": build_config_parser(),
+    }
+    options = []
+    for command, parser in parsers.items():
+        for action in parser._actions:
+            if not action.option_strings:
+                continue
+            if action.nargs == 0:
+                value = None
+            elif file_options.intersection(action.option_strings):
+                value = VALUE_FILE
+            elif {"--hosts", "--host"}.intersection(action.option_strings):
+                value = VALUE_HOST
+            else:
+                value = VALUE_ANY
+            choices = tuple(action.choices) if action.choices else ()
+            options.append(CompletionOption(command, tuple(action.option_strings), value, choices, action.help or ""))
+    return options
+
+
+def run_probe(config_path: str, hosts: list[str], timeout: float, concurrency: int) -> int:
+    """Print one tab-separated line per host as each probe finishes; exit 1 when any host is down."""
+    from src.ssh_connect.services.config_cache import load_cached_config_index
+    from src.ssh_connect.services.probe_service import STATUS_DOWN, probe_hosts
+
+    def report(result) -> None:
+        rtt = f"{result.rtt_ms:.1f}ms" if result.rtt_ms is not None else "-"
+        detail = result.server_version or result.error or "-"
+        print(f"{result.host}\t{result.status}\t{result.address}:{result.port}\t{rtt}\t{detail}", flush=True)
+
+    index = load_cached_config_index(config_path)
+    results = probe_hosts(index, hosts, concurrency=concurrency, timeout=timeout, on_result=report)
+    return 1 if any(result.status == STATUS_DOWN for result in results) else 0
+
+
+def report_timings(timings: Timings, output: str | None, fmt: str | None) -> None:
+    """Print the per-stage summary on stderr and export the spans when ``output`` is given."""
+    print(format_summary(timings.summary()), file=sys.stderr)
+    if not output:
+        return
+    fmt = fmt or ("chrome" if output.endswith(".trace.json") else "json")
+    try:
+        count = timings.export(output, fmt)
+    except OSError as exc:
+        print(f"Erro ao exportar as medições: {exc}", file=sys.stderr)
+        return
+    print(f"{count} medições exportadas para {output} ({fmt})", file=sys.stderr)
+
+
+def run_cli(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["run"]:
+        return run_fanout(argv[1:])
+    if argv[:1] == ["deploy-key"]:
+        return run_deploy(argv[1:])
+    if argv[:1] == ["logs"]:
+        return run_logs(argv[1:])
+    if argv[:1] == ["config"]:
+        return run_config(argv[1:])
+
+    args = build_parser().parse_args(argv)
+    if not (args.timings or args.timings_output):
+        return run_main(args)
+
+    timings = enable_timings()
+    try:
+        return run_main(args)
+    finally:
+        report_timings(timings, args.timings_output, args.timings_format)
+
+
+def run_main(args: argparse.Namespace) -> int:
+    if args.completion:
+        from src.ssh_connect.services.completion_scripts import completion_script
+
+        sys.stdout.write(completion_script(args.completion, completion_options()))
+        return 0
+
+    if args.close_masters:
+        closed = default_pool().close_all()
+        print(f"{closed} conexões ControlMaster encerradas.")
+        return 0
+
+    inventory = load_inventory(args.file, args.keys_dir)
+    if inventory is None:
+        return 1
+    config_path, keys_dir, hosts = inventory
+
+    if args.list:
+        print("\n".join(hosts))
+        return 0
+
+    if args.probe:
+        if args.host and args.host not in hosts:
             print(f"Erro: O host '{args.host}' não está no arquivo {config_path}")
             return 1
+        return run_probe(config_path, [args.host] if args.host else hosts, args.probe_timeout, args.probe_concurrency)
+
+    if args.host:
+        host = args.host
+        if host not in hosts:
+            # Never connect to a fuzzy match: a typo must not open a session on another host.
+            matches = suggest_hosts(hosts, host)
+            print(f"Erro: O host '{host}' não está no arquivo {config_path}")
+            if matches:
+                print("Hosts parecidos (mais usados primeiro): " + ", ".join(matches[:SUGGESTION_LIMIT]))
+            return 1
 
-        connect_ssh(args.host, config_path, keys_dir)
+        with activity_log() as log:
+            log.record(f"[cli] connect start: {host}", host=host, action="connect")
+            started = time.monotonic()
+            returncode = connect_ssh(host, config_path, keys_dir)
+            log.record(
+                f"[cli] connect end: {host}",
+                host=host,
+                action="connect",
+                duration=time.monotonic() - started,
+                exit_code=returncode,
+            )
         return 0
 
     if args.ui == "textual":
         try:
+            from src.ssh_connect.tui.app import main as run_textual_ui
+
             run_textual_ui(config_path=config_path, keys_dir=keys_dir)
             return 0
         except Exception as exc:
             print(f"Textual indisponível ({exc}). Voltando para a interface curses.")
 
+    from src.ssh_connect.legacy.curses_ui import run as run_curses_ui
+
     run_curses_ui(config_path=config_path, keys_dir=keys_dir)
     return 0
 
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.suite import compare
+from benchmarks.synthetic import write_fleet
+from src.ssh_connect.services import key_service
+from src.ssh_connect.services.config_index import ConfigIndex
+from src.ssh_connect.services.key_service import scan_private_keys
+
+
+class SyntheticFleetTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        key_service._SCAN_CACHE.clear()
+
+    def test_fleet_is_parsed_as_described(self) -> None:
+        fleet = write_fleet(self.temp_dir, 200, key_count=6, fragment_count=3)
+
+        index = ConfigIndex.from_file(fleet.config_path)
+
+        self.assertEqual(len(index.hosts), fleet.alias_count)
+        self.assertEqual([host for host in index.hosts if host.startswith("host-") and "." not in host], fleet.primary_aliases)
+        self.assertEqual(set(index.sources), {fleet.config_path, *fleet.fragments})
+        self.assertEqual(index.details("host-000003.lab")["HostName"], "10.0.0.3")
+        self.assertEqual(index.blocks_for("*.prod")[0].options, [("StrictHostKeyChecking", "accept-new")])
+        self.assertEqual([info.path for info in scan_private_keys(fleet.keys_dir)], sorted(fleet.keys))
+
+
+class BaselineCompareTests(unittest.TestCase):
+    def test_only_slower_timings_beyond_tolerance_are_regressions(self) -> None:
+        baseline = {"1000": {"hosts": 1000, "parse_ms": 10.0, "filter_ms": 0.2, "lookup_ms": 4.0}}
+        results = {
+            "1000": {"hosts": 2000, "parse_ms": 16.0, "filter_ms": 0.9, "lookup_ms": 5.0, "new_ms": 3.0},
+            "10000": {"parse_ms": 100.0},
+        }
+
+        regressions = compare(results, baseline, tolerance=0.5, min_delta_ms=1.0)
+
+        self.assertEqual(regressions, ["1000 hosts: parse_ms 10.0 -> 16.0 ms (+60%)"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINT = os.path.join(REPO_ROOT, "ssh-connect.py")
+
+# Modules that only an interactive UI may pull in.
+UI_MODULES = ("textual", "rich", "curses", "_curses", "src.ssh_connect.tui", "src.ssh_connect.legacy")
+# Generous wall-clock budget (microseconds) for all imports of a non-interactive run.
+IMPORT_BUDGET_US = 400_000
+
+
+class StartupImportTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.config_path = os.path.join(self.temp_dir, "config")
+        with open(self.config_path, "w", encoding="utf-8") as handle:
+            handle.write("Host web\n  HostName 127.0.0.1\n")
+
+        bin_dir = os.path.join(self.temp_dir, "bin")
+        os.makedirs(bin_dir)
+        fake_ssh = os.path.join(bin_dir, "ssh")
+        with open(fake_ssh, "w", encoding="utf-8") as handle:
+            handle.write("#!/bin/sh\necho \"fake-ssh $*\"\n")
+        os.chmod(fake_ssh, 0o755)
+
+        self.env = dict(
+            os.environ,
+            PATH=bin_dir + os.pathsep + os.environ.get("PATH", ""),
+            SSH_CONNECT_CACHE_DIR=os.path.join(self.temp_dir, "cache"),
+            SSH_CONNECT_STATE_DIR=os.path.join(self.temp_dir, "state"),
+        )
+
+    def _run(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, "-X", "importtime", ENTRY_POINT, "-f", self.config_path, *args],
+            cwd=self.temp_dir,
+            env=self.env,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+
+    def _assert_service_only_imports(self, result: subprocess.CompletedProcess) -> None:
+        imported = {
+            line.split("|")[-1].strip()
+            for line in result.stderr.splitlines()
+            if line.startswith("import time:")
+        }
+        leaked = sorted(name for name in imported if name.split(".")[0] in UI_MODULES or name.startswith(UI_MODULES))
+        self.assertEqual(leaked, [])
+
+        top_level_us = sum(
+            int(line.split("|")[1])
+            for line in result.stderr.splitlines()
+            if line.startswith("import time:") and "cumulative" not in line and not line.split("|")[2].startswith("  ")
+        )
+        self.assertLess(top_level_us, IMPORT_BUDGET_US)
+
+    def test_list_imports_only_the_service_layer(self) -> None:
+        self._run("--list")  # warm the bytecode and config caches
+        result = self._run("--list")
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.split(), ["web"])
+        self._assert_service_only_imports(result)
+
+    def test_direct_connect_imports_only_the_service_layer(self) -> None:
+        self._run("--list")
+        result = self._run("web")
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("fake-ssh -F", result.stdout)
+        self._assert_service_only_imports(result)
+
+    def test_timings_summarize_and_export_a_chrome_trace(self) -> None:
+        trace_path = os.path.join(self.temp_dir, "session.trace.json")
+
+        result = self._run("--timings-output", trace_path, "web")
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertRegex(result.stderr, r"config\.parse\s+\d+")
+        self.assertRegex(result.stderr, r"subprocess\s+1\s")
+        with open(trace_path, encoding="utf-8") as handle:
+            events = json.load(handle)["traceEvents"]
+        ssh_event = next(event for event in events if event.get("cat") == "subprocess")
+        self.assertEqual((ssh_event["name"], ssh_event["ph"], ssh_event["args"]["host"]), ("ssh", "X", "web"))
+        self.assertEqual(ssh_event["args"]["exit_code"], 0)
+
+    def test_direct_connect_lists_fuzzy_matches_most_used_first_without_connecting(self) -> None:
+        with open(self.config_path, "a", encoding="utf-8") as handle:
+            handle.write("Host web-2\n  HostName 127.0.0.2\nHost db\n  HostName 127.0.0.3\n")
+        self._run("web-2")
+        self._run("web-2")
+
+        ambiguous = self._run("wb")
+        unique = self._run("d")
+
+        self.assertEqual(ambiguous.returncode, 1)
+        self.assertIn("Hosts parecidos (mais usados primeiro): web-2, web", ambiguous.stdout)
+        self.assertEqual(unique.returncode, 1)
+        self.assertIn("Hosts parecidos (mais usados primeiro): db", unique.stdout)
+        self.assertNotIn("fake-ssh", unique.stdout)
+
+    def test_probe_reports_each_host(self) -> None:
+        listener = socket.create_server(("127.0.0.1", 0))
+        self.addCleanup(listener.close)
+        port = listener.getsockname()[1]
+
+        def serve() -> None:
+            connection, _ = listener.accept()
+            with connection:
+                connection.sendall(b"SSH-2.0-FakeServer\r\n")
+                connection.recv(1)
+
+        threading.Thread(target=serve, daemon=True).start()
+        with open(self.config_path, "w", encoding="utf-8") as handle:
+            handle.write(f"Host web\n  HostName 127.0.0.1\n  Port {port}\n")
+
+        result = self._run("--probe", "--probe-timeout", "5")
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        host, status, address, _, version = result.stdout.strip().split("\t")
+        self.assertEqual((host, status, address, version), ("web", "up", f"127.0.0.1:{port}", "SSH-2.0-FakeServer"))
+
+    def test_run_subcommand_prefixes_output_and_summarizes(self) -> None:
+        with open(self.config_path, "a", encoding="utf-8") as handle:
+            handle.write("Host db\n  HostName 127.0.0.2\n")
+
+        result = self._run_subcommand("run", "-H", "w*,db", "--", "uptime")
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        lines = result.stdout.splitlines()
+        self.assertTrue(any(line.startswith("web | fake-ssh -F") and line.endswith("web uptime") for line in lines))
+        self.assertTrue(any(line.startswith("db  | fake-ssh") for line in lines))
+        self.assertIn("Resumo: 2 hosts, 2 ok, 0 com falha", lines)
+        self.assertIn("  exit 0: 2 (web, db)", lines)
+
+    def test_cli_actions_are_recorded_in_the_activity_log(self) -> None:
+        self._run("web")
+        self._run_subcommand("run", "-H", "web", "--", "uptime")
+
+        with open(os.path.join(self.temp_dir, "state", "activity.jsonl"), encoding="utf-8") as handle:
+            records = [json.loads(line) for line in handle]
+        connect_end, run_result = (
+            next(record for record in records if record["message"] == message)
+            for message in ("[cli] connect end: web", "[run] web: ok")
+        )
+        self.assertEqual((connect_end["action"], connect_end["host"], connect_end["exit_code"]), ("connect", "web", 0))
+        self.assertEqual((run_result["action"], run_result["host"], run_result["exit_code"]), ("run", "web", 0))
+        self.assertIsNotNone(run_result["duration"])
+
+    def test_config_subcommand_edits_hosts_in_place(self) -> None:
+        with open(self.config_path, "a", encoding="utf-8") as handle:
+            handle.write("\n# fim\n")
+
+        added = self._run_subcommand("config", "add", "db", "db.local", "-o", "HostName=127.0.0.2", "-c", "banco")
+        renamed = self._run_subcommand("config", "rename", "web", "www", "-o", "User=deploy")
+        removed = self._run_subcommand("config", "rm", "db.local")
+        missing = self._run_subcommand("config", "set", "nope", "-o", "Port=22")
+
+        for result in (added, renamed, removed):
+            self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertEqual(missing.returncode, 1)
+        self.assertIn("nope", missing.stdout)
+        with open(self.config_path, "r", encoding="utf-8") as handle:
+            self.assertEqual(
+                handle.read(),
+                "Host www\n  HostName 127.0.0.1\n  User deploy\n\n# fim\n\n## banco\nHost db\n  HostName 127.0.0.2\n",
+            )
+        self.assertEqual(self._run("--list").stdout.split(), ["www", "db"])
+
+    @unittest.skipUnless(shutil.which("bash"), "bash not installed")
+    def test_bash_completion_reads_the_precomputed_host_list(self) -> None:
+        with open(self.config_path, "a", encoding="utf-8") as handle:
+            handle.write("Host web-2\n  HostName 127.0.0.2\nHost db\n  HostName 127.0.0.3\n")
+        self._run("--list")
+        script = subprocess.run(
+            [sys.executable, ENTRY_POINT, "--completion", "bash"], env=self.env, capture_output=True, text=True, check=True
+        ).stdout
+
+        def complete(*words: str) -> list[str]:
+            line = " ".join(f"'{word}'" for word in words)
+            probe = f'{script}\nCOMP_WORDS=({line}); COMP_CWORD={len(words) - 1}; _ssh_connect; printf "%s\\n" "${{COMPREPLY[@]}}"'
+            result = subprocess.run(["bash", "-c", probe], env=self.env, capture_output=True, text=True, timeout=30)
+            return result.stdout.split()
+
+        self.assertEqual(complete("ssh-connect.py", "-f", self.config_path, "we"), ["web", "web-2"])
+        self.assertEqual(complete("ssh-connect.py", "run", "-f", self.config_path, "-H", "d"), ["db"])
+        self.assertEqual(complete("ssh-connect.py", "--pro"), ["--probe", "--probe-timeout", "--probe-concurrency", "--profile"])
+        self.assertEqual(complete("ssh-connect.py", "--ui", "c"), ["curses"])
+
+    def _run_subcommand(self, name: str, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, ENTRY_POINT, name, "-f", self.config_path, *args],
+            cwd=self.temp_dir,
+            env=self.env,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
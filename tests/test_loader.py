@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from textual.widgets import DataTable
+
+from src.ssh_connect.services import config_index
+from src.ssh_connect.services.search_service import HostSearchIndex
+from src.ssh_connect.tui.app import SSHConnectTextualApp
+from src.ssh_connect.tui.loader import LOAD_HOSTS, LOAD_KEYS, growing_chunks
+
+
+class GrowingChunksTests(unittest.TestCase):
+    def test_chunks_grow_geometrically_and_keep_every_item(self) -> None:
+        chunks = list(growing_chunks(range(100), first=4, growth=3, clock=lambda: 0.0))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 12, 36, 48])
+        self.assertEqual([item for chunk in chunks for item in chunk], list(range(100)))
+
+    def test_slow_source_is_flushed_after_max_interval(self) -> None:
+        ticks = iter(range(100))
+
+        chunks = list(growing_chunks(range(6), first=100, max_interval=2, clock=lambda: next(ticks)))
+
+        self.assertEqual(chunks, [[0, 1], [2, 3], [4, 5]])
+
+
+async def _wait_loaded(app: SSHConnectTextualApp, pilot, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while app.loading and time.monotonic() < deadline:
+        await pilot.pause(0.02)
+    await pilot.pause()
+
+
+class ProgressiveLoadTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        environment = patch.dict(
+            os.environ,
+            {
+                "SSH_CONNECT_CACHE_DIR": os.path.join(self.temp_dir, "cache"),
+                "SSH_CONNECT_STATE_DIR": os.path.join(self.temp_dir, "state"),
+            },
+        )
+        environment.start()
+        self.addCleanup(environment.stop)
+        config_index._INDEX_CACHE.clear()
+
+        self.keys_dir = os.path.join(self.temp_dir, "keys")
+        os.makedirs(self.keys_dir)
+        self.config_path = os.path.join(self.temp_dir, "config")
+        with open(self.config_path, "w", encoding="utf-8") as handle:
+            for index in range(1000):
+                handle.write(f"Host host-{index:04d}\n  HostName 10.0.{index // 256}.{index % 256}\n")
+
+    async def test_hosts_are_loaded_off_the_ui_thread_in_chunks(self) -> None:
+        app = SSHConnectTextualApp(self.config_path, self.keys_dir)
+        previews: list[int] = []
+        apply_preview = app._apply_preview
+
+        def record_preview(generation, search_index) -> None:
+            previews.append(len(search_index))
+            apply_preview(generation, search_index)
+
+        app._apply_preview = record_preview
+        try:
+            async with app.run_test() as pilot:
+                await _wait_loaded(app, pilot)
+
+                self.assertEqual(len(app.hosts), 1000)
+                self.assertEqual(app.host_details["host-0001"]["HostName"], "10.0.0.1")
+                self.assertFalse(app.loading & {LOAD_HOSTS, LOAD_KEYS})
+                self.assertGreater(len(previews), 1)
+                self.assertEqual(previews[-1], 1000)
+                self.assertEqual(previews, sorted(previews))
+                self.assertFalse(app.query_one("#hosts-table", DataTable).loading)
+        finally:
+            app.stop_watching()
+            app.activity_log.close()
+
+    async def test_newer_refresh_supersedes_the_previous_one(self) -> None:
+        app = SSHConnectTextualApp(self.config_path, self.keys_dir)
+        try:
+            async with app.run_test() as pilot:
+                app.refresh_data()
+                stale_generation = app._load_generation
+                app.refresh_data()
+                await _wait_loaded(app, pilot)
+
+                before = app.search_index
+                app._apply_preview(stale_generation, HostSearchIndex(["stale"], {}))
+
+                self.assertIs(app.search_index, before)
+                self.assertEqual(len(app.hosts), 1000)
+        finally:
+            app.stop_watching()
+            app.activity_log.close()
+
+
+class WindowedHostsTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        environment = patch.dict(
+            os.environ,
+            {
+                "SSH_CONNECT_CACHE_DIR": os.path.join(self.temp_dir, "cache"),
+                "SSH_CONNECT_STATE_DIR": os.path.join(self.temp_dir, "state"),
+            },
+        )
+        environment.start()
+        self.addCleanup(environment.stop)
+        config_index._INDEX_CACHE.clear()
+
+        self.keys_dir = os.path.join(self.temp_dir, "keys")
+        os.makedirs(self.keys_dir)
+        self.config_path = os.path.join(self.temp_dir, "config")
+        with open(self.config_path, "w", encoding="utf-8") as handle:
+            for index in range(3000):
+                handle.write(f"Host host-{index:04d}\n  HostName 10.1.{index // 256}.{index % 256}\n")
+
+    async def test_home_and_end_reach_the_ends_of_the_whole_list(self) -> None:
+        app = SSHConnectTextualApp(self.config_path, self.keys_dir)
+        try:
+            async with app.run_test() as pilot:
+                await _wait_loaded(app, pilot)
+                app.query_one("#hosts-table", DataTable).focus()
+
+                await pilot.press("end")
+                await pilot.pause()
+                self.assertEqual(app.selected_host, "host-2999")
+
+                await pilot.press("home")
+                await pilot.pause()
+                self.assertEqual(app.selected_host, "host-0000")
+        finally:
+            app.stop_watching()
+            app.activity_log.close()
+
+    async def test_scrolling_past_the_window_materializes_the_next_rows(self) -> None:
+        app = SSHConnectTextualApp(self.config_path, self.keys_dir)
+        try:
+            async with app.run_test() as pilot:
+                await _wait_loaded(app, pilot)
+                table = app.query_one("#hosts-table", DataTable)
+                table.focus()
+                await pilot.pause()
+
+                for _ in range(30):
+                    table.scroll_to(y=table.scroll_y + 50, animate=False, immediate=True)
+                    await pilot.pause()
+
+                view = app.query_one("HostsView")
+                self.assertGreater(view._window_start, 0)
+                self.assertEqual(table.get_row_at(int(table.scroll_y))[1], f"host-{view._window_start + int(table.scroll_y):04d}")
+                # The selection follows only once its host is no longer materialized.
+                self.assertEqual(app.selected_host, table.get_row_at(table.cursor_row)[1])
+        finally:
+            app.stop_watching()
+            app.activity_log.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
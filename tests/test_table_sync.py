@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import unittest
+
+from textual.app import App, ComposeResult
+from textual.widgets import DataTable
+
+from src.ssh_connect.tui.table_sync import TableSync
+
+
+class _TableApp(App[None]):
+    def compose(self) -> ComposeResult:
+        yield DataTable()
+
+
+def _rows(*names: str, suffix: str = "") -> list[tuple[str, tuple[str, ...]]]:
+    return [(name, (name, f"{name}{suffix}")) for name in names]
+
+
+class TableSyncTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.app = _TableApp()
+        self._context = self.app.run_test()
+        await self._context.__aenter__()
+        self.table = self.app.query_one(DataTable)
+        self.sync = TableSync(self.table, self.table.add_columns("Name", "Value"))
+
+    async def asyncTearDown(self) -> None:
+        await self._context.__aexit__(None, None, None)
+
+    def _displayed(self) -> list[tuple[str, ...]]:
+        return [tuple(self.table.get_row_at(index)) for index in range(self.table.row_count)]
+
+    async def test_sync_applies_removals_updates_and_reorders(self) -> None:
+        self.sync.sync(_rows("a", "b", "c", "d"))
+        row_a = self.table.rows["a"]
+
+        self.sync.sync([("d", ("d", "d")), ("a", ("a", "changed")), ("e", ("e", "e"))])
+
+        self.assertEqual(self._displayed(), [("d", "d"), ("a", "changed"), ("e", "e")])
+        self.assertIs(self.table.rows["a"], row_a)
+        self.assertEqual([self.sync.key_at(index) for index in range(3)], ["d", "a", "e"])
+        self.assertEqual(self.sync.index_of("e"), 2)
+
+    async def test_reorder_goes_by_row_key_when_other_cells_repeat(self) -> None:
+        sync = TableSync(self.table, [*self.sync.column_keys, *self.table.add_columns("Key")], key_column=2)
+        rows = [(name, ("same", "same", name)) for name in ("a", "b", "c")]
+        sync.sync(rows)
+
+        sync.sync(rows[::-1])
+
+        self.assertEqual([sync.key_at(index) for index in range(3)], ["c", "b", "a"])
+        self.assertEqual([self.table.get_row_at(index)[2] for index in range(3)], ["c", "b", "a"])
+
+    async def test_sync_rebuilds_when_most_rows_are_removed(self) -> None:
+        names = [f"host-{index}" for index in range(100)]
+        self.sync.sync(_rows(*names))
+
+        self.sync.sync(_rows("host-1", "new"))
+
+        self.assertEqual(self._displayed(), [("host-1", "host-1"), ("new", "new")])
+        self.assertEqual(self.sync.keys, ["host-1", "new"])
+
+
+if __name__ == "__main__":
+    unittest.main()